@@ -0,0 +1,37 @@
+"""Add related_articles table
+
+Revision ID: 3b1e9d2c7a54
+Revises: fe8f15c3fe5e
+Create Date: 2026-10-17 18:05:12.402117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b1e9d2c7a54'
+down_revision: Union[str, None] = 'fe8f15c3fe5e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('related_articles',
+    sa.Column('article_id', sa.Integer(), nullable=False),
+    sa.Column('rank', sa.SmallInteger(), nullable=False),
+    sa.Column('related_id', sa.Integer(), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.Column('computed_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['article_id'], ['articles.id'], name=op.f('fk_related_articles_article_id_articles'), ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('article_id', 'rank', name=op.f('pk_related_articles'))
+    )
+    op.create_index('ix_related_articles_related_id', 'related_articles', ['related_id'], unique=False)
+    # Isi tabel dengan menjalankan: refresh_hoopsnewsid_related <config_uri>
+
+
+def downgrade() -> None:
+    op.drop_index('ix_related_articles_related_id', table_name='related_articles')
+    op.drop_table('related_articles')
@@ -0,0 +1,26 @@
+"""Add image_variants to articles
+
+Revision ID: 5d2f8a1c6e93
+Revises: 3b1e9d2c7a54
+Create Date: 2026-10-17 17:40:03.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2f8a1c6e93'
+down_revision: Union[str, None] = '3b1e9d2c7a54'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('articles', sa.Column('image_variants', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('articles', 'image_variants')
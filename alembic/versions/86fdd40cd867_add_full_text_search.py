@@ -0,0 +1,97 @@
+"""Add full text search vectors
+
+Revision ID: 86fdd40cd867
+Revises: 87d1fc16eafe
+Create Date: 2026-10-17 09:12:40.118203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '86fdd40cd867'
+down_revision: Union[str, None] = '87d1fc16eafe'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Kolom yang diindeks per tabel beserta bobotnya (A paling relevan)
+SEARCH_COLUMNS = {
+    'articles': [('title', 'A'), ('excerpt', 'B'), ('content', 'C')],
+    'threads': [('title', 'A'), ('content', 'B')],
+    'comments': [('content', 'A')],
+}
+
+
+def _vector_expression(table, prefix):
+    parts = [
+        f"setweight(hoopsnewsid_tsvector(coalesce({prefix}{column}, '')), '{weight}')"
+        for column, weight in SEARCH_COLUMNS[table]
+    ]
+    return ' || '.join(parts)
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+
+    # Stemmer bahasa Indonesia tersedia sejak PostgreSQL 13; jika tidak ada,
+    # pakai 'simple' (tanpa stemming) untuk sisi Indonesia
+    has_indonesian = conn.execute(
+        sa.text("SELECT 1 FROM pg_ts_config WHERE cfgname = 'indonesian'")
+    ).scalar()
+    id_config = 'indonesian' if has_indonesian else 'simple'
+
+    # Dokumen di-stem dengan konfigurasi Inggris dan Indonesia sekaligus
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION hoopsnewsid_tsvector(doc text) RETURNS tsvector AS $$
+            SELECT to_tsvector('english', doc) || to_tsvector('{id_config}', doc)
+        $$ LANGUAGE sql IMMUTABLE
+    """)
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION hoopsnewsid_tsquery(q text) RETURNS tsquery AS $$
+            SELECT websearch_to_tsquery('english', q) || websearch_to_tsquery('{id_config}', q)
+        $$ LANGUAGE sql IMMUTABLE
+    """)
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION hoopsnewsid_prefix_tsquery(q text) RETURNS tsquery AS $$
+            SELECT to_tsquery('english', q) || to_tsquery('{id_config}', q)
+        $$ LANGUAGE sql IMMUTABLE
+    """)
+
+    for table in SEARCH_COLUMNS:
+        op.add_column(table, sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+        op.execute(f"""
+            CREATE OR REPLACE FUNCTION {table}_search_vector_update() RETURNS trigger AS $$
+            BEGIN
+                NEW.search_vector := {_vector_expression(table, 'NEW.')};
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql
+        """)
+        columns = ', '.join(column for column, _ in SEARCH_COLUMNS[table])
+        op.execute(f"""
+            CREATE TRIGGER {table}_search_vector_trigger
+            BEFORE INSERT OR UPDATE OF {columns} ON {table}
+            FOR EACH ROW EXECUTE FUNCTION {table}_search_vector_update()
+        """)
+        op.execute(f"UPDATE {table} SET search_vector = {_vector_expression(table, '')}")
+        op.create_index(
+            op.f(f'ix_{table}_search_vector'), table, ['search_vector'],
+            postgresql_using='gin'
+        )
+
+
+def downgrade() -> None:
+    for table in SEARCH_COLUMNS:
+        op.drop_index(op.f(f'ix_{table}_search_vector'), table_name=table)
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_search_vector_trigger ON {table}")
+        op.execute(f"DROP FUNCTION IF EXISTS {table}_search_vector_update()")
+        op.drop_column(table, 'search_vector')
+
+    op.execute("DROP FUNCTION IF EXISTS hoopsnewsid_prefix_tsquery(text)")
+    op.execute("DROP FUNCTION IF EXISTS hoopsnewsid_tsquery(text)")
+    op.execute("DROP FUNCTION IF EXISTS hoopsnewsid_tsvector(text)")
@@ -0,0 +1,26 @@
+"""Add token_version to users
+
+Revision ID: 97f0daed64c1
+Revises: 86fdd40cd867
+Create Date: 2026-10-17 16:05:12.402117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '97f0daed64c1'
+down_revision: Union[str, None] = '86fdd40cd867'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('token_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'token_version')
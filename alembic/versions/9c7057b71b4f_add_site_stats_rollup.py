@@ -0,0 +1,41 @@
+"""Add site_stats rollup table
+
+Revision ID: 9c7057b71b4f
+Revises: 97f0daed64c1
+Create Date: 2026-10-17 16:48:31.550274
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c7057b71b4f'
+down_revision: Union[str, None] = '97f0daed64c1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('site_stats',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('value', sa.BigInteger(), server_default='0', nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('name', name=op.f('pk_site_stats'))
+    )
+
+    # Isi awal dari data yang sudah ada
+    op.execute("""
+        INSERT INTO site_stats (name, value, updated_at)
+        SELECT 'users', count(*), now() FROM users
+        UNION ALL SELECT 'articles', count(*), now() FROM articles
+        UNION ALL SELECT 'comments', count(*), now() FROM comments
+        UNION ALL SELECT 'threads', count(*), now() FROM threads
+        UNION ALL SELECT 'views', coalesce(sum(views), 0), now() FROM articles
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('site_stats')
@@ -0,0 +1,61 @@
+"""Add indexes for hot query shapes
+
+Revision ID: fe8f15c3fe5e
+Revises: 9c7057b71b4f
+Create Date: 2026-10-17 17:20:44.913861
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'fe8f15c3fe5e'
+down_revision: Union[str, None] = '9c7057b71b4f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+PUBLISHED = "status = 'published'"
+
+# (nama index, tabel, kolom, kondisi index parsial); sama dengan __table_args__ model
+INDEXES = [
+    ('ix_articles_published_published_at', 'articles', ['published_at DESC NULLS LAST', 'id DESC'], PUBLISHED),
+    ('ix_articles_published_views', 'articles', ['views DESC NULLS LAST', 'id DESC'], PUBLISHED),
+    ('ix_articles_category_published_at', 'articles', ['category_id', 'published_at DESC NULLS LAST', 'id DESC'], PUBLISHED),
+    ('ix_articles_author_published_at', 'articles', ['author_id', 'published_at DESC'], None),
+    ('ix_articles_status_published_at', 'articles', ['status', 'published_at DESC'], None),
+    ('ix_articles_category_id', 'articles', ['category_id'], None),
+    ('ix_articles_created_at', 'articles', ['created_at'], None),
+    ('ix_comments_article_tree', 'comments', ['article_id', 'parent_id', 'is_approved', 'created_at'], None),
+    ('ix_comments_thread_tree', 'comments', ['thread_id', 'parent_id', 'created_at'], None),
+    ('ix_comments_parent_id', 'comments', ['parent_id'], None),
+    ('ix_comments_user_id', 'comments', ['user_id'], None),
+    ('ix_comments_created_at', 'comments', ['created_at'], None),
+    ('ix_threads_created_at', 'threads', ['created_at DESC', 'id DESC'], None),
+    ('ix_threads_user_id', 'threads', ['user_id'], None),
+    ('ix_users_created_at', 'users', ['created_at'], None),
+    ('ix_article_tag_tag_id', 'article_tag', ['tag_id', 'article_id'], None),
+    ('ix_thread_tag_tag_id', 'thread_tag', ['tag_id', 'thread_id'], None),
+]
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY tidak boleh di dalam transaksi dan tidak
+    # mengunci tabel untuk tulis selama index dibangun
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name, table, [sa.text(column) for column in columns],
+                postgresql_where=sa.text(where) if where else None,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,104 @@
+"""Compare the JSON encoders available to the ``json`` renderer.
+
+Encodes payloads shaped like the API's responses with:
+
+* ``pyramid``  -- Pyramid's stock ``JSON`` renderer (stdlib, views call ``.isoformat()``)
+* ``stdlib``   -- ``renderers.stdlib_dumps`` (compact, native datetimes)
+* ``orjson``   -- ``renderers.orjson_dumps`` (if orjson is installed)
+* ``stream``   -- ``renderers.iter_encode`` with the default backend, chunks joined
+
+Usage::
+
+    python benchmarks/bench_json_renderer.py [--items N] [--content-size BYTES] [--repeat N]
+"""
+import argparse
+import datetime
+import os
+import sys
+import time
+
+from pyramid.renderers import JSON
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hoopsnewsid.renderers import get_dumps, iter_encode, orjson_dumps, stdlib_dumps  # noqa: E402
+
+
+def article(i, content_size, now):
+    return {
+        'id': i,
+        'title': f'Lakers Defeat Warriors in Thrilling Overtime ({i})',
+        'slug': f'lakers-defeat-warriors-thrilling-overtime-{i}',
+        'excerpt': 'The Los Angeles Lakers pulled off a stunning victory against the Golden State Warriors.',
+        'content': ('<p>Pelita Jaya dan Satria Muda bertemu lagi di final IBL.</p>' * (content_size // 60 + 1))[:content_size],
+        'image_url': 'https://source.unsplash.com/random/1200x800/?basketball',
+        'views': i * 7,
+        'status': 'published',
+        'author': {'id': 1, 'username': 'admin', 'full_name': 'Administrator', 'avatar_url': None},
+        'category': {'id': 1, 'name': 'NBA', 'slug': 'nba'},
+        'tags': [{'id': 1, 'name': 'Lakers'}, {'id': 2, 'name': 'Warriors'}],
+        'created_at': now - datetime.timedelta(hours=i),
+        'published_at': now - datetime.timedelta(hours=i),
+    }
+
+
+def isoformatted(value):
+    # Cara lama: view mengubah datetime jadi string sebelum dirender
+    if isinstance(value, dict):
+        return {key: isoformatted(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [isoformatted(item) for item in value]
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    return value
+
+
+def timed(encode, payload, repeat):
+    encode(payload)  # warm-up
+    started = time.perf_counter()
+    for _ in range(repeat):
+        size = len(encode(payload))
+    return (time.perf_counter() - started) / repeat, size
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--items', type=int, default=100)
+    parser.add_argument('--content-size', type=int, default=4000, help='bytes of article content')
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args(argv)
+
+    now = datetime.datetime.utcnow()
+    payloads = {
+        'article list': {
+            'articles': [article(i, 0, now) for i in range(args.items)],
+            'total': args.items, 'page': 1, 'per_page': args.items,
+        },
+        'full articles': {
+            'articles': [article(i, args.content_size, now) for i in range(args.items)],
+            'total': args.items,
+        },
+    }
+
+    pyramid_render = JSON()(None)
+    default_dumps = get_dumps()
+    encoders = {
+        'pyramid': lambda payload: pyramid_render(isoformatted(payload), {}).encode('utf-8'),
+        'stdlib': stdlib_dumps,
+        'stream': lambda payload: b''.join(iter_encode(payload, default_dumps, 0, chunk_size=25)),
+    }
+    if orjson_dumps is not None:
+        encoders['orjson'] = orjson_dumps
+
+    print(f'{"payload":<14} {"encoder":<8} {"ms/op":>9} {"MB/s":>8} {"bytes":>9} {"vs pyramid":>10}')
+    for name, payload in payloads.items():
+        baseline = None
+        for encoder, encode in encoders.items():
+            seconds, size = timed(encode, payload, args.repeat)
+            baseline = baseline or seconds
+            print(f'{name:<14} {encoder:<8} {seconds * 1000:>9.3f} {size / seconds / 1e6:>8.1f} '
+                  f'{size:>9} {baseline / seconds:>9.1f}x')
+
+
+if __name__ == '__main__':
+    main()
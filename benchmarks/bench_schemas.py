@@ -0,0 +1,97 @@
+"""Compare the ways views can dump a list of articles.
+
+Dumps transient ``Article`` rows (with author, category and tags) with:
+
+* ``per-request`` -- ``ArticleListSchema(many=True)`` built for every dump, as views used to
+* ``shared``      -- the ``SchemaRegistry`` instance, marshmallow's own ``dump``
+* ``compiled``    -- ``SchemaRegistry.dumper``, the compiled fast path
+
+Each mode is also timed with encoding by the ``json`` renderer's default
+backend, since the compiled path leaves datetimes for the encoder.
+
+Usage::
+
+    python benchmarks/bench_schemas.py [--items N] [--repeat N]
+"""
+import argparse
+import datetime
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hoopsnewsid.models import Article, Category, Tag, User  # noqa: E402
+from hoopsnewsid.renderers import get_dumps  # noqa: E402
+from hoopsnewsid.schemas import ArticleListSchema, ArticleSchema, SchemaRegistry  # noqa: E402
+
+
+def articles(count, now):
+    author = User(id=1, username='admin', email='admin@hoopsnews.id', full_name='Administrator')
+    category = Category(id=1, name='NBA', slug='nba')
+    tags = [Tag(id=1, name='Lakers'), Tag(id=2, name='Warriors')]
+    return [
+        Article(
+            id=i,
+            title=f'Lakers Defeat Warriors in Thrilling Overtime ({i})',
+            slug=f'lakers-defeat-warriors-thrilling-overtime-{i}',
+            excerpt='The Los Angeles Lakers pulled off a stunning victory against the Golden State Warriors.',
+            content='<p>Pelita Jaya dan Satria Muda bertemu lagi di final IBL.</p>',
+            image_url='https://source.unsplash.com/random/1200x800/?basketball',
+            views=i * 7,
+            status='published',
+            author_id=1,
+            category_id=1,
+            author=author,
+            category=category,
+            tags=tags,
+            created_at=now - datetime.timedelta(hours=i),
+            updated_at=now - datetime.timedelta(hours=i),
+            published_at=now - datetime.timedelta(hours=i),
+        )
+        for i in range(count)
+    ]
+
+
+def timed(dump, rows, repeat):
+    dump(rows)  # warm-up
+    started = time.perf_counter()
+    for _ in range(repeat):
+        dump(rows)
+    return (time.perf_counter() - started) / repeat
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--items', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args(argv)
+
+    rows = articles(args.items, datetime.datetime.utcnow())
+    schemas = SchemaRegistry()
+    encode = get_dumps()
+
+    # Hasil jalur cepat harus sama dengan marshmallow setelah di-encode
+    for schema_class in (ArticleListSchema, ArticleSchema):
+        expected = encode(schema_class(many=True).dump(rows))
+        if encode(schemas.dumper(schema_class, many=True).dump(rows)) != expected:
+            sys.exit(f'compiled dumper output differs from marshmallow for {schema_class.__name__}')
+
+    print(f'{"schema":<18} {"mode":<12} {"dump ms":>9} {"+encode ms":>11} {"vs per-request":>15}')
+    for schema_class in (ArticleListSchema, ArticleSchema):
+        modes = {
+            'per-request': lambda rows, cls=schema_class: cls(many=True).dump(rows),
+            'shared': schemas.get(schema_class, many=True).dump,
+            'compiled': schemas.dumper(schema_class, many=True).dump,
+        }
+        baseline = None
+        for mode, dump in modes.items():
+            seconds = timed(dump, rows, args.repeat)
+            rendered = timed(lambda rows, dump=dump: encode(dump(rows)), rows, args.repeat)
+            baseline = baseline or rendered
+            print(f'{schema_class.__name__:<18} {mode:<12} {seconds * 1000:>9.3f} '
+                  f'{rendered * 1000:>11.3f} {baseline / rendered:>14.1f}x')
+
+
+if __name__ == '__main__':
+    main()
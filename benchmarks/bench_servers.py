@@ -0,0 +1,133 @@
+"""Compare waitress (WSGI) and uvicorn (``hoopsnewsid.asgi``) under high concurrency.
+
+Both servers run the same application with the same number of worker
+threads. For each concurrency level, keep-alive clients hammer the
+endpoints while ``--slow-clients`` extra connections send half a request
+and then stall, like clients on bad mobile links. waitress gets a
+``connection_limit`` large enough for all of them.
+
+Usage::
+
+    python benchmarks/bench_servers.py [config_uri] [--concurrency C ...] [--slow-clients N]
+        [--threads T] [--requests N] [--endpoint NAME]
+
+Without ``config_uri`` a throwaway SQLite database is seeded, as in
+``benchmarks/run.py``.
+"""
+import argparse
+import logging
+import os
+import random
+import socket
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from run import (  # noqa: E402
+    ENDPOINTS, base_settings, make_app, path_factory, run_http, sample_params, serve,
+)
+from hoopsnewsid.asgi import ASGIApp  # noqa: E402
+from hoopsnewsid.db import DBSession  # noqa: E402
+
+DEFAULT_ENDPOINTS = ('articles', 'article', 'threads', 'categories')
+
+
+class Waitress:
+    name = 'waitress'
+
+    def __init__(self, app, threads, connections):
+        # connection_limit bawaan waitress (100) menolak koneksi berikutnya
+        self.server = serve(app, threads, connection_limit=connections)
+        self.port = self.server.adj.port
+
+    def stop(self):
+        self.server.shutdown()
+
+
+class Uvicorn:
+    name = 'uvicorn'
+
+    def __init__(self, app, threads, connections):
+        import uvicorn
+
+        self.app = ASGIApp(app, threads=threads)
+        config = uvicorn.Config(self.app, host='127.0.0.1', port=0, lifespan='off',
+                                log_level='warning', access_log=False)
+        self.server = uvicorn.Server(config)
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+        self.port = self.server.servers[0].sockets[0].getsockname()[1]
+
+    def stop(self):
+        self.server.should_exit = True
+        self.thread.join()
+        self.app.shutdown()
+
+
+SERVERS = {'waitress': Waitress, 'uvicorn': Uvicorn}
+
+
+def open_slow_clients(port, count):
+    """Connections that sent only part of their request headers."""
+    sockets = []
+    for _ in range(count):
+        sock = socket.create_connection(('127.0.0.1', port))
+        sock.sendall(b'GET /api/categories HTTP/1.1\r\nHost: localhost\r\n')
+        sockets.append(sock)
+    return sockets
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('config_uri', nargs='?')
+    parser.add_argument('--server', choices=SERVERS, action='append', help='default: both')
+    parser.add_argument('--concurrency', type=int, action='append', help='active clients; default: 64 and 256')
+    parser.add_argument('--slow-clients', type=int, default=200, help='stalled connections held open during the run')
+    parser.add_argument('--threads', type=int, default=8, help='worker threads of each server')
+    parser.add_argument('--requests', type=int, default=2000, help='measured requests per endpoint and level')
+    parser.add_argument('--warmup', type=int, default=20)
+    parser.add_argument('--endpoint', action='append', help=f'default: {", ".join(DEFAULT_ENDPOINTS)}')
+    parser.add_argument('--scale', type=float, default=0.01, help='seed scale for the throwaway database')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--cache', action='store_true', help='keep the response cache enabled')
+    args = parser.parse_args(argv)
+
+    settings = base_settings(args.config_uri, args.scale, args.seed)
+    if not args.cache:
+        settings['cache.enabled'] = 'false'
+    DBSession.remove()
+    app = make_app({}, **settings)
+    engine = DBSession.get_bind()
+    logging.getLogger('hoopsnewsid.access').setLevel(logging.WARNING)
+
+    rng = random.Random(args.seed)
+    params, _ = sample_params(rng)
+    names = args.endpoint or DEFAULT_ENDPOINTS
+    endpoints = [(name, template) for name, template, auth in ENDPOINTS if name in names and not auth]
+
+    print(f'{"server":<9} {"clients":>7} {"endpoint":<12} {"req/s":>9} {"p50":>8} {"p95":>8} {"p99":>9} {"err":>5}')
+    levels = args.concurrency or (64, 256)
+    connections = args.slow_clients + max(levels) + 16
+    for server_name in args.server or SERVERS:
+        server = SERVERS[server_name](app, args.threads, connections)
+        slow = open_slow_clients(server.port, args.slow_clients)
+        try:
+            for concurrency in levels:
+                for name, template in endpoints:
+                    make_path = path_factory(template, params, random.Random(rng.random()))
+                    result = run_http(server.port, engine, make_path, {}, args.requests, args.warmup, concurrency)
+                    print(f'{server_name:<9} {concurrency:>7} {name:<12} {result["rps"]:>9.1f} '
+                          f'{result["p50_ms"]:>8.2f} {result["p95_ms"]:>8.2f} {result["p99_ms"]:>9.2f} '
+                          f'{result["errors"]:>5}')
+        finally:
+            for sock in slow:
+                sock.close()
+            server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""Compare authenticated read throughput with and without stateless principals.
+
+Runs the same authenticated GET against three configurations:
+
+* ``db``        -- principals loaded from the database on every request
+* ``cached``    -- default mode with the process-wide identity cache
+* ``stateless`` -- ``auth.stateless_principals = true``
+
+Usage::
+
+    python benchmarks/bench_stateless_principals.py [config_uri] [--requests N] [--path PATH]
+
+Without ``config_uri`` a throwaway SQLite database is created and seeded.
+With an ini file the existing database is used and must contain an admin.
+"""
+import argparse
+import datetime
+import os
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+import transaction
+from webtest import TestApp
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hoopsnewsid import main as make_app  # noqa: E402
+from hoopsnewsid.db import DBSession  # noqa: E402
+from hoopsnewsid.models import Article, Base, Category, User  # noqa: E402
+from hoopsnewsid.testing import QueryCounter  # noqa: E402
+from hoopsnewsid.utils.jwt import create_token  # noqa: E402
+
+MODES = {
+    'db': {'auth.identity_cache_ttl': '0', 'auth.stateless_principals': 'false'},
+    'cached': {'auth.identity_cache_ttl': '30', 'auth.stateless_principals': 'false'},
+    'stateless': {'auth.identity_cache_ttl': '30', 'auth.stateless_principals': 'true'},
+}
+
+
+def seed(engine):
+    Base.metadata.create_all(engine)
+    with transaction.manager:
+        admin = User(username='bench', email='bench@example.com', password_hash='-', is_admin=True)
+        category = Category(name='NBA', slug='nba')
+        DBSession.add_all([admin, category])
+        DBSession.flush()
+        now = datetime.datetime.utcnow()
+        for i in range(50):
+            DBSession.add(Article(
+                title=f'Benchmark article {i}', slug=f'benchmark-{i}', content='x' * 500,
+                status='published', author_id=admin.id, category_id=category.id,
+                published_at=now - datetime.timedelta(minutes=i),
+            ))
+
+
+def base_settings(config_uri):
+    if config_uri:
+        from pyramid.paster import get_appsettings
+        return dict(get_appsettings(config_uri, name='main'))
+    path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    return {'sqlalchemy.url': f'sqlite:///{path}', 'jwt.secret': 'benchmark'}
+
+
+def run(settings, mode, path, requests):
+    settings = dict(settings, **MODES[mode])
+    settings['cache.enabled'] = 'false'
+    DBSession.remove()
+    app = TestApp(make_app({}, **settings))
+    engine = DBSession.get_bind()
+
+    admin = DBSession.query(User).filter(User.is_admin == True).first()  # noqa: E712
+    token_request = SimpleNamespace(registry=SimpleNamespace(settings=settings))
+    token = create_token(admin.id, token_request, admin=True, version=admin.token_version or 0)
+    headers = {'Authorization': f'Bearer {token}'}
+    DBSession.remove()
+
+    app.get(path, headers=headers)  # warm-up
+    with QueryCounter(engine) as counter:
+        started = time.perf_counter()
+        for _ in range(requests):
+            app.get(path, headers=headers)
+        elapsed = time.perf_counter() - started
+
+    return {
+        'mode': mode,
+        'rps': requests / elapsed,
+        'queries_per_request': counter.count / requests,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('config_uri', nargs='?')
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--path', default='/api/articles?per_page=5')
+    args = parser.parse_args(argv)
+
+    settings = base_settings(args.config_uri)
+    if not args.config_uri:
+        make_app({}, **settings)
+        seed(DBSession.get_bind())
+
+    print(f'{"mode":<10} {"req/s":>10} {"queries/req":>12}')
+    for mode in MODES:
+        result = run(settings, mode, args.path, args.requests)
+        print(f'{result["mode"]:<10} {result["rps"]:>10.1f} {result["queries_per_request"]:>12.2f}')
+
+
+if __name__ == '__main__':
+    main()
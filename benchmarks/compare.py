@@ -0,0 +1,81 @@
+"""Compare two benchmark result files and flag regressions.
+
+An endpoint regresses when its latency (``--metric``, default p95) grows
+by more than ``--threshold`` percent, its requests per second drop by
+more than the same percentage, or it runs more SQL queries per request.
+Exits with status 1 when anything regressed, so it can gate CI.
+
+Usage::
+
+    python benchmarks/compare.py <baseline.json> <current.json> [--threshold PCT] [--metric p50_ms|p95_ms|p99_ms]
+"""
+import argparse
+import json
+import sys
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def change(old, new):
+    """Relative change in percent; 0 when there is no baseline value."""
+    return (new - old) / old * 100 if old else 0.0
+
+
+def compare(baseline, current, threshold, metric):
+    """``[(mode, endpoint, row, regressions)]`` for endpoints present in both runs."""
+    rows = []
+    for mode, endpoints in sorted(current['results'].items()):
+        for name, result in sorted(endpoints.items()):
+            old = baseline['results'].get(mode, {}).get(name)
+            if old is None:
+                continue
+            latency = change(old[metric], result[metric])
+            rps = change(old['rps'], result['rps'])
+            regressions = []
+            if latency > threshold:
+                regressions.append(metric)
+            if -rps > threshold:
+                regressions.append('rps')
+            if result['queries_per_request'] > old['queries_per_request'] + 0.5:
+                regressions.append('queries')
+            if result['errors'] > old['errors']:
+                regressions.append('errors')
+            rows.append((mode, name, {
+                'old': old[metric], 'new': result[metric], 'latency': latency,
+                'rps': rps, 'old_queries': old['queries_per_request'],
+                'new_queries': result['queries_per_request'],
+            }, regressions))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('baseline')
+    parser.add_argument('current')
+    parser.add_argument('--threshold', type=float, default=10.0, help='allowed change in percent (default: 10)')
+    parser.add_argument('--metric', default='p95_ms', choices=('p50_ms', 'p95_ms', 'p99_ms', 'mean_ms'))
+    args = parser.parse_args(argv)
+
+    baseline, current = load(args.baseline), load(args.current)
+    for key in ('dialect', 'rows', 'concurrency'):
+        if baseline['meta'].get(key) != current['meta'].get(key):
+            print(f'warning: {key} differs: {baseline["meta"].get(key)} -> {current["meta"].get(key)}')
+
+    rows = compare(baseline, current, args.threshold, args.metric)
+    print(f'{"mode":<10} {"endpoint":<18} {args.metric:>16} {"change":>8} {"rps":>8} {"q/req":>11}')
+    regressed = 0
+    for mode, name, row, regressions in rows:
+        flag = '  REGRESSION: ' + ', '.join(regressions) if regressions else ''
+        regressed += bool(regressions)
+        print(f'{mode:<10} {name:<18} {row["old"]:>7.2f}->{row["new"]:>7.2f} {row["latency"]:>+7.1f}% '
+              f'{row["rps"]:>+7.1f}% {row["old_queries"]:>5.2f}->{row["new_queries"]:<5.2f}{flag}')
+
+    print(f'{regressed} of {len(rows)} endpoints regressed (threshold {args.threshold:g}%)')
+    return 1 if regressed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
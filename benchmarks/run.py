@@ -0,0 +1,298 @@
+"""Load-test the main REST endpoints and store the results as JSON.
+
+Each endpoint is driven in two modes:
+
+* ``inprocess`` -- sequential requests through WebTest, no network or server
+* ``http``      -- concurrent keep-alive clients against waitress on a random port
+
+For every endpoint the run reports p50/p95/p99/mean latency (ms),
+requests per second and SQL queries per request. Results are written to
+``benchmarks/results/`` (or ``--output``); compare two runs with
+``benchmarks/compare.py``.
+
+Usage::
+
+    python benchmarks/run.py [config_uri] [--requests N] [--concurrency C] [--mode M] [--endpoint NAME]
+
+Without ``config_uri`` a throwaway SQLite database is seeded with
+``benchmarks/seed.py`` at ``--scale`` (default 0.01). With an ini file
+the existing database is used; seed it first at the scale you want to
+measure.
+"""
+import argparse
+import datetime
+import http.client
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+from sqlalchemy import func, select
+from webtest import TestApp
+from webtest.http import StopableWSGIServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from hoopsnewsid import main as make_app  # noqa: E402
+from hoopsnewsid.db import DBSession  # noqa: E402
+from hoopsnewsid.models import Article, Comment, Thread, User  # noqa: E402
+from hoopsnewsid.testing import QueryCounter  # noqa: E402
+from hoopsnewsid.utils.jwt import create_token  # noqa: E402
+
+from seed import seed  # noqa: E402
+
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+
+MODES = ('inprocess', 'http')
+
+# (nama, path, butuh token admin). Placeholder diisi per request dari
+# sampel id yang ada di database, agar tidak selalu membaca baris yang sama
+ENDPOINTS = [
+    ('articles', '/api/articles?page={page}&per_page=10', False),
+    ('articles_category', '/api/articles?category={category}&per_page=10', False),
+    ('articles_popular', '/api/articles?sort=views&per_page=10', False),
+    ('article', '/api/articles/{article_id}', False),
+    ('article_comments', '/api/articles/{article_id}/comments', False),
+    ('articles_related', '/api/articles/related?articleId={article_id}&limit=6', False),
+    ('categories', '/api/categories', False),
+    ('user_profile', '/api/users/profile/{username}', False),
+    ('user_articles', '/api/users/{username}/articles', False),
+    ('threads', '/api/community/threads?page={page}', False),
+    ('thread', '/api/community/threads/{thread_id}', False),
+    ('search', '/api/search?q=Lakers&type=articles', False),
+    ('admin_stats', '/api/admin/stats', True),
+    ('admin_articles', '/api/admin/articles', True),
+]
+
+# Jumlah id sampel per placeholder
+SAMPLE_SIZE = 200
+
+
+def base_settings(config_uri, scale, seed_value):
+    if config_uri:
+        from pyramid.paster import get_appsettings
+        return dict(get_appsettings(config_uri, name='main'))
+    path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    settings = {'sqlalchemy.url': f'sqlite:///{path}', 'jwt.secret': 'benchmark'}
+    make_app({}, **settings)
+    seed(DBSession.get_bind(), scale, seed_value, log=lambda line: print(line, file=sys.stderr))
+    DBSession.remove()
+    return settings
+
+
+def sample_params(rng):
+    """Ids of existing rows to fill the path placeholders with."""
+    db = DBSession()
+    published = Article.status == 'published'
+    params = {
+        'article_id': db.scalars(select(Article.id).where(published).order_by(func.random()).limit(SAMPLE_SIZE)).all(),
+        'thread_id': db.scalars(select(Thread.id).order_by(func.random()).limit(SAMPLE_SIZE)).all(),
+        'username': db.scalars(
+            select(User.username).where(User.id.in_(select(Article.author_id).where(published)))
+            .order_by(func.random()).limit(SAMPLE_SIZE)
+        ).all(),
+        'category': ['nba', 'ibl', 'fiba', 'tutorial', 'analysis'],
+        'page': list(range(1, 11)),
+    }
+    admin = db.scalars(select(User).where(User.is_admin == True).order_by(User.id)).first()  # noqa: E712
+    DBSession.remove()
+    return params, admin
+
+
+def path_factory(template, params, rng):
+    keys = [key for key in params if '{' + key + '}' in template]
+
+    def make_path():
+        return template.format(**{key: rng.choice(params[key]) for key in keys})
+    return make_path
+
+
+def percentile(ordered, fraction):
+    # Nearest-rank
+    index = max(int(round(fraction * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(index, len(ordered) - 1)]
+
+
+def summarize(latencies, elapsed, queries, errors):
+    ordered = sorted(latencies)
+    count = len(ordered)
+    return {
+        'requests': count,
+        'errors': errors,
+        'rps': round(count / elapsed, 1),
+        'mean_ms': round(sum(ordered) / count * 1000, 2),
+        'p50_ms': round(percentile(ordered, 0.50) * 1000, 2),
+        'p95_ms': round(percentile(ordered, 0.95) * 1000, 2),
+        'p99_ms': round(percentile(ordered, 0.99) * 1000, 2),
+        'max_ms': round(ordered[-1] * 1000, 2),
+        'queries_per_request': round(queries / count, 2),
+    }
+
+
+def run_inprocess(app, engine, make_path, headers, requests, warmup):
+    testapp = TestApp(app)
+    for _ in range(warmup):
+        testapp.get(make_path(), headers=headers, expect_errors=True)
+    latencies = []
+    errors = 0
+    with QueryCounter(engine) as counter:
+        started = time.perf_counter()
+        for _ in range(requests):
+            path = make_path()
+            begin = time.perf_counter()
+            response = testapp.get(path, headers=headers, expect_errors=True)
+            latencies.append(time.perf_counter() - begin)
+            errors += response.status_int >= 400
+        elapsed = time.perf_counter() - started
+    return summarize(latencies, elapsed, counter.count, errors)
+
+
+def serve(app, threads, **kw):
+    """waitress serving ``app`` on a free local port in a background thread."""
+    server = StopableWSGIServer.create(app, threads=threads, expose_tracebacks=False, **kw)
+    server.wait()
+    # Peringatan "Task queue depth" wajar saat client lebih banyak dari thread
+    logging.getLogger('waitress.queue').setLevel(logging.ERROR)
+    return server
+
+
+def _client(port, make_path, headers, count):
+    # Satu koneksi keep-alive per client
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    latencies = []
+    errors = 0
+    try:
+        for _ in range(count):
+            path = make_path()
+            begin = time.perf_counter()
+            connection.request('GET', path, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            latencies.append(time.perf_counter() - begin)
+            errors += response.status >= 400
+    finally:
+        connection.close()
+    return latencies, errors
+
+
+def run_http(port, engine, make_path, headers, requests, warmup, concurrency):
+    _client(port, make_path, headers, warmup)
+    per_client = [requests // concurrency + (i < requests % concurrency) for i in range(concurrency)]
+    with QueryCounter(engine) as counter:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(
+                lambda count: _client(port, make_path, headers, count), [c for c in per_client if c]
+            ))
+        elapsed = time.perf_counter() - started
+    latencies = [latency for client_latencies, _ in results for latency in client_latencies]
+    errors = sum(client_errors for _, client_errors in results)
+    return summarize(latencies, elapsed, counter.count, errors)
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def table_counts(engine):
+    with engine.connect() as connection:
+        return {
+            model.__tablename__: connection.execute(select(func.count()).select_from(model)).scalar()
+            for model in (User, Article, Thread, Comment)
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('config_uri', nargs='?')
+    parser.add_argument('--requests', type=int, default=500, help='measured requests per endpoint and mode')
+    parser.add_argument('--warmup', type=int, default=20)
+    parser.add_argument('--concurrency', type=int, default=8, help='HTTP clients (and waitress threads)')
+    parser.add_argument('--mode', choices=MODES, action='append', help='default: all modes')
+    parser.add_argument('--endpoint', action='append', help='endpoint name; default: all')
+    parser.add_argument('--scale', type=float, default=0.01, help='seed scale for the throwaway database')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--cache', action='store_true', help='keep the response cache enabled')
+    parser.add_argument('--output', help='result file (default: benchmarks/results/<time>-<commit>.json)')
+    args = parser.parse_args(argv)
+
+    settings = base_settings(args.config_uri, args.scale, args.seed)
+    if not args.cache:
+        settings['cache.enabled'] = 'false'
+    DBSession.remove()
+    app = make_app({}, **settings)
+    engine = DBSession.get_bind()
+
+    rng = random.Random(args.seed)
+    params, admin = sample_params(rng)
+    token_request = SimpleNamespace(registry=SimpleNamespace(settings=settings))
+    token = create_token(admin.id, token_request, admin=True, version=admin.token_version or 0)
+    admin_headers = {'Authorization': f'Bearer {token}'}
+
+    endpoints = [e for e in ENDPOINTS if not args.endpoint or e[0] in args.endpoint]
+    modes = args.mode or MODES
+    results = {mode: {} for mode in modes}
+
+    print(f'{"mode":<10} {"endpoint":<18} {"req/s":>9} {"p50":>8} {"p95":>8} {"p99":>8} {"q/req":>6} {"err":>5}')
+
+    def report(mode, name, result):
+        results[mode][name] = result
+        print(f'{mode:<10} {name:<18} {result["rps"]:>9.1f} {result["p50_ms"]:>8.2f} '
+              f'{result["p95_ms"]:>8.2f} {result["p99_ms"]:>8.2f} '
+              f'{result["queries_per_request"]:>6.2f} {result["errors"]:>5}')
+
+    if 'inprocess' in modes:
+        for name, template, auth in endpoints:
+            make_path = path_factory(template, params, rng)
+            headers = admin_headers if auth else {}
+            report('inprocess', name, run_inprocess(app, engine, make_path, headers, args.requests, args.warmup))
+
+    if 'http' in modes:
+        server = serve(app, args.concurrency)
+        try:
+            for name, template, auth in endpoints:
+                make_path = path_factory(template, params, random.Random(rng.random()))
+                headers = admin_headers if auth else {}
+                report('http', name, run_http(
+                    server.adj.port, engine, make_path, headers, args.requests, args.warmup, args.concurrency))
+        finally:
+            server.shutdown()
+
+    document = {
+        'meta': {
+            'timestamp': datetime.datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'dialect': engine.dialect.name,
+            'rows': table_counts(engine),
+            'requests': args.requests,
+            'concurrency': args.concurrency,
+            'cache': args.cache,
+        },
+        'results': results,
+    }
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.datetime.utcnow().strftime('%Y%m%dT%H%M%S')
+        output = os.path.join(RESULTS_DIR, f'{stamp}-{document["meta"]["commit"] or "local"}.json')
+    with open(output, 'w') as f:
+        json.dump(document, f, indent=2, sort_keys=True)
+    print(f'results: {output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""Seed a large, realistic dataset for the benchmark suite.
+
+At ``--scale 1`` this is 10k users, 100k articles (0-4 tags each, 5%
+drafts), 50k threads and 1M comments on articles and threads, 30% of
+them replies. The data comes from ``generate_hoopsnewsid_data``
+(``hoopsnewsid/scripts/generate_data.py``), so two runs with the same
+``--scale`` and ``--seed`` produce the same database. The target schema
+must be empty.
+
+Usage::
+
+    python benchmarks/seed.py <config_uri> [--scale S] [--seed N] [--related]
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hoopsnewsid.models import Base  # noqa: E402
+from hoopsnewsid.scripts.generate_data import VOLUMES, generate  # noqa: E402
+
+
+def sizes_for(scale):
+    """``VOLUMES`` multiplied by ``scale``, at least one of each."""
+    return {name: max(int(size * scale), 1) for name, size in VOLUMES.items()}
+
+
+def seed(engine, scale=1.0, seed=42, related=False, log=print):
+    """Fill an empty database; returns the row counts per table."""
+    Base.metadata.create_all(engine)
+    try:
+        return generate(engine, sizes_for(scale), seed, related=related, log=log)
+    except ValueError as e:
+        raise SystemExit(str(e))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('config_uri')
+    parser.add_argument('--scale', type=float, default=1.0, help='multiplier for the default volumes (default: 1)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--related', action='store_true', help='also precompute related-articles lists')
+    args = parser.parse_args(argv)
+
+    from pyramid.paster import get_appsettings
+    from hoopsnewsid.db import create_engine_from_settings
+    engine = create_engine_from_settings(dict(get_appsettings(args.config_uri, name='main')))
+    seed(engine, args.scale, args.seed, args.related)
+
+
+if __name__ == '__main__':
+    main()
@@ -8,11 +8,41 @@ def main(global_config, **settings):
     with Configurator(settings=settings) as config:
         config.include('pyramid_tm')
         
+        # Latency dan jumlah query per route: Server-Timing, log dan /metrics
+        config.include('.instrumentation')
+        
+        # Renderer 'json' cepat (orjson bila terpasang)
+        config.include('.renderers')
+        
         # Setup database
         config.include('.db')
         
+        # Buffer view count artikel dan flush secara batch
+        config.include('.viewcount')
+        
+        # Cache response untuk GET anonim
+        config.include('.cache')
+        
+        # Instance schema bersama dan dumper cepat untuk daftar
+        config.include('.schemas.registry')
+        
+        # Pool terbatas untuk hashing bcrypt di luar thread request
+        config.include('.utils.password')
+        
+        # Cache id tag untuk upsert tag artikel dan thread
+        config.include('.services.tags')
+        
+        # Update daftar artikel terkait di thread latar belakang
+        config.include('.services.related')
+        
+        # Varian gambar artikel (WebP/JPEG, nama berisi hash, cache immutable)
+        config.include('.services.images')
+        
         # Serve static files dari folder 'static' di package 'hoopsnewsid'
-        config.add_static_view(name='static', path='hoopsnewsid:static')
+        config.add_static_view(
+            name='static', path='hoopsnewsid:static',
+            cache_max_age=int(settings.get('static.cache_max_age', 3600)),
+        )
         
         # Setup security
         config.include('.security')
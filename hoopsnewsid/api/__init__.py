@@ -11,6 +11,7 @@ def includeme(config):
     config.add_route('api_article', '/api/articles/{id:\d+}')
     config.add_route('categories', '/api/categories')
     config.add_route('api_article_comments', '/api/articles/{id:\d+}/comments')
+    config.add_route('api_article_image', '/api/articles/{id:\d+}/image')
     config.add_route('api_articles_related', '/api/articles/related')
     
     # Comment routes
@@ -28,6 +29,13 @@ def includeme(config):
     config.add_route('api_admin_articles', '/api/admin/articles')
     config.add_route('api_admin_comments', '/api/admin/comments')
     config.add_route('api_admin_threads', '/api/admin/threads')
+    
+    # Export streaming NDJSON/CSV; harus sebelum route /{id}
+    config.add_route('api_admin_users_export', '/api/admin/users/export')
+    config.add_route('api_admin_articles_export', '/api/admin/articles/export')
+    config.add_route('api_admin_comments_export', '/api/admin/comments/export')
+    config.add_route('api_admin_threads_export', '/api/admin/threads/export')
+    
     config.add_route('api_admin_thread_delete', '/api/admin/threads/{id}')
     config.add_route('api_admin_article_delete', '/api/admin/articles/{id}')
     config.add_route('api_admin_user_delete', '/api/admin/users/{id}')
@@ -36,6 +44,9 @@ def includeme(config):
     config.add_route('api_admin_approve_comment', '/api/admin/comments/{id:\d+}/approve')
     config.add_route('api_admin_reject_comment', '/api/admin/comments/{id:\d+}/reject')
 
+    # Search routes
+    config.add_route('api_search', '/api/search')
+
     # Community routes
     config.add_route('api_threads', '/api/community/threads')
     config.add_route('api_thread_detail', '/api/community/threads/{id}')
@@ -49,3 +60,4 @@ def includeme(config):
     config.scan('.comments')
     config.scan('.admin')
     config.scan('.community')  # Jangan lupa scan modul community jika ada
+    config.scan('.search')
@@ -1,7 +1,8 @@
 from pyramid.view import view_config
 from pyramid.httpexceptions import HTTPNotFound, HTTPBadRequest, HTTPForbidden
-from ..models import User, Article, Comment, Category, Thread
-from sqlalchemy import func, desc
+from ..models import User, Article, Comment, Category, Thread, article_load_options, thread_load_options
+from ..models.loading import thread_comment_count
+from sqlalchemy import func, desc, select
 import datetime
 import traceback
 import transaction
@@ -9,79 +10,155 @@ import logging
 import re
 from unidecode import unidecode
 from ..schemas.article import ArticleSchema
+from ..services.search import search_filter
+from ..services.stats import get_totals, recent_activity
+from ..services.related import schedule_related_update
+from ..services.tags import resolve_tags
+from ..cache import invalidate
+from ..security import invalidate_identity
+from ..utils.export import export_format, export_response
+from ..utils.pagination import keyset_order
+from .articles import invalidate_article
+from .comments import invalidate_comment
 
 log = logging.getLogger(__name__)
 
-@view_config(route_name='api_admin_stats', renderer='json', request_method='GET', permission='admin')
-def get_admin_stats(request):
-    if not request.user or not request.user.is_admin:
-        return HTTPForbidden(json={'error': 'Admin access required'})
+ACTIVITY_DESCRIPTIONS = {
+    'user_registered': 'Pengguna baru mendaftar',
+    'article_created': 'Menambahkan artikel baru "{title}"',
+    'comment_added': 'Mengomentari artikel "{title}"',
+}
+
+def filter_users(request, query):
+    """Apply the admin user list filters and sort to a Query or select()."""
+    # Filter by search term
+    search = request.params.get('search')
+    if search:
+        query = query.filter(search_filter(request.db, User, search))
+    
+    # Filter by role
+    role = request.params.get('role')
+    if role == 'admin':
+        query = query.filter(User.is_admin == True)
+    elif role == 'user':
+        query = query.filter(User.is_admin == False)
+    
+    # Filter by status
+    status = request.params.get('status')
+    if status == 'active':
+        query = query.filter(User.is_active == True)
+    elif status == 'inactive':
+        query = query.filter(User.is_active == False)
+    
+    # Sort by
+    sort = request.params.get('sort', 'created_at')
+    direction = request.params.get('direction', 'desc')
     
-    # Get total counts
-    total_users = request.db.query(func.count(User.id)).scalar()
-    total_articles = request.db.query(func.count(Article.id)).scalar()
-    total_comments = request.db.query(func.count(Comment.id)).scalar()
-    total_views = request.db.query(func.sum(Article.views)).scalar() or 0
-    total_threads = request.db.query(func.count(Thread.id)).scalar() or 0
+    if sort == 'username':
+        return query.order_by(User.username.desc() if direction == 'desc' else User.username)
+    elif sort == 'email':
+        return query.order_by(User.email.desc() if direction == 'desc' else User.email)
+    else:  # default to created_at
+        return query.order_by(User.created_at.desc() if direction == 'desc' else User.created_at)
 
-    # Get recent activities (new users, articles, comments)
-    recent_users = request.db.query(User).order_by(User.created_at.desc()).limit(5).all()
-    recent_articles = request.db.query(Article).order_by(Article.created_at.desc()).limit(5).all()
-    recent_comments = request.db.query(Comment).order_by(Comment.created_at.desc()).limit(5).all()
+def filter_articles(request, query):
+    """Apply the admin article list filters and sort to a Query or select()."""
+    # Filter by search term
+    search = request.params.get('search')
+    if search:
+        query = query.filter(search_filter(request.db, Article, search))
     
-    # Get popular articles
-    popular_articles = request.db.query(Article).order_by(Article.views.desc()).limit(5).all()
+    # Filter by category
+    category_id = request.params.get('category_id')
+    if category_id:
+        query = query.filter(Article.category_id == category_id)
     
-    # Format recent activities
-    recent_activities = []
+    # Filter by author
+    author_id = request.params.get('author_id')
+    if author_id:
+        query = query.filter(Article.author_id == author_id)
     
-    for user in recent_users:
-        recent_activities.append({
-            'type': 'user_registered',
-            'user': {
-                'id': user.id,
-                'username': user.username,
-                'name': user.full_name,
-                'avatarUrl': user.avatar_url
-            },
-            'description': f'Pengguna baru mendaftar',
-            'time': user.created_at.isoformat()
-        })
+    # Filter by status
+    status = request.params.get('status')
+    if status and status != 'all':
+        query = query.filter(Article.status == status)
     
-    for article in recent_articles:
-        author = article.author
-        recent_activities.append({
-            'type': 'article_created',
-            'user': {
-                'id': author.id if author else None,
-                'username': author.username if author else 'Unknown',
-                'name': author.full_name if author else 'Unknown',
-                'avatarUrl': author.avatar_url if author else None
-            },
-            'description': f'Menambahkan artikel baru "{article.title}"',
-            'time': article.created_at.isoformat()
-        })
+    # Sort by
+    sort = request.params.get('sort', 'created_at')
+    direction = request.params.get('direction', 'desc')
+    
+    if sort == 'title':
+        return query.order_by(Article.title.desc() if direction == 'desc' else Article.title)
+    elif sort == 'views':
+        return query.order_by(Article.views.desc() if direction == 'desc' else Article.views)
+    elif sort == 'published_at':
+        return query.order_by(Article.published_at.desc() if direction == 'desc' else Article.published_at)
+    else:  # default to created_at
+        return query.order_by(Article.created_at.desc() if direction == 'desc' else Article.created_at)
+
+def filter_comments(request, query):
+    """Apply the admin comment list filters and sort to a Query or select()."""
+    # Filter by search term
+    search = request.params.get('search')
+    if search:
+        query = query.filter(search_filter(request.db, Comment, search))
+    
+    # Filter by article
+    article_id = request.params.get('article_id')
+    if article_id:
+        query = query.filter(Comment.article_id == article_id)
+    
+    # Filter by user
+    user_id = request.params.get('user_id')
+    if user_id:
+        query = query.filter(Comment.user_id == user_id)
+    
+    # Filter by approval status
+    is_approved = request.params.get('is_approved')
+    if is_approved is not None:
+        is_approved = is_approved.lower() == 'true'
+        query = query.filter(Comment.is_approved == is_approved)
+    
+    # Sort by
+    sort = request.params.get('sort', 'created_at')
+    direction = request.params.get('direction', 'desc')
+    
+    if sort == 'created_at':
+        query = query.order_by(Comment.created_at.desc() if direction == 'desc' else Comment.created_at)
+    return query
 
+def filter_threads(request, query):
+    """Apply the admin thread list sort to a Query or select()."""
+    return query.order_by(Thread.created_at.desc(), Thread.id.desc())
+
+@view_config(route_name='api_admin_stats', renderer='json', request_method='GET', permission='admin')
+def get_admin_stats(request):
+    if not request.auth_identity or not request.auth_identity.is_admin:
+        return HTTPForbidden(json={'error': 'Admin access required'})
+    
+    # Total dari tabel rollup site_stats, bukan count/sum atas seluruh tabel
+    totals = get_totals(request.db)
+    
+    # Artikel published terpopuler, lewat index parsial ix_articles_published_views
+    popular_articles = request.db.query(Article).options(*article_load_options('list'))\
+        .filter(Article.status == 'published')\
+        .order_by(*keyset_order(Article.views, Article.id)).limit(5).all()
     
-    for comment in recent_comments:
-        user = comment.user
-        article = comment.article
+    # Aktivitas terbaru (user baru, artikel, komentar) dalam satu query UNION ALL
+    recent_activities = []
+    for row in recent_activity(request.db, limit=10):
+        known = row.username is not None
         recent_activities.append({
-            'type': 'comment_added',
+            'type': row.type,
             'user': {
-                'id': user.id if user else None,
-                'username': user.username if user else 'Unknown',
-                'name': user.full_name if user else 'Unknown',
-                'avatarUrl': user.avatar_url if user else None
+                'id': row.user_id if known else None,
+                'username': row.username if known else 'Unknown',
+                'name': row.full_name if known else 'Unknown',
+                'avatarUrl': row.avatar_url if known else None
             },
-            'description': f'Mengomentari artikel "{article.title if article else "Unknown"}"',
-            'time': comment.created_at.isoformat()
+            'description': ACTIVITY_DESCRIPTIONS[row.type].format(title=row.title or 'Unknown'),
+            'time': row.time
         })
-
-    
-    # Sort activities by time
-    recent_activities.sort(key=lambda x: x['time'], reverse=True)
-    recent_activities = recent_activities[:10]  # Limit to 10 most recent
     
     # Format popular articles
     popular_articles_data = []
@@ -97,61 +174,27 @@ def get_admin_stats(request):
             },
             'category': article.category.name if article.category else 'Uncategorized',
             'views': article.views,
-            'publishedDate': article.published_at.isoformat() if article.published_at else article.created_at.isoformat()
+            'publishedDate': article.published_at or article.created_at
         })
 
     
     return {
-        'totalUsers': total_users,
-        'totalArticles': total_articles,
-        'totalComments': total_comments,
-        'totalViews': total_views,
-        'totalThreads': total_threads,
+        'totalUsers': totals['users'],
+        'totalArticles': totals['articles'],
+        'totalComments': totals['comments'],
+        'totalViews': totals['views'],
+        'totalThreads': totals['threads'],
         'recentActivities': recent_activities,
         'popularArticles': popular_articles_data
     }
 
 @view_config(route_name='api_admin_users', renderer='json', request_method='GET', permission='admin')
 def get_admin_users(request):
-    if not request.user or not request.user.is_admin:
+    if not request.auth_identity or not request.auth_identity.is_admin:
         return HTTPForbidden(json={'error': 'Admin access required'})
     
     # Query users
-    query = request.db.query(User)
-    
-    # Filter by search term
-    search = request.params.get('search')
-    if search:
-        query = query.filter(
-            (User.username.ilike(f'%{search}%')) |
-            (User.email.ilike(f'%{search}%')) |
-            (User.full_name.ilike(f'%{search}%'))
-        )
-    
-    # Filter by role
-    role = request.params.get('role')
-    if role == 'admin':
-        query = query.filter(User.is_admin == True)
-    elif role == 'user':
-        query = query.filter(User.is_admin == False)
-    
-    # Filter by status
-    status = request.params.get('status')
-    if status == 'active':
-        query = query.filter(User.is_active == True)
-    elif status == 'inactive':
-        query = query.filter(User.is_active == False)
-    
-    # Sort by
-    sort = request.params.get('sort', 'created_at')
-    direction = request.params.get('direction', 'desc')
-    
-    if sort == 'username':
-        query = query.order_by(User.username.desc() if direction == 'desc' else User.username)
-    elif sort == 'email':
-        query = query.order_by(User.email.desc() if direction == 'desc' else User.email)
-    else:  # default to created_at
-        query = query.order_by(User.created_at.desc() if direction == 'desc' else User.created_at)
+    query = filter_users(request, request.db.query(User))
     
     # Pagination
     page = int(request.params.get('page', 1))
@@ -171,7 +214,7 @@ def get_admin_users(request):
             'avatar_url': user.avatar_url,
             'is_admin': user.is_admin,
             'is_active': user.is_active,
-            'created_at': user.created_at.isoformat()
+            'created_at': user.created_at
         })
     
     return {
@@ -184,6 +227,23 @@ def get_admin_users(request):
         }
     }
 
+def admin_export(request, name, statement):
+    """Stream ``statement`` as an NDJSON/CSV download for admins."""
+    if not request.auth_identity or not request.auth_identity.is_admin:
+        return HTTPForbidden(json={'error': 'Admin access required'})
+    fmt = export_format(request)
+    if fmt is None:
+        return HTTPBadRequest(json={'error': 'Unsupported export format'})
+    return export_response(request, statement, name, fmt)
+
+@view_config(route_name='api_admin_users_export', request_method='GET', permission='admin')
+def export_admin_users(request):
+    statement = select(
+        User.id, User.username, User.email, User.full_name, User.avatar_url,
+        User.is_admin, User.is_active, User.created_at,
+    )
+    return admin_export(request, 'users', filter_users(request, statement))
+
 @view_config(route_name='api_admin_user_delete', request_method='DELETE', permission='admin', renderer='json')
 def delete_admin_user(request):
     try:
@@ -206,6 +266,8 @@ def delete_admin_user(request):
             # ...
             
             request.db.delete(user)
+            invalidate(request, 'articles', 'threads')
+            invalidate_identity(request, user_id)
     except Exception as e:
         log.exception(f"Error deleting user {user_id}: {e}")
         return HTTPBadRequest(json={'error': str(e)})
@@ -214,47 +276,11 @@ def delete_admin_user(request):
 
 @view_config(route_name='api_admin_articles', renderer='json', request_method='GET', permission='admin')
 def get_admin_articles(request):
-    if not request.user or not request.user.is_admin:
+    if not request.auth_identity or not request.auth_identity.is_admin:
         return HTTPForbidden(json={'error': 'Admin access required'})
     
     # Query articles
-    query = request.db.query(Article)
-    
-    # Filter by search term
-    search = request.params.get('search')
-    if search:
-        query = query.filter(
-            (Article.title.ilike(f'%{search}%')) |
-            (Article.content.ilike(f'%{search}%'))
-        )
-    
-    # Filter by category
-    category_id = request.params.get('category_id')
-    if category_id:
-        query = query.filter(Article.category_id == category_id)
-    
-    # Filter by author
-    author_id = request.params.get('author_id')
-    if author_id:
-        query = query.filter(Article.author_id == author_id)
-    
-    # Filter by status
-    status = request.params.get('status')
-    if status and status != 'all':
-        query = query.filter(Article.status == status)
-    
-    # Sort by
-    sort = request.params.get('sort', 'created_at')
-    direction = request.params.get('direction', 'desc')
-    
-    if sort == 'title':
-        query = query.order_by(Article.title.desc() if direction == 'desc' else Article.title)
-    elif sort == 'views':
-        query = query.order_by(Article.views.desc() if direction == 'desc' else Article.views)
-    elif sort == 'published_at':
-        query = query.order_by(Article.published_at.desc() if direction == 'desc' else Article.published_at)
-    else:  # default to created_at
-        query = query.order_by(Article.created_at.desc() if direction == 'desc' else Article.created_at)
+    query = filter_articles(request, request.db.query(Article).options(*article_load_options('list')))
     
     # Pagination
     page = int(request.params.get('page', 1))
@@ -281,8 +307,8 @@ def get_admin_articles(request):
                 'avatarUrl': article.author.avatar_url
             },
             'category': article.category.name if article.category else 'Uncategorized',
-            'created_at': article.created_at.isoformat(),
-            'published_at': article.published_at.isoformat() if article.published_at else None
+            'created_at': article.created_at,
+            'published_at': article.published_at
         })
     
     return {
@@ -295,9 +321,19 @@ def get_admin_articles(request):
         }
     }
 
+@view_config(route_name='api_admin_articles_export', request_method='GET', permission='admin')
+def export_admin_articles(request):
+    statement = select(
+        Article.id, Article.title, Article.slug, Article.excerpt, Article.image_url,
+        Article.views, Article.status, Article.author_id, User.username.label('author_username'),
+        Category.name.label('category'), Article.created_at, Article.published_at,
+    ).outerjoin(User, Article.author_id == User.id)\
+        .outerjoin(Category, Article.category_id == Category.id)
+    return admin_export(request, 'articles', filter_articles(request, statement))
+
 @view_config(route_name='api_admin_articles', renderer='json', request_method='POST', permission='admin')
 def create_admin_article(request):
-    if not request.user or not request.user.is_admin:
+    if not request.auth_identity or not request.auth_identity.is_admin:
         return HTTPForbidden(json={'error': 'Admin access required'})
     
     try:
@@ -360,14 +396,10 @@ def create_admin_article(request):
             
             # Jika ada tags, tambahkan
             if 'tags' in data and isinstance(data['tags'], list):
-                for tag_name in data['tags']:
-                    tag = request.db.query(Tag).filter(Tag.name == tag_name).first()
-                    if not tag:
-                        tag = Tag(name=tag_name)
-                        request.db.add(tag)
-                        request.db.flush()
-                    article.tags.append(tag)
+                article.tags = resolve_tags(request.db, data['tags'], request.registry.tag_cache)
             
+            invalidate_article(request, article)
+            schedule_related_update(request, article)
             log.info(f"Article created successfully with ID: {article.id}")
         article = request.db.query(Article).get(article_id)
         # Format response seperti format GET
@@ -386,8 +418,8 @@ def create_admin_article(request):
                 'avatarUrl': request.user.avatar_url
             },
             'category': article.category.name if article.category else 'Uncategorized',
-            'created_at': article.created_at.isoformat(),
-            'published_at': article.published_at.isoformat() if article.published_at else None,
+            'created_at': article.created_at,
+            'published_at': article.published_at,
             'tags': [{'id': tag.id, 'name': tag.name} for tag in article.tags]
         }
         
@@ -418,6 +450,9 @@ def delete_admin_article(request):
                 db.delete(comment)
 
             # Hapus artikel
+            invalidate_article(request, article)
+            invalidate(request, f'article:{article_id}:comments')
+            schedule_related_update(request, article)
             db.delete(article)
 
         return {'success': True, 'id': article_id}
@@ -428,39 +463,11 @@ def delete_admin_article(request):
 
 @view_config(route_name='api_admin_comments', renderer='json', request_method='GET', permission='admin')
 def get_admin_comments(request):
-    if not request.user or not request.user.is_admin:
+    if not request.auth_identity or not request.auth_identity.is_admin:
         return HTTPForbidden(json={'error': 'Admin access required'})
     
     # Query comments
-    query = request.db.query(Comment)
-    
-    # Filter by search term
-    search = request.params.get('search')
-    if search:
-        query = query.filter(Comment.text.ilike(f'%{search}%'))
-    
-    # Filter by article
-    article_id = request.params.get('article_id')
-    if article_id:
-        query = query.filter(Comment.article_id == article_id)
-    
-    # Filter by user
-    user_id = request.params.get('user_id')
-    if user_id:
-        query = query.filter(Comment.user_id == user_id)
-    
-    # Filter by approval status
-    is_approved = request.params.get('is_approved')
-    if is_approved is not None:
-        is_approved = is_approved.lower() == 'true'
-        query = query.filter(Comment.is_approved == is_approved)
-    
-    # Sort by
-    sort = request.params.get('sort', 'created_at')
-    direction = request.params.get('direction', 'desc')
-    
-    if sort == 'created_at':
-        query = query.order_by(Comment.created_at.desc() if direction == 'desc' else Comment.created_at)
+    query = filter_comments(request, request.db.query(Comment))
     
     # Pagination
     page = int(request.params.get('page', 1))
@@ -474,7 +481,7 @@ def get_admin_comments(request):
     for comment in comments:
         comments_data.append({
             'id': comment.id,
-            'text': comment.text,
+            'text': comment.content,
             'user': {
                 'id': comment.user.id,
                 'username': comment.user.username,
@@ -486,7 +493,7 @@ def get_admin_comments(request):
                 'title': comment.article.title
             },
             'is_approved': comment.is_approved,
-            'created_at': comment.created_at.isoformat()
+            'created_at': comment.created_at
         })
     
     return {
@@ -499,9 +506,19 @@ def get_admin_comments(request):
         }
     }
 
+@view_config(route_name='api_admin_comments_export', request_method='GET', permission='admin')
+def export_admin_comments(request):
+    statement = select(
+        Comment.id, Comment.content.label('text'), Comment.user_id, User.username,
+        Comment.article_id, Article.title.label('article_title'), Comment.thread_id,
+        Comment.is_approved, Comment.created_at,
+    ).outerjoin(User, Comment.user_id == User.id)\
+        .outerjoin(Article, Comment.article_id == Article.id)
+    return admin_export(request, 'comments', filter_comments(request, statement))
+
 @view_config(route_name='api_admin_approve_comment', renderer='json', request_method='POST', permission='admin')
 def approve_comment(request):
-    if not request.user or not request.user.is_admin:
+    if not request.auth_identity or not request.auth_identity.is_admin:
         return HTTPForbidden(json={'error': 'Admin access required'})
     
     comment_id = int(request.matchdict['id'])
@@ -512,12 +529,13 @@ def approve_comment(request):
     
     comment.is_approved = True
     request.db.add(comment)
+    invalidate_comment(request, comment)
     
     return {'success': True, 'message': 'Comment approved successfully'}
 
 @view_config(route_name='api_admin_reject_comment', renderer='json', request_method='POST', permission='admin')
 def reject_comment(request):
-    if not request.user or not request.user.is_admin:
+    if not request.auth_identity or not request.auth_identity.is_admin:
         return HTTPForbidden(json={'error': 'Admin access required'})
     
     comment_id = int(request.matchdict['id'])
@@ -528,19 +546,28 @@ def reject_comment(request):
     
     comment.is_approved = False
     request.db.add(comment)
+    invalidate_comment(request, comment)
     
     return {'success': True, 'message': 'Comment rejected successfully'}
 
 @view_config(route_name='api_admin_threads', renderer='json', request_method='GET', permission='view')
 def get_admin_threads(request):
-    print("Admin threads endpoint called")
-    print("User:", request.user)
-    print("Is admin:", request.user.is_admin if request.user else False)
-    if not request.user or not request.user.is_admin:
+    log.debug("Admin threads requested by identity %s", request.auth_identity)
+    if not request.auth_identity or not request.auth_identity.is_admin:
         return HTTPForbidden(json={'error': 'Admin access required'})
     
     # Ambil semua thread, tidak hanya milik user tertentu
-    threads = request.db.query(Thread).order_by(Thread.created_at.desc()).all()
+    query = filter_threads(request, request.db.query(Thread))
+    
+    # Tanpa page/per_page: bentuk lama, array semua thread tanpa meta
+    paginated = 'page' in request.params or 'per_page' in request.params
+    if paginated:
+        page = int(request.params.get('page', 1))
+        per_page = int(request.params.get('per_page', 10))
+        total = query.count()
+        query = query.limit(per_page).offset((page - 1) * per_page)
+    
+    threads = query.options(*thread_load_options('list')).all()
     
     result = []
     for thread in threads:
@@ -569,14 +596,33 @@ def get_admin_threads(request):
             'id': thread.id,
             'title': thread.title,
             'content': thread.content,
-            'created_at': thread.created_at.isoformat(),
-            'updated_at': thread.updated_at.isoformat() if thread.updated_at else None,
+            'created_at': thread.created_at,
+            'updated_at': thread.updated_at,
             'author': author,
             'tags': tags,
-            'comment_count': len(thread.comments) if hasattr(thread, 'comments') else 0
+            'comment_count': thread.comment_count or 0
         })
     
-    return result
+    if not paginated:
+        return result
+    
+    return {
+        'threads': result,
+        'meta': {
+            'total': total,
+            'page': page,
+            'per_page': per_page,
+            'total_pages': (total + per_page - 1) // per_page
+        }
+    }
+
+@view_config(route_name='api_admin_threads_export', request_method='GET', permission='admin')
+def export_admin_threads(request):
+    statement = select(
+        Thread.id, Thread.title, Thread.user_id, User.username,
+        thread_comment_count.label('comment_count'), Thread.created_at, Thread.updated_at,
+    ).outerjoin(User, Thread.user_id == User.id)
+    return admin_export(request, 'threads', filter_threads(request, statement))
 
 @view_config(route_name='api_admin_thread_delete', renderer='json', request_method='DELETE', permission='admin')
 def delete_admin_thread(request):
@@ -595,6 +641,7 @@ def delete_admin_thread(request):
                 return HTTPNotFound(json={'error': 'Thread not found'})
 
             db.delete(thread)
+            invalidate(request, 'threads')
     except Exception as e:
         traceback.print_exc()  # Ini akan print error lengkap di console backend
         return HTTPInternalServerError(json={'error': f'Failed to delete thread: {str(e)}'})
@@ -1,8 +1,24 @@
 from pyramid.view import view_config
-from pyramid.httpexceptions import HTTPNotFound, HTTPBadRequest, HTTPForbidden, HTTPCreated
-from ..models import Article, User, Category, Tag
+from pyramid.httpexceptions import (
+    HTTPNotFound, HTTPBadRequest, HTTPForbidden, HTTPRequestEntityTooLarge, HTTPServiceUnavailable,
+)
+from ..models import Article, User, Category, Tag, RelatedArticle, article_load_options
 from ..schemas import ArticleSchema, ArticleListSchema
-from sqlalchemy import desc
+from ..cache import cache_response, invalidate
+from ..services.images import ImageProcessorBusy, InvalidImage
+from ..services.related import TOP_K as RELATED_TOP_K, schedule_related_update
+from ..services.tags import resolve_tags
+from ..viewcount import counts_article_view
+from ..utils.conditional import make_etag, not_modified
+from ..utils.pagination import (
+    InvalidCursor,
+    decode_cursor,
+    encode_cursor,
+    estimate_count,
+    keyset_filter,
+    keyset_order,
+)
+from sqlalchemy import desc, func
 import datetime
 import re
 import string
@@ -21,7 +37,25 @@ def generate_slug(title):
     suffix = ''.join(random.choices(string.ascii_lowercase + string.digits, k=6))
     return f"{slug}-{suffix}"
 
+def invalidate_article(request, article, *category_ids):
+    """Invalidate cached responses that may include ``article``."""
+    category_ids = {article.category_id, *category_ids} - {None}
+    slugs = []
+    if category_ids:
+        slugs = [slug for slug, in request.db.query(Category.slug).filter(Category.id.in_(category_ids))]
+    invalidate(
+        request,
+        'articles',
+        f'article:{article.id}' if article.id else None,
+        *(f'category:{slug}' for slug in slugs)
+    )
+
+def _article_list_cache_tags(request):
+    category = request.params.get('category')
+    return ['articles', f'category:{category}'] if category else ['articles']
+
 @view_config(route_name='api_articles', renderer='json', request_method='GET')
+@cache_response(tags=_article_list_cache_tags)
 def get_articles(request):
     query = request.db.query(Article)
     
@@ -41,7 +75,7 @@ def get_articles(request):
         query = query.join(Article.author).filter(User.username == author)
     
     # Filter by status (only admins can see drafts)
-    if request.user and request.user.is_admin:
+    if request.auth_identity and request.auth_identity.is_admin:
         status = request.params.get('status', 'published')
         if status != 'all':
             query = query.filter(Article.status == status)
@@ -51,18 +85,36 @@ def get_articles(request):
     # Sort by date (default) or views
     sort_by = request.params.get('sort', 'date')
     if sort_by == 'views':
-        query = query.order_by(desc(Article.views))
+        sort_column = Article.views
     else:
-        query = query.order_by(desc(Article.published_at))
+        sort_by = 'date'
+        sort_column = Article.published_at
+    query = query.order_by(*keyset_order(sort_column, Article.id))
     
-    # Pagination
-    page = int(request.params.get('page', 1))
     per_page = int(request.params.get('per_page', 10))
-    total = query.count()
     
-    articles = query.limit(per_page).offset((page - 1) * per_page).all()
+    # Cursor (keyset) pagination
+    if 'cursor' in request.params:
+        return _get_articles_page_by_cursor(request, query, sort_by, sort_column, per_page)
+    
+    # Pagination
+    page = int(request.params.get('page', 1))
     
-    schema = ArticleListSchema(many=True)
+    # Satu query agregat untuk total sekaligus validator ETag; views ikut
+    # dijumlahkan karena penghitung views tidak mengubah updated_at
+    total, last_updated, total_views = query.order_by(None).with_entities(
+        func.count(Article.id), func.max(Article.updated_at), func.sum(Article.views)
+    ).one()
+    not_modified_response = not_modified(
+        request, make_etag('articles', page, per_page, total, last_updated, total_views)
+    )
+    if not_modified_response is not None:
+        return not_modified_response
+    
+    articles = query.options(*article_load_options('list'))\
+        .limit(per_page).offset((page - 1) * per_page).all()
+    
+    schema = request.registry.schemas.dumper(ArticleListSchema, many=True)
     return {
         'articles': schema.dump(articles),
         'meta': {
@@ -73,47 +125,116 @@ def get_articles(request):
         }
     }
 
+def _get_articles_page_by_cursor(request, query, sort_by, sort_column, per_page):
+    """Keyset page of articles after the row encoded in the ``cursor`` param."""
+    cursor = request.params.get('cursor')
+    filtered = query
+    if cursor:
+        try:
+            value, last_id = decode_cursor(cursor, sort_by)
+        except InvalidCursor as e:
+            return HTTPBadRequest(json={'error': str(e)})
+        filtered = query.filter(keyset_filter(sort_column, Article.id, value, last_id))
+    
+    # Ambil satu baris ekstra untuk mengetahui apakah masih ada halaman berikutnya
+    articles = filtered.options(*article_load_options('list')).limit(per_page + 1).all()
+    next_cursor = None
+    if len(articles) > per_page:
+        articles = articles[:per_page]
+        last = articles[-1]
+        value = last.views if sort_by == 'views' else last.published_at
+        next_cursor = encode_cursor(sort_by, value, last.id)
+    
+    # Total bersifat opsional: exact, estimate (default) atau none
+    count_mode = request.params.get('total', 'estimate')
+    total = None
+    if count_mode == 'exact':
+        total = query.order_by(None).count()
+    elif count_mode == 'estimate':
+        total = estimate_count(query.order_by(None))
+    
+    # Tanpa query total, ETag dihitung dari baris halaman ini saja
+    not_modified_response = not_modified(request, make_etag(
+        'articles', next_cursor, total, [(a.id, a.updated_at, a.views) for a in articles]
+    ))
+    if not_modified_response is not None:
+        return not_modified_response
+    
+    schema = request.registry.schemas.dumper(ArticleListSchema, many=True)
+    return {
+        'articles': schema.dump(articles),
+        'next_cursor': next_cursor,
+        'pagination': {
+            'per_page': per_page,
+            'total': total,
+            'total_is_estimate': count_mode == 'estimate',
+        }
+    }
+
 @view_config(route_name='api_article', renderer='json', request_method='GET')
+@counts_article_view
+@cache_response(tags=lambda request: [f"article:{request.matchdict['id']}"])
 def get_article(request):
     
     article_id = int(request.matchdict['id'])
     
     db = request.db
-    article = db.query(Article).filter(Article.id == article_id).first()
+    query = db.query(Article).filter(Article.id == article_id)
+    # Saat klien melakukan revalidasi, validator dicek dulu dengan query
+    # ringan; artikel lengkap hanya dimuat jika versinya sudah berubah
+    revalidating = bool(request.if_none_match)
+    if revalidating:
+        article = query.with_entities(Article.status, Article.author_id, Article.updated_at, Article.views).first()
+    else:
+        article = query.options(*article_load_options('detail')).first()
     
     if not article:
         return HTTPNotFound(json={'error': 'Article not found'})
     
-    if article.status == 'draft' and (not request.user or (not request.user.is_admin and request.user.id != article.author_id)):
+    if article.status == 'draft' and (not request.auth_identity or (not request.auth_identity.is_admin and request.auth_identity.id != article.author_id)):
         return HTTPNotFound(json={'error': 'Article not found'})
     
-    schema = ArticleSchema()
-    article_data = schema.dump(article)
+    # views ikut di ETag. Tanpa Last-Modified: flush view count tidak mengubah
+    # updated_at, jadi If-Modified-Since akan menjawab 304 dengan views lama
+    not_modified_response = not_modified(
+        request, make_etag('article', article_id, article.updated_at, article.views)
+    )
+    if not_modified_response is not None:
+        return not_modified_response
     
-    try:
-        with transaction.manager:
-            article_to_update = db.query(Article).filter(Article.id == article_id).first()
-            if article_to_update:
-                article_to_update.views += 1
-                db.add(article_to_update)
-    except Exception as e:
-        import logging
-        log = logging.getLogger(__name__)
-        log.error(f"Error incrementing view count for article {article_id}: {e}")
+    if revalidating:
+        article = query.options(*article_load_options('detail')).first()
     
-    return article_data
+    schema = request.registry.schemas.get(ArticleSchema)
+    return schema.dump(article)
 
 @view_config(route_name='api_articles_related', renderer='json', request_method='GET')
+@cache_response(tags=['articles'])
 def get_related_articles(request):
     # Ambil parameter dari query string
     category_id = request.params.get('categoryId')
     article_id = request.params.get('articleId')
     tags = request.params.getall('tags[]') if 'tags[]' in request.params else []
-    limit = int(request.params.get('limit', 6))
+    limit = min(int(request.params.get('limit', 6)), RELATED_TOP_K)
     
-    # Buat query dasar
     db = request.db
-    query = db.query(Article).filter(Article.status == 'published')
+    schema = request.registry.schemas.dumper(ArticleListSchema, many=True)
+    
+    # Daftar yang sudah dihitung (services/related.py): satu query lewat
+    # primary key related_articles
+    if article_id:
+        articles = db.query(Article).options(*article_load_options('list'))\
+            .join(RelatedArticle, RelatedArticle.related_id == Article.id)\
+            .filter(RelatedArticle.article_id == int(article_id), Article.status == 'published')\
+            .order_by(RelatedArticle.rank)\
+            .limit(limit)\
+            .all()
+        if articles:
+            return schema.dump(articles)
+    
+    # Belum dihitung (mis. batch belum pernah jalan): hitung langsung
+    query = db.query(Article).options(*article_load_options('list'))\
+        .filter(Article.status == 'published')
     
     # Exclude artikel saat ini
     if article_id:
@@ -150,6 +271,7 @@ def get_related_articles(request):
         
         # Ambil artikel terbaru yang belum diambil
         recent_articles = db.query(Article)\
+            .options(*article_load_options('list'))\
             .filter(Article.status == 'published')\
             .filter(Article.id.notin_(existing_ids))\
             .order_by(Article.published_at.desc())\
@@ -158,7 +280,6 @@ def get_related_articles(request):
         
         articles.extend(recent_articles)
     
-    schema = ArticleListSchema(many=True)
     return schema.dump(articles)
 
 
@@ -168,7 +289,7 @@ def create_article(request):
         return HTTPForbidden(json={'error': 'Authentication required'})
     
     try:
-        schema = ArticleSchema()
+        schema = request.registry.schemas.get(ArticleSchema)
         data = schema.load(request.json_body)
     except Exception as e:
         return HTTPBadRequest(json={'error': str(e)})
@@ -191,22 +312,20 @@ def create_article(request):
         )
         
         if 'tags' in data and isinstance(data['tags'], list):
-            for tag_name in data['tags']:
-                tag = request.db.query(Tag).filter(Tag.name == tag_name).first()
-                if not tag:
-                    tag = Tag(name=tag_name)
-                    request.db.add(tag)
-                    request.db.flush()
-                article.tags.append(tag)
+            article.tags = resolve_tags(request.db, data['tags'], request.registry.tag_cache)
         
         request.db.add(article)
+        invalidate_article(request, article)
+        schedule_related_update(request, article)
     
-    return HTTPCreated(json=schema.dump(article))
+    request.response.status = 201
+    return schema.dump(article)
 
 @view_config(route_name='api_article', renderer='json', request_method='PUT', permission='edit')
 def update_article(request):
     article_id = int(request.matchdict['id'])
-    article = request.db.query(Article).filter(Article.id == article_id).first()
+    article = request.db.query(Article).options(*article_load_options('detail'))\
+        .filter(Article.id == article_id).first()
     
     if not article:
         return HTTPNotFound(json={'error': 'Article not found'})
@@ -216,11 +335,13 @@ def update_article(request):
         return HTTPForbidden(json={'error': 'You do not have permission to edit this article'})
     
     try:
-        schema = ArticleSchema()
+        schema = request.registry.schemas.get(ArticleSchema)
         data = schema.load(request.json_body, partial=True)
     except Exception as e:
         return HTTPBadRequest(json={'error': str(e)})
     
+    old_category_id = article.category_id
+    
     # Update article fields
     if 'title' in data:
         article.title = data['title']
@@ -235,6 +356,9 @@ def update_article(request):
     
     if 'image_url' in data:
         article.image_url = data['image_url']
+        # Varian lama hanya berlaku untuk gambar yang diunggah
+        if article.image_variants and data['image_url'] != article.image_variants.get('src'):
+            article.image_variants = None
     
     if 'status' in data:
         old_status = article.status
@@ -250,20 +374,61 @@ def update_article(request):
     
     # Update tags if provided
     if 'tags' in data and isinstance(data['tags'], list):
-        # Clear existing tags
-        article.tags = []
-        
-        # Add new tags
-        for tag_name in data['tags']:
-            tag = request.db.query(Tag).filter(Tag.name == tag_name).first()
-            if not tag:
-                tag = Tag(name=tag_name)
-                request.db.add(tag)
-                request.db.flush()
-            article.tags.append(tag)
+        article.tags = resolve_tags(request.db, data['tags'], request.registry.tag_cache)
+    
+    request.db.add(article)
+    invalidate_article(request, article, old_category_id)
+    if {'tags', 'category_id', 'status'} & data.keys():
+        schedule_related_update(request, article)
+    
+    return schema.dump(article)
+
+@view_config(route_name='api_article_image', renderer='json', request_method='POST', permission='edit')
+def upload_article_image(request):
+    """Store a multipart ``image`` upload as responsive variants of the article image.
+
+    The image is processed before the article is loaded, so the request
+    holds no database connection while it waits for the image processor.
+    Variants of an upload for a missing article stay on disk; their names
+    are content hashes, so a later upload of the same file reuses them.
+    """
+    article_id = int(request.matchdict['id'])
+    
+    upload = request.POST.get('image')
+    if upload is None or not hasattr(upload, 'file'):
+        return HTTPBadRequest(json={'error': 'Multipart field "image" is required'})
+    
+    max_size = request.registry.image_max_upload_size
+    data = upload.file.read(max_size + 1)
+    if len(data) > max_size:
+        return HTTPRequestEntityTooLarge(json={'error': f'Image is larger than {max_size} bytes'})
     
+    try:
+        variants = request.registry.image_processor.process(data)
+    except InvalidImage:
+        return HTTPBadRequest(json={'error': 'File is not a supported image'})
+    except ImageProcessorBusy:
+        return HTTPServiceUnavailable(
+            json={'error': 'Server is busy, please try again shortly'},
+            headers={'Retry-After': '1'}
+        )
+    
+    article = request.db.query(Article).options(*article_load_options('detail'))\
+        .filter(Article.id == article_id).first()
+    
+    if not article:
+        return HTTPNotFound(json={'error': 'Article not found'})
+    
+    if not request.user.is_admin and request.user.id != article.author_id:
+        return HTTPForbidden(json={'error': 'You do not have permission to edit this article'})
+    
+    article.image_url = variants['src']
+    article.image_variants = variants
+    article.updated_at = datetime.datetime.utcnow()
     request.db.add(article)
+    invalidate_article(request, article)
     
+    schema = request.registry.schemas.get(ArticleSchema)
     return schema.dump(article)
 
 @view_config(route_name='api_article', renderer='json', request_method='DELETE', permission='edit')
@@ -278,6 +443,9 @@ def delete_article(request):
     if not request.user.is_admin and request.user.id != article.author_id:
         return HTTPForbidden(json={'error': 'You do not have permission to delete this article'})
     
+    invalidate_article(request, article)
+    invalidate(request, f'article:{article_id}:comments')
+    schedule_related_update(request, article)
     request.db.delete(article)
     
     return {'success': True, 'message': 'Article deleted successfully'}
@@ -1,29 +1,44 @@
 from pyramid.view import view_config
-from pyramid.httpexceptions import HTTPBadRequest, HTTPUnauthorized, HTTPCreated
+from pyramid.httpexceptions import HTTPBadRequest, HTTPUnauthorized, HTTPServiceUnavailable
 from ..models import User
 from ..schemas import LoginSchema, RegisterSchema
-from ..utils.password import hash_password, verify_password
+from ..utils.password import PasswordHasherBusy
 from ..utils.jwt import create_token
 import datetime
 import re
 
+def busy_response():
+    """503 for password operations rejected because the hashing queue is full."""
+    return HTTPServiceUnavailable(
+        json={'error': 'Server is busy, please try again shortly'},
+        headers={'Retry-After': '1'}
+    )
+
 @view_config(route_name='api_login', renderer='json', request_method='POST')
 def login(request):
     try:
-        schema = LoginSchema()
+        schema = request.registry.schemas.get(LoginSchema)
         data = schema.load(request.json_body)
     except Exception as e:
         return HTTPBadRequest(json={'error': str(e)})
     
     user = request.db.query(User).filter(User.email == data['email']).first()
+    hasher = request.registry.password_hasher
     
-    if not user or not verify_password(user.password_hash, data['password']):
-        return HTTPUnauthorized(json={'error': 'Invalid email or password'})
-    
-    if not user.is_active:
-        return HTTPUnauthorized(json={'error': 'Account is deactivated'})
+    try:
+        if not user or not hasher.verify(user.password_hash, data['password']):
+            return HTTPUnauthorized(json={'error': 'Invalid email or password'})
+        
+        if not user.is_active:
+            return HTTPUnauthorized(json={'error': 'Account is deactivated'})
+        
+        # Hash ulang jika cost bcrypt di konfigurasi sudah berubah
+        if hasher.needs_rehash(user.password_hash):
+            user.password_hash = hasher.hash(data['password'])
+    except PasswordHasherBusy:
+        return busy_response()
     
-    token = create_token(user.id, request, admin=user.is_admin)
+    token = create_token(user.id, request, admin=user.is_admin, version=user.token_version)
     
     return {
         'token': token,
@@ -40,7 +55,7 @@ def login(request):
 @view_config(route_name='api_register', renderer='json', request_method='POST')
 def register(request):
     try:
-        schema = RegisterSchema()
+        schema = request.registry.schemas.get(RegisterSchema)
         data = schema.load(request.json_body)
     except Exception as e:
         return HTTPBadRequest(json={'error': str(e)})
@@ -57,11 +72,16 @@ def register(request):
     if request.db.query(User).filter(User.email == data['email']).first():
         return HTTPBadRequest(json={'error': 'Email already exists'})
     
+    try:
+        password_hash = request.registry.password_hasher.hash(data['password'])
+    except PasswordHasherBusy:
+        return busy_response()
+    
     # Create new user
     user = User(
         username=data['username'],
         email=data['email'],
-        password_hash=hash_password(data['password']),
+        password_hash=password_hash,
         full_name=data.get('full_name', ''),
         created_at=datetime.datetime.utcnow(),
     )
@@ -69,9 +89,10 @@ def register(request):
     request.db.add(user)
     request.db.flush()  # To get the user ID
     
-    token = create_token(user.id, request)
+    token = create_token(user.id, request, version=user.token_version)
     
-    return HTTPCreated(json={
+    request.response.status = 201
+    return {
         'token': token,
         'user': {
             'id': user.id,
@@ -79,7 +100,7 @@ def register(request):
             'email': user.email,
             'full_name': user.full_name,
         }
-    })
+    }
 
 @view_config(route_name='api_me', renderer='json', request_method='GET', permission='view')
 def get_current_user(request):
@@ -94,6 +115,6 @@ def get_current_user(request):
         'bio': user.bio,
         'avatar_url': user.avatar_url,
         'is_admin': user.is_admin,
-        'created_at': user.created_at.isoformat(),
+        'created_at': user.created_at,
     }
 
@@ -1,8 +1,10 @@
 # hoopsnewsid/api/categories.py
 from pyramid.view import view_config
 from ..models.category import Category
+from ..cache import cache_response
 
 @view_config(route_name='categories', renderer='json', request_method='GET')
+@cache_response(ttl=300, tags=['categories'])
 def get_categories(request):
     try:
         categories = request.db.query(Category).all()  # gunakan request.db
@@ -1,26 +1,50 @@
 from pyramid.view import view_config
-from pyramid.httpexceptions import HTTPNotFound, HTTPBadRequest, HTTPForbidden, HTTPCreated
+from pyramid.httpexceptions import HTTPNotFound, HTTPBadRequest, HTTPForbidden
 from ..models import Comment, Article
 from ..schemas import CommentSchema
+from ..cache import cache_response, invalidate
+from ..services.comment_tree import load_comment_tree
 import datetime
 
+def invalidate_comment(request, comment):
+    """Invalidate cached responses that list or count ``comment``."""
+    invalidate(
+        request,
+        f'article:{comment.article_id}:comments' if comment.article_id else None,
+        'threads' if comment.thread_id else None
+    )
+
 @view_config(route_name='api_article_comments', renderer='json', request_method='GET')
+@cache_response(tags=lambda request: [f"article:{request.matchdict['id']}:comments"])
 def get_article_comments(request):
     article_id = int(request.matchdict['id'])
-    article = request.db.query(Article).filter(Article.id == article_id).first()
+    article = request.db.query(Article.id).filter(Article.id == article_id).first()
     
     if not article:
         return HTTPNotFound(json={'error': 'Article not found'})
     
-    # Get top-level comments (no parent)
-    comments = request.db.query(Comment).filter(
-        Comment.article_id == article_id,
-        Comment.parent_id == None,
-        Comment.is_approved == True
-    ).order_by(Comment.created_at.desc()).all()
+    # Komentar level atas beserta balasannya dalam satu query (recursive CTE)
+    depth = int(request.params.get('depth', 1))
+    page = int(request.params['page']) if 'page' in request.params else None
+    per_page = int(request.params.get('per_page', 20))
+    total, comments = load_comment_tree(
+        request.db, article_id=article_id, page=page, per_page=per_page,
+        max_depth=depth, approved_only=True
+    )
     
-    schema = CommentSchema(many=True)
-    return schema.dump(comments)
+    schema = request.registry.schemas.dumper(CommentSchema, many=True)
+    if page is None:
+        return schema.dump(comments)
+    
+    return {
+        'comments': schema.dump(comments),
+        'meta': {
+            'total': total,
+            'page': page,
+            'per_page': per_page,
+            'total_pages': (total + per_page - 1) // per_page
+        }
+    }
 
 @view_config(route_name='api_article_comments', renderer='json', request_method='POST', permission='create')
 def add_comment(request):
@@ -34,7 +58,7 @@ def add_comment(request):
         return HTTPNotFound(json={'error': 'Article not found'})
     
     try:
-        schema = CommentSchema()
+        schema = request.registry.schemas.get(CommentSchema)
         data = schema.load(request.json_body)
     except Exception as e:
         return HTTPBadRequest(json={'error': str(e)})
@@ -52,8 +76,11 @@ def add_comment(request):
     
     request.db.add(comment)
     request.db.flush()
+    invalidate_comment(request, comment)
     
-    return HTTPCreated(json=schema.dump(comment))
+    request.response.status = 201
+    # Tanpa replies: pohon balasan hanya di-dump oleh view pohon komentar
+    return request.registry.schemas.dumper(CommentSchema, exclude=('replies',)).dump(comment)
 
 @view_config(route_name='api_comment', renderer='json', request_method='PUT', permission='edit')
 def update_comment(request):
@@ -68,7 +95,7 @@ def update_comment(request):
         return HTTPForbidden(json={'error': 'You do not have permission to edit this comment'})
     
     try:
-        schema = CommentSchema()
+        schema = request.registry.schemas.get(CommentSchema)
         data = schema.load(request.json_body, partial=True)
     except Exception as e:
         return HTTPBadRequest(json={'error': str(e)})
@@ -79,8 +106,9 @@ def update_comment(request):
     
     comment.updated_at = datetime.datetime.utcnow()
     request.db.add(comment)
+    invalidate_comment(request, comment)
     
-    return schema.dump(comment)
+    return request.registry.schemas.dumper(CommentSchema, exclude=('replies',)).dump(comment)
 
 @view_config(route_name='api_comment', renderer='json', request_method='DELETE', permission='edit')
 def delete_comment(request):
@@ -94,6 +122,7 @@ def delete_comment(request):
     if not request.user.is_admin and request.user.id != comment.user_id:
         return HTTPForbidden(json={'error': 'You do not have permission to delete this comment'})
     
+    invalidate_comment(request, comment)
     request.db.delete(comment)
     
     return {'success': True, 'message': 'Comment deleted successfully'}
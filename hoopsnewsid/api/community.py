@@ -1,44 +1,117 @@
 from pyramid.view import view_config
-from pyramid.httpexceptions import HTTPNotFound, HTTPBadRequest, HTTPForbidden, HTTPCreated
-from sqlalchemy.orm import joinedload
-from sqlalchemy import desc
+from pyramid.httpexceptions import HTTPNotFound, HTTPBadRequest, HTTPForbidden
+from sqlalchemy import desc, func, select
 import datetime
 from marshmallow import ValidationError
 import transaction
 
-from ..models import Thread, Comment, User, Tag
+from ..models import Thread, Comment, User, thread_load_options
 from ..schemas.thread import ThreadSchema, ThreadDetailSchema
 from ..schemas.comment import CommentSchema
 from ..security import require_auth
+from ..cache import cache_response, invalidate
+from ..services.comment_tree import MAX_REPLY_DEPTH, load_comment_tree, load_flat_comments
+from ..services.tags import resolve_tags
+from ..utils.conditional import make_etag, not_modified
 
 @view_config(route_name='api_threads', renderer='json', request_method='GET')
+@cache_response(tags=['threads'])
 def get_threads(request):
     db = request.db
-    threads = db.query(Thread).options(
-        joinedload(Thread.user),
-        joinedload(Thread.tags)
-    ).order_by(desc(Thread.created_at)).all()
+    query = db.query(Thread).order_by(desc(Thread.created_at), desc(Thread.id))
+    dumper = request.registry.schemas.dumper(ThreadSchema, many=True)
     
-    for thread in threads:
-        thread.comment_count = len(thread.comments)
+    if 'page' not in request.params and 'per_page' not in request.params:
+        # Bentuk lama untuk klien yang ada: array semua thread tanpa meta
+        # comment_count dihitung lewat subquery, tanpa memuat semua komentar
+        threads = query.options(*thread_load_options('list')).all()
+        not_modified_response = not_modified(request, make_etag(
+            'threads', [(t.id, t.updated_at, t.comment_count) for t in threads]
+        ))
+        if not_modified_response is not None:
+            return not_modified_response
+        return dumper.dump(threads)
     
-    return ThreadSchema(many=True).dump(threads)
+    # Pagination
+    page = int(request.params.get('page', 1))
+    per_page = int(request.params.get('per_page', 20))
+    total = query.count()
+    
+    threads = query.options(*thread_load_options('list'))\
+        .limit(per_page).offset((page - 1) * per_page).all()
+    
+    # Jumlah komentar ikut divalidasi karena komentar baru tidak mengubah
+    # updated_at thread
+    not_modified_response = not_modified(request, make_etag(
+        'threads', page, per_page, total,
+        [(t.id, t.updated_at, t.comment_count) for t in threads]
+    ))
+    if not_modified_response is not None:
+        return not_modified_response
+    
+    return {
+        'threads': dumper.dump(threads),
+        'meta': {
+            'total': total,
+            'page': page,
+            'per_page': per_page,
+            'total_pages': (total + per_page - 1) // per_page
+        }
+    }
 
 
 @view_config(route_name='api_thread_detail', renderer='json', request_method='GET')
 def get_thread_detail(request):
     thread_id = int(request.matchdict['id'])
     db = request.db
-    thread = db.query(Thread).options(
-        joinedload(Thread.user),
-        joinedload(Thread.comments).joinedload(Comment.user),
-        joinedload(Thread.tags)
-    ).filter(Thread.id == thread_id).first()
     
-    if not thread:
+    # Validator: updated_at thread plus jumlah dan perubahan terakhir komentarnya
+    comments = select(Comment.id, Comment.updated_at).where(Comment.thread_id == thread_id)
+    head = db.query(Thread.updated_at)\
+        .add_columns(
+            select(func.count(comments.c.id)).scalar_subquery(),
+            select(func.max(comments.c.updated_at)).scalar_subquery(),
+        )\
+        .filter(Thread.id == thread_id).first()
+    
+    if not head:
         return HTTPNotFound(json={'error': 'Thread not found'})
     
-    return ThreadDetailSchema().dump(thread)
+    not_modified_response = not_modified(request, make_etag('thread', thread_id, *head))
+    if not_modified_response is not None:
+        return not_modified_response
+    
+    thread = db.query(Thread).options(*thread_load_options('list'))\
+        .filter(Thread.id == thread_id).first()
+    
+    data = request.registry.schemas.get(ThreadDetailSchema, exclude=('comments',)).dump(thread)
+    page = int(request.params['page']) if 'page' in request.params else None
+    
+    if 'depth' not in request.params and page is None:
+        # Bentuk lama untuk klien yang ada: semua komentar thread secara
+        # datar, masing-masing dengan balasan langsungnya
+        comments = load_flat_comments(db, thread_id=thread_id)
+        data['comments'] = request.registry.schemas.dumper(
+            CommentSchema, many=True, exclude=('replies.replies',)
+        ).dump(comments)
+        return data
+    
+    # Pohon komentar (level atas + balasan) dimuat dengan satu recursive CTE
+    depth = int(request.params.get('depth', MAX_REPLY_DEPTH))
+    per_page = int(request.params.get('per_page', 20))
+    total, comments = load_comment_tree(
+        db, thread_id=thread_id, page=page, per_page=per_page, max_depth=depth
+    )
+    
+    data['comments'] = request.registry.schemas.dumper(CommentSchema, many=True).dump(comments)
+    if page is not None:
+        data['comments_meta'] = {
+            'total': total,
+            'page': page,
+            'per_page': per_page,
+            'total_pages': (total + per_page - 1) // per_page
+        }
+    return data
 
 
 @view_config(route_name='api_threads', renderer='json', request_method='POST')
@@ -47,7 +120,7 @@ def create_thread(context, request):
     user = request.user
     thread_data = request.json_body
 
-    schema = ThreadSchema()
+    schema = request.registry.schemas.get(ThreadSchema)
     try:
         validated_data = schema.load(thread_data)
     except ValidationError as e:
@@ -69,8 +142,10 @@ def create_thread(context, request):
         )
         
         db.add(new_thread)
+        invalidate(request, 'threads')
         
         # Proses tags
+        cleaned_tags = []
         for tag_name in tag_names:
             # Pastikan tag_name adalah string sederhana, bukan representasi objek
             if tag_name.startswith('<Tag(') and tag_name.endswith(')>'):
@@ -79,12 +154,8 @@ def create_thread(context, request):
                 match = re.search(r"name='([^']+)'", tag_name)
                 if match:
                     tag_name = match.group(1)
-            
-            tag = db.query(Tag).filter(Tag.name == tag_name).first()
-            if not tag:
-                tag = Tag(name=tag_name)
-                db.add(tag)
-            new_thread.tags.append(tag)
+            cleaned_tags.append(tag_name)
+        new_thread.tags = resolve_tags(db, cleaned_tags, request.registry.tag_cache)
 
     # Buat response sederhana
     response_data = {
@@ -98,10 +169,11 @@ def create_thread(context, request):
             'username': user.username,
             'avatar_url': getattr(user, 'avatar_url', None)
         },
-        'created_at': datetime.datetime.utcnow().isoformat()
+        'created_at': datetime.datetime.utcnow()
     }
     
-    return HTTPCreated(json=response_data)
+    request.response.status = 201
+    return response_data
 
 
 @view_config(route_name='api_thread_detail', renderer='json', request_method='PUT')
@@ -111,7 +183,7 @@ def update_thread(context, request):
     user = request.user
     thread_data = request.json_body
     
-    schema = ThreadSchema()
+    schema = request.registry.schemas.get(ThreadSchema)
     try:
         validated_data = schema.load(thread_data, partial=True)
     except ValidationError as e:
@@ -156,16 +228,11 @@ def update_thread(context, request):
             thread.content = updated_content
             
         if 'tags' in validated_data:
-            # Clear existing tags
-            thread.tags = []
-            for tag_name in cleaned_tags:  # Gunakan cleaned_tags yang sudah dibersihkan
-                tag = db.query(Tag).filter(Tag.name == tag_name).first()
-                if not tag:
-                    tag = Tag(name=tag_name)
-                    db.add(tag)
-                thread.tags.append(tag)
+            # Gunakan cleaned_tags yang sudah dibersihkan
+            thread.tags = resolve_tags(db, cleaned_tags, request.registry.tag_cache)
                 
         thread.updated_at = datetime.datetime.utcnow()
+        invalidate(request, 'threads')
     
     # Buat response sederhana dengan data yang sudah disimpan
     response_data = {
@@ -196,6 +263,7 @@ def delete_thread(context, request):
             return HTTPForbidden(json={'error': 'You can only delete your own threads'})
             
         db.delete(thread)
+        invalidate(request, 'threads')
     
     return {'success': True, 'message': 'Thread deleted successfully'}
 
@@ -207,7 +275,7 @@ def add_comment(context, request):
     user = request.user
     comment_data = request.json_body
     
-    schema = CommentSchema()
+    schema = request.registry.schemas.get(CommentSchema)
     try:
         # Tambahkan thread_id ke data sebelum validasi jika tidak ada
         if 'thread_id' not in comment_data:
@@ -238,6 +306,7 @@ def add_comment(context, request):
         )
         
         db.add(new_comment)
+        invalidate(request, 'threads')
     
     # Buat response sederhana
     response_data = {
@@ -250,10 +319,11 @@ def add_comment(context, request):
             'username': user.username,
             'avatar_url': getattr(user, 'avatar_url', None)
         },
-        'created_at': datetime.datetime.utcnow().isoformat()
+        'created_at': datetime.datetime.utcnow()
     }
     
-    return HTTPCreated(json=response_data)
+    request.response.status = 201
+    return response_data
 
 
 @view_config(route_name='api_comment_detail', renderer='json', request_method='DELETE')
@@ -277,5 +347,6 @@ def delete_comment(context, request):
             return HTTPForbidden(json={'error': 'You can only delete your own comments'})
             
         db.delete(comment)
+        invalidate(request, 'threads')
     
     return {'success': True, 'message': 'Comment deleted successfully'}
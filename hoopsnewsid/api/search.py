@@ -0,0 +1,68 @@
+from pyramid.view import view_config
+from pyramid.httpexceptions import HTTPBadRequest
+from ..models import Article, Thread, Comment, article_load_options, thread_load_options
+from ..schemas import ArticleListSchema, CommentSchema, ThreadSchema
+from ..services.search import search
+from sqlalchemy.orm import joinedload
+
+# Tipe yang bisa dicari: model, filter publik, loader options, (schema, options)
+SEARCH_TYPES = {
+    'articles': (
+        Article,
+        (Article.status == 'published',),
+        article_load_options('list'),
+        (ArticleListSchema, {}),
+    ),
+    'threads': (
+        Thread,
+        (),
+        thread_load_options('list'),
+        (ThreadSchema, {}),
+    ),
+    'comments': (
+        Comment,
+        (Comment.is_approved == True,),
+        (joinedload(Comment.user),),
+        (CommentSchema, {'exclude': ('replies',)}),
+    ),
+}
+
+@view_config(route_name='api_search', renderer='json', request_method='GET')
+def search_content(request):
+    q = request.params.get('q', '').strip()
+    if not q:
+        return HTTPBadRequest(json={'error': 'Query parameter q is required'})
+    
+    search_type = request.params.get('type', 'articles')
+    if search_type not in SEARCH_TYPES:
+        return HTTPBadRequest(json={'error': f'type must be one of {", ".join(SEARCH_TYPES)}'})
+    model, filters, options, (schema_class, schema_options) = SEARCH_TYPES[search_type]
+    
+    # Pagination
+    page = int(request.params.get('page', 1))
+    per_page = min(int(request.params.get('per_page', 10)), 50)
+    
+    total, rows = search(
+        request.db, model, q,
+        page=page, per_page=per_page, filters=filters, options=options
+    )
+    
+    schema = request.registry.schemas.dumper(schema_class, **schema_options)
+    results = []
+    for instance, rank, highlight in rows:
+        item = schema.dump(instance)
+        item['rank'] = rank
+        item['highlight'] = highlight
+        results.append(item)
+    
+    return {
+        'type': search_type,
+        'query': q,
+        'results': results,
+        'meta': {
+            'total': total,
+            'page': page,
+            'per_page': per_page,
+            'total_pages': (total + per_page - 1) // per_page
+        }
+    }
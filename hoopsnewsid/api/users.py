@@ -1,8 +1,11 @@
 from pyramid.view import view_config
 from pyramid.httpexceptions import HTTPNotFound, HTTPBadRequest, HTTPForbidden
-from ..models import User, Article
+from ..models import User, Article, article_load_options
 from ..schemas import UserProfileSchema, UserSchema
-from ..utils.password import hash_password, verify_password
+from ..utils.password import PasswordHasherBusy
+from ..utils.jwt import create_token
+from ..security import invalidate_identity
+from .auth import busy_response
 from sqlalchemy import func
 
 @view_config(route_name='api_user_profile', renderer='json', request_method='GET')
@@ -32,7 +35,7 @@ def get_user_profile(request):
         'following_count': 0,  # Placeholder for future implementation
     }
     
-    schema = UserProfileSchema()
+    schema = request.registry.schemas.get(UserProfileSchema)
     return schema.dump(profile_data)
 
 @view_config(route_name='api_user_articles', renderer='json', request_method='GET')
@@ -44,10 +47,11 @@ def get_user_articles(request):
         return HTTPNotFound(json={'error': 'User not found'})
     
     # Query user articles
-    query = request.db.query(Article).filter(Article.author_id == user.id)
+    query = request.db.query(Article).options(*article_load_options('list'))\
+        .filter(Article.author_id == user.id)
     
     # Only show published articles unless it's the user themselves or an admin
-    if not request.user or (request.user.id != user.id and not request.user.is_admin):
+    if not request.auth_identity or (request.auth_identity.id != user.id and not request.auth_identity.is_admin):
         query = query.filter(Article.status == 'published')
     
     # Sort by date
@@ -61,7 +65,7 @@ def get_user_articles(request):
     articles = query.limit(per_page).offset((page - 1) * per_page).all()
     
     from ..schemas import ArticleListSchema
-    schema = ArticleListSchema(many=True)
+    schema = request.registry.schemas.dumper(ArticleListSchema, many=True)
     
     return {
         'articles': schema.dump(articles),
@@ -79,7 +83,7 @@ def update_profile(request):
         return HTTPForbidden(json={'error': 'Authentication required'})
     
     try:
-        schema = UserSchema()
+        schema = request.registry.schemas.get(UserSchema)
         data = schema.load(request.json_body, partial=True)
     except Exception as e:
         return HTTPBadRequest(json={'error': str(e)})
@@ -116,17 +120,29 @@ def change_password(request):
         return HTTPBadRequest(json={'error': 'Current password and new password are required'})
     
     user = request.user
+    hasher = request.registry.password_hasher
     
-    # Verify current password
-    if not verify_password(user.password_hash, current_password):
-        return HTTPBadRequest(json={'error': 'Current password is incorrect'})
-    
-    # Check new password length
-    if len(new_password) < 8:
-        return HTTPBadRequest(json={'error': 'New password must be at least 8 characters long'})
-    
-    # Update password
-    user.password_hash = hash_password(new_password)
+    try:
+        # Verify current password
+        if not hasher.verify(user.password_hash, current_password):
+            return HTTPBadRequest(json={'error': 'Current password is incorrect'})
+        
+        # Check new password length
+        if len(new_password) < 8:
+            return HTTPBadRequest(json={'error': 'New password must be at least 8 characters long'})
+        
+        password_hash = hasher.hash(new_password)
+    except PasswordHasherBusy:
+        return busy_response()
+    
+    # Update password dan cabut token lama; klien menerima token baru
+    user.password_hash = password_hash
+    user.token_version = (user.token_version or 0) + 1
     request.db.add(user)
+    invalidate_identity(request, user.id)
     
-    return {'success': True, 'message': 'Password changed successfully'}
+    return {
+        'success': True,
+        'message': 'Password changed successfully',
+        'token': create_token(user.id, request, admin=user.is_admin, version=user.token_version),
+    }
@@ -0,0 +1,234 @@
+"""ASGI entry point serving the same Pyramid application.
+
+The event loop owns the client connections: request bodies are read and
+responses written as coroutines, so a slow or idle client costs a
+socket, not a worker thread and a database connection. The Pyramid
+application itself (views, pyramid_tm, zope.sqlalchemy) is synchronous
+and thread-bound, so each request is dispatched to a bounded thread
+pool once its body has arrived. The pool defaults to the size of the
+SQLAlchemy connection pool, so threads never wait for connections.
+
+Buffered responses are returned by the worker and sent from the loop.
+Streamed responses (``app_iter`` that is not a list, e.g. exports and
+large lists from the ``json`` renderer) are iterated in the worker,
+which waits for the client between chunks.
+
+Run with any ASGI server, e.g. uvicorn::
+
+    HOOPSNEWSID_INI=production.ini uvicorn --factory hoopsnewsid.asgi:create_app --port 6543
+
+Settings::
+
+    asgi.threads = 20                # default: sqlalchemy.pool_size + max_overflow;
+                                     # also used as server.threads
+    asgi.max_body_size = 10485760    # bytes; larger requests get 413
+"""
+import asyncio
+import io
+import logging
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from . import main as make_wsgi_app
+
+log = logging.getLogger(__name__)
+
+# Default QueuePool SQLAlchemy
+DEFAULT_POOL_SIZE = 5
+DEFAULT_MAX_OVERFLOW = 10
+
+DEFAULT_MAX_BODY_SIZE = 10 * 1024 * 1024
+
+
+def default_threads(settings):
+    """Threads matching the connections the primary pool can hand out."""
+    pool_size = int(settings.get('sqlalchemy.pool_size', DEFAULT_POOL_SIZE))
+    max_overflow = int(settings.get('sqlalchemy.max_overflow', DEFAULT_MAX_OVERFLOW))
+    return max(pool_size + max(max_overflow, 0), 1)
+
+
+def build_environ(scope, body):
+    """PEP 3333 environ for an ASGI ``http`` scope and its buffered body."""
+    root_path = scope.get('root_path', '')
+    path = scope['path']
+    if root_path and path.startswith(root_path):
+        path = path[len(root_path):]
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        # WSGI memakai string latin-1 berisi byte UTF-8
+        'SCRIPT_NAME': root_path.encode('utf8').decode('latin1'),
+        'PATH_INFO': path.encode('utf8').decode('latin1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]) if server[1] is not None else '80',
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0],
+        'REMOTE_PORT': str(client[1]),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope.get('headers', ()):
+        name = name.decode('latin1').upper().replace('-', '_')
+        value = value.decode('latin1')
+        if name == 'CONTENT_TYPE' or name == 'CONTENT_LENGTH':
+            key = name
+        else:
+            key = f'HTTP_{name}'
+        if key in environ:
+            value = f'{environ[key]},{value}'
+        environ[key] = value
+    environ.setdefault('CONTENT_LENGTH', str(len(body)))
+    return environ
+
+
+class ASGIApp:
+    """ASGI application running a WSGI app on a bounded thread pool."""
+
+    def __init__(self, wsgi_app, threads=10, max_body_size=DEFAULT_MAX_BODY_SIZE):
+        self.wsgi_app = wsgi_app
+        self.threads = threads
+        self.max_body_size = max_body_size
+        self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='asgi')
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'http':
+            await self.handle_http(scope, receive, send)
+        elif scope['type'] == 'lifespan':
+            await self.handle_lifespan(receive, send)
+        else:
+            # Tidak ada websocket di API ini
+            await send({'type': 'websocket.close', 'code': 1000})
+
+    async def handle_lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.shutdown()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+    async def read_body(self, receive):
+        """The request body, or ``None`` once it exceeds ``max_body_size``."""
+        chunks = []
+        size = 0
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                raise ConnectionAbortedError
+            chunk = message.get('body', b'')
+            size += len(chunk)
+            if size > self.max_body_size:
+                return None
+            chunks.append(chunk)
+            if not message.get('more_body', False):
+                return b''.join(chunks)
+
+    async def handle_http(self, scope, receive, send):
+        try:
+            body = await self.read_body(receive)
+        except ConnectionAbortedError:
+            return
+        if body is None:
+            await send_plain(send, 413, b'Request body too large')
+            return
+
+        loop = asyncio.get_running_loop()
+        environ = build_environ(scope, body)
+        response = {}
+        try:
+            chunks = await loop.run_in_executor(
+                self._executor, self.run_wsgi, environ, response, send, loop
+            )
+        except Exception:
+            log.exception('Unhandled error in %s %s', scope['method'], scope['path'])
+            if not response.get('sent'):
+                await send_plain(send, 500, b'Internal Server Error')
+            # Jika header sudah terkirim, server menutup koneksi yang belum selesai
+            return
+        if chunks is None:
+            # Sudah dikirim bertahap dari worker
+            return
+        await send({'type': 'http.response.start', 'status': response['status'], 'headers': response['headers']})
+        await send({'type': 'http.response.body', 'body': b''.join(chunks)})
+
+    def run_wsgi(self, environ, response, send, loop):
+        """Call the WSGI app in a worker thread.
+
+        Fills ``response`` with the status and headers and returns the
+        body chunks of a buffered response. A streamed ``app_iter`` is
+        sent chunk by chunk from this thread and ``None`` is returned.
+        """
+        def start_response(status, headers, exc_info=None):
+            if exc_info and response.get('sent'):
+                raise exc_info[1].with_traceback(exc_info[2])
+            response['status'] = int(status.split(' ', 1)[0])
+            response['headers'] = [
+                (name.lower().encode('latin1'), value.encode('latin1')) for name, value in headers
+            ]
+            return response.setdefault('written', []).append
+
+        app_iter = self.wsgi_app(environ, start_response)
+        try:
+            if isinstance(app_iter, (list, tuple)):
+                return response.get('written', []) + list(app_iter)
+
+            def send_sync(message):
+                asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+            response['sent'] = True
+            send_sync({'type': 'http.response.start', 'status': response['status'], 'headers': response['headers']})
+            for chunk in response.get('written', []):
+                send_sync({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            for chunk in app_iter:
+                if chunk:
+                    send_sync({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            send_sync({'type': 'http.response.body', 'body': b''})
+            return None
+        finally:
+            close = getattr(app_iter, 'close', None)
+            if close is not None:
+                close()
+
+
+async def send_plain(send, status, body):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'text/plain'), (b'content-length', str(len(body)).encode())],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+def main(global_config, **settings):
+    """Return the application as an ASGI app; same signature as ``hoopsnewsid:main``."""
+    threads = int(settings.get('asgi.threads') or default_threads(settings))
+    # Batas pool bcrypt diturunkan dari jumlah thread request (utils/password.py)
+    settings['server.threads'] = str(threads)
+    max_body_size = int(settings.get('asgi.max_body_size', DEFAULT_MAX_BODY_SIZE))
+    return ASGIApp(make_wsgi_app(global_config, **settings), threads=threads, max_body_size=max_body_size)
+
+
+def create_app():
+    """ASGI factory for servers like ``uvicorn --factory``.
+
+    Settings come from the ``[app:main]`` section of the ini file named
+    by ``HOOPSNEWSID_INI`` (default ``development.ini``).
+    """
+    from pyramid.paster import get_appsettings, setup_logging
+
+    config_uri = os.environ.get('HOOPSNEWSID_INI', 'development.ini')
+    setup_logging(config_uri)
+    return main({'__file__': config_uri}, **get_appsettings(config_uri, name='main'))
@@ -0,0 +1,288 @@
+"""Response cache for anonymous GET endpoints.
+
+Views opt in with the ``cache_response`` decorator. Cached entries are
+tagged (e.g. ``article:12``, ``category:nba``) and write views drop them
+with ``invalidate`` once their transaction commits.
+
+A replica may not have the write yet when the next GET misses the cache,
+and caching that read would serve the old data for a whole TTL. For
+``db.replica_sticky_seconds`` after an invalidation, cache misses
+therefore read from the primary.
+"""
+import functools
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlencode
+
+import transaction
+from pyramid.renderers import render_to_response
+from pyramid.response import Response
+from pyramid.settings import asbool
+
+from .db import use_primary
+from .utils.conditional import is_not_modified, not_modified_response
+
+log = logging.getLogger(__name__)
+
+# Header yang ikut disimpan bersama body agar conditional GET tetap jalan
+VALIDATOR_HEADERS = ('ETag', 'Last-Modified')
+
+
+class MemoryBackend:
+    """In-process LRU cache with per-entry TTL and a tag index."""
+
+    def __init__(self, max_entries=1000):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._tags = {}
+        self._invalidated_at = None
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value, tags = entry
+            if expires < time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl, tags=()):
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl, value, tuple(tags))
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate_tags(self, tags):
+        with self._lock:
+            self._invalidated_at = time.time()
+            for tag in tags:
+                for key in self._tags.pop(tag, ()):
+                    self._remove(key)
+
+    def last_invalidation(self):
+        """Wall-clock time of the latest ``invalidate_tags``, or ``None``."""
+        return self._invalidated_at
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+class RedisBackend:
+    """Cache backed by any redis-py compatible client.
+
+    Tags are Redis sets holding the keys they cover. Pass a fake client
+    (e.g. ``fakeredis.FakeRedis()``) to exercise it without a server.
+    """
+
+    def __init__(self, client, prefix='hoopsnewsid:cache:', tag_ttl=86400):
+        self.client = client
+        self.prefix = prefix
+        # Harus lebih lama dari TTL entry terpanjang
+        self.tag_ttl = tag_ttl
+
+    @classmethod
+    def from_url(cls, url, **kw):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError('cache.backend = redis requires the "redis" package')
+        return cls(redis.Redis.from_url(url), **kw)
+
+    def _tag_key(self, tag):
+        return f'{self.prefix}tag:{tag}'
+
+    def get(self, key):
+        return self.client.get(self.prefix + key)
+
+    def set(self, key, value, ttl, tags=()):
+        ttl = int(ttl)
+        pipe = self.client.pipeline()
+        pipe.set(self.prefix + key, value, ex=ttl)
+        for tag in tags:
+            tag_key = self._tag_key(tag)
+            pipe.sadd(tag_key, self.prefix + key)
+            pipe.expire(tag_key, max(ttl, self.tag_ttl))
+        pipe.execute()
+
+    def invalidate_tags(self, tags):
+        # Dibagi antar proses agar semuanya membaca primary setelah invalidasi
+        self.client.set(self.prefix + 'invalidated_at', time.time(), ex=self.tag_ttl)
+        for tag in tags:
+            tag_key = self._tag_key(tag)
+            keys = self.client.smembers(tag_key)
+            self.client.delete(tag_key, *keys)
+
+    def last_invalidation(self):
+        value = self.client.get(self.prefix + 'invalidated_at')
+        return float(value) if value is not None else None
+
+    def clear(self):
+        keys = list(self.client.scan_iter(match=self.prefix + '*'))
+        if keys:
+            self.client.delete(*keys)
+
+
+class ResponseCache:
+    """Front end over a cache backend that stores rendered responses."""
+
+    def __init__(self, backend, default_ttl=60, enabled=True):
+        self.backend = backend
+        self.default_ttl = default_ttl
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+
+    def key_for(self, request):
+        """Cache key from the route name, matchdict and sorted query params."""
+        route = request.matched_route.name if request.matched_route else request.path
+        params = urlencode(sorted(request.params.items()))
+        matchdict = urlencode(sorted((request.matchdict or {}).items()))
+        digest = hashlib.sha1(f'{matchdict}?{params}'.encode('utf8')).hexdigest()
+        return f'{route}:{digest}'
+
+    def get(self, key):
+        value = self.backend.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(value)
+
+    def set(self, key, content_type, body, ttl=None, tags=(), headers=None):
+        value = json.dumps({'content_type': content_type, 'body': body, 'headers': headers or {}})
+        self.backend.set(key, value, ttl or self.default_ttl, tags)
+
+    def invalidate_tags(self, tags):
+        self.backend.invalidate_tags(tags)
+
+    def invalidated_within(self, seconds):
+        """True when entries were invalidated less than ``seconds`` ago."""
+        last_invalidation = getattr(self.backend, 'last_invalidation', None)
+        if last_invalidation is None:
+            # Backend kustom tanpa catatan waktu: anggap selalu baru
+            return True
+        invalidated_at = last_invalidation()
+        return invalidated_at is not None and time.time() - invalidated_at < seconds
+
+    def metrics(self):
+        return {'hits': self.hits, 'misses': self.misses}
+
+
+def is_cacheable(request):
+    """Only anonymous GET requests are served from the cache."""
+    return request.method == 'GET' and 'Authorization' not in request.headers
+
+
+def reads_stale_replica(request, cache):
+    """True when this request reads a replica that may lag a recent invalidation."""
+    sticky_seconds = request.registry.replica_sticky_seconds
+    if not sticky_seconds or not request.db.use_replica:
+        return False
+    return cache.invalidated_within(sticky_seconds)
+
+
+def cache_response(ttl=None, tags=()):
+    """Cache the rendered JSON response of a request-only view.
+
+    ``tags`` is a list of tag strings or a callable ``tags(request)``.
+    Error responses returned by the view are never cached. Misses shortly
+    after an invalidation read from the primary (see the module docstring).
+    Validators
+    (ETag/Last-Modified) set by the view are stored with the entry so
+    cache hits can still answer 304.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(request):
+            cache = request.registry.response_cache
+            if not cache.enabled or not is_cacheable(request):
+                return view(request)
+
+            key = cache.key_for(request)
+            cached = cache.get(key)
+            if cached is not None:
+                response = Response(body=cached['body'].encode('utf8'), content_type=cached['content_type'])
+                response.headers.update(cached.get('headers', {}))
+                if response.etag and is_not_modified(request, response.etag, response.last_modified):
+                    response = not_modified_response(response.etag, response.last_modified)
+                response.headers['X-Cache'] = 'HIT'
+                return response
+
+            if reads_stale_replica(request, cache):
+                use_primary(request.db)
+            result = view(request)
+            if isinstance(result, Response):
+                return result
+
+            response = render_to_response('json', result, request=request, response=request.response)
+            response.headers['X-Cache'] = 'MISS'
+            try:
+                entry_tags = tags(request) if callable(tags) else tags
+                headers = {
+                    name: response.headers[name]
+                    for name in VALIDATOR_HEADERS if name in response.headers
+                }
+                cache.set(key, response.content_type, response.text, ttl=ttl, tags=entry_tags, headers=headers)
+            except Exception:
+                log.exception('Error storing response for %s in cache', key)
+            return response
+        return wrapper
+    return decorator
+
+
+def invalidate(request, *tags):
+    """Drop cache entries with the given tags once the transaction commits."""
+    cache = request.registry.response_cache
+    tags = [tag for tag in tags if tag]
+
+    def after_commit(success):
+        if not success:
+            return
+        try:
+            cache.invalidate_tags(tags)
+        except Exception:
+            log.exception('Error invalidating cache tags %s', tags)
+
+    transaction.get().addAfterCommitHook(after_commit)
+
+
+def includeme(config):
+    """Set up the response cache from the ``cache.*`` settings."""
+    settings = config.get_settings()
+    backend_name = settings.get('cache.backend', 'memory')
+    if backend_name == 'redis':
+        backend = RedisBackend.from_url(settings.get('cache.redis_url', 'redis://localhost:6379/0'))
+    elif backend_name == 'memory':
+        backend = MemoryBackend(max_entries=int(settings.get('cache.max_entries', 1000)))
+    else:
+        backend = config.maybe_dotted(backend_name)()
+
+    config.registry.response_cache = ResponseCache(
+        backend,
+        default_ttl=int(settings.get('cache.default_ttl', 60)),
+        enabled=asbool(settings.get('cache.enabled', True)),
+    )
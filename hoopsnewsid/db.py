@@ -1,35 +1,122 @@
-from sqlalchemy import engine_from_config
-from sqlalchemy.orm import sessionmaker, scoped_session
+from sqlalchemy import engine_from_config, event
+from sqlalchemy.orm import Session, sessionmaker, scoped_session
+from pyramid.settings import asbool
 from zope.sqlalchemy import register
-from pyramid.events import NewRequest
+
+from .instrumentation import instrument_engine
+
+# Default pool yang aman untuk PostgreSQL di belakang firewall/pgbouncer:
+# koneksi mati terdeteksi sebelum dipakai dan didaur ulang tiap 30 menit
+ENGINE_DEFAULTS = {
+    'pool_pre_ping': 'true',
+    'pool_recycle': '1800',
+}
+
+# Request yang boleh dibaca dari replica
+READ_METHODS = ('GET', 'HEAD')
+
+# Cookie penanda bahwa client baru saja menulis dan harus membaca dari primary
+STICKY_COOKIE = 'db_primary'
+
+
+class RoutingSession(Session):
+    """Session that sends reads to a replica engine while ``use_replica`` is set.
+
+    Flushes always go to the primary, as does everything once
+    ``use_primary`` is called.
+    """
+
+    def __init__(self, replica=None, **kw):
+        super().__init__(**kw)
+        self.replica = replica
+        self.use_replica = False
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self.replica is not None and self.use_replica and not self._flushing:
+            return self.replica
+        return super().get_bind(mapper=mapper, clause=clause, **kw)
+
 
 # Membuat session factory yang thread-safe
-DBSession = scoped_session(sessionmaker())
+DBSession = scoped_session(sessionmaker(class_=RoutingSession))
 register(DBSession)
 
+
+def use_primary(session):
+    """Send the rest of the session's statements to the primary (e.g. before a write in a GET)."""
+    session.use_replica = False
+
+
+def set_statement_timeout(engine, timeout_ms):
+    """Apply ``statement_timeout`` to every new PostgreSQL connection of ``engine``."""
+    if not timeout_ms or engine.dialect.name != 'postgresql':
+        return
+
+    @event.listens_for(engine, 'connect')
+    def on_connect(dbapi_connection, connection_record):
+        autocommit = dbapi_connection.autocommit
+        dbapi_connection.autocommit = True
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f'SET SESSION statement_timeout = {int(timeout_ms)}')
+        cursor.close()
+        dbapi_connection.autocommit = autocommit
+
+
+def create_engine_from_settings(settings, prefix='sqlalchemy.'):
+    """Engine from the ``<prefix>*`` settings, with pool defaults and instrumentation."""
+    config = {prefix + key: value for key, value in ENGINE_DEFAULTS.items()}
+    config.update(settings)
+    # engine_from_config tidak mengonversi pool_pre_ping dari string
+    config[prefix + 'pool_pre_ping'] = asbool(config[prefix + 'pool_pre_ping'])
+    engine = engine_from_config(config, prefix)
+    set_statement_timeout(engine, settings.get('db.statement_timeout_ms'))
+    # Hitung query per request dan catat query lambat (lihat instrumentation.py)
+    slow_query_ms = settings.get('instrumentation.slow_query_ms')
+    instrument_engine(engine, float(slow_query_ms) / 1000 if slow_query_ms else None)
+    return engine
+
+
 def setup_engine(settings):
-    engine = engine_from_config(settings, 'sqlalchemy.')
-    DBSession.configure(bind=engine)
+    engine = create_engine_from_settings(settings)
+    replica = None
+    if settings.get('sqlalchemy_replica.url'):
+        replica = create_engine_from_settings(settings, 'sqlalchemy_replica.')
+    DBSession.configure(bind=engine, replica=replica)
     return engine
 
-def cleanup_request(event):
-    # Event subscriber untuk membersihkan DBSession saat request selesai
+def cleanup_request(request):
+    # Finished callback untuk membersihkan DBSession saat request selesai
     DBSession.remove()
 
+def reads_from_replica(request):
+    """GET requests read from the replica, unless the client wrote recently."""
+    return request.method in READ_METHODS and STICKY_COOKIE not in request.cookies
+
+def stick_to_primary(request, response):
+    # Read-your-writes: GET berikutnya dari client ini membaca dari primary
+    # sampai replica kemungkinan besar sudah menyusul
+    sticky_seconds = request.registry.replica_sticky_seconds
+    response.set_cookie(STICKY_COOKIE, '1', max_age=sticky_seconds, httponly=True, samesite='Lax')
+
+def get_db(request):
+    # Session dibersihkan setelah request selesai, bukan di awal request:
+    # pyramid_tm bisa sudah memakai session (mis. saat resolve user) sebelum
+    # NewRequest, dan remove() di situ menutup session yang sudah join transaksi
+    request.add_finished_callback(cleanup_request)
+    session = DBSession()
+    if session.replica is not None:
+        session.use_replica = reads_from_replica(request)
+        if request.method not in READ_METHODS and request.registry.replica_sticky_seconds:
+            request.add_response_callback(stick_to_primary)
+    return session
+
 def includeme(config):
     """Initialize the database connection and bind it to the request."""
     settings = config.get_settings()
     engine = setup_engine(settings)
 
-    # Menghubungkan session dengan engine
-    DBSession.configure(bind=engine)
+    config.registry['db.engine'] = engine
+    config.registry.replica_sticky_seconds = int(settings.get('db.replica_sticky_seconds', 10))
 
     # Menyediakan DBSession sebagai attribute 'db' di request
-    config.add_request_method(
-        lambda request: DBSession(),
-        'db',
-        reify=True
-    )
-
-    # Daftarkan event subscriber untuk membersihkan session saat request selesai
-    config.add_subscriber(cleanup_request, NewRequest)
+    config.add_request_method(get_db, 'db', reify=True)
@@ -0,0 +1,267 @@
+"""Per-request latency and SQL instrumentation.
+
+A tween times every request. Engine event hooks (``instrument_engine``,
+attached in ``db.setup_engine``) add the number of SQL statements, the
+SQL time and the rows fetched for statements run while that request is
+active. The JSON renderer (``renderers.py``) is wrapped with
+``timed_renderer`` to time serialization.
+
+Each request gets a structured (JSON) log line on the
+``hoopsnewsid.access`` logger and, with
+``instrumentation.server_timing = true`` (off by default; it exposes
+query counts and timings to every client), a ``Server-Timing`` header.
+The numbers also feed per-route histograms, served in Prometheus text
+format at ``/metrics`` together with the cache, view counter, password
+hasher and identity cache counters. ``/metrics`` requires the ``admin``
+permission, so scrapers send an admin bearer token. Metrics are kept
+per process.
+
+Statements slower than ``instrumentation.slow_query_ms`` are logged on
+``hoopsnewsid.slow_query``.
+"""
+import contextvars
+import json
+import logging
+import threading
+import time
+
+from pyramid.response import Response
+from pyramid.settings import asbool
+from pyramid.tweens import INGRESS
+from sqlalchemy import event
+
+access_log = logging.getLogger('hoopsnewsid.access')
+slow_query_log = logging.getLogger('hoopsnewsid.slow_query')
+
+# Statistik request yang sedang berjalan di thread/context ini
+_current = contextvars.ContextVar('hoopsnewsid_request_stats', default=None)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55)
+ROW_BUCKETS = (0, 1, 10, 100, 1000, 10000, 100000)
+
+# (prefix metrik, atribut registry) dari komponen yang punya metrics()
+COMPONENT_METRICS = (
+    ('response_cache', 'response_cache'),
+    ('viewcount', 'view_counter'),
+    ('site_stats', 'pending_stats'),
+    ('related_updater', 'related_updater'),
+    ('password_hasher', 'password_hasher'),
+    ('image_processor', 'image_processor'),
+    ('identity_cache', 'identity_cache'),
+)
+
+
+class RequestStats:
+    """Numbers collected for one request."""
+
+    __slots__ = ('start', 'queries', 'sql_time', 'rows', 'render_time')
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.sql_time = 0.0
+        self.rows = 0
+        self.render_time = 0.0
+
+
+def current_stats():
+    """The stats of the request being handled, or None outside a request."""
+    return _current.get()
+
+
+def instrument_engine(engine, slow_query_threshold=None):
+    """Record SQL statements on ``engine`` into the current request's stats.
+
+    ``slow_query_threshold`` is in seconds; None disables the slow-query log.
+    """
+    @event.listens_for(engine, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._instrumentation_start = time.perf_counter()
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._instrumentation_start
+        stats = _current.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.sql_time += elapsed
+            # psycopg2 mengisi rowcount untuk SELECT; driver lain bisa -1
+            if cursor.description is not None and cursor.rowcount > 0:
+                stats.rows += cursor.rowcount
+        if slow_query_threshold is not None and elapsed >= slow_query_threshold:
+            slow_query_log.warning(json.dumps({
+                'event': 'slow_query',
+                'duration_ms': round(elapsed * 1000, 2),
+                'statement': statement,
+                'executemany': executemany,
+            }))
+
+
+def timed_renderer(factory):
+    """Wrap a renderer factory so rendering time is added to the request stats."""
+    def timed_factory(info):
+        render = factory(info)
+
+        def _render(value, system):
+            stats = _current.get()
+            start = time.perf_counter()
+            try:
+                return render(value, system)
+            finally:
+                if stats is not None:
+                    stats.render_time += time.perf_counter() - start
+        return _render
+    return timed_factory
+
+
+class Histogram:
+    """Cumulative-bucket histogram with one series per label tuple."""
+
+    def __init__(self, name, documentation, labelnames, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self._series = {}
+
+    def observe(self, labels, value):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * len(self.buckets), 0.0, 0]
+        counts = series[0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+        series[1] += value
+        series[2] += 1
+
+    def expose(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        for labels, (counts, total, count) in sorted(self._series.items()):
+            label_text = ','.join(f'{name}="{value}"' for name, value in zip(self.labelnames, labels))
+            for bound, bucket_count in zip(self.buckets, counts):
+                lines.append(f'{self.name}_bucket{{{label_text},le="{bound}"}} {bucket_count}')
+            lines.append(f'{self.name}_bucket{{{label_text},le="+Inf"}} {count}')
+            lines.append(f'{self.name}_sum{{{label_text}}} {total}')
+            lines.append(f'{self.name}_count{{{label_text}}} {count}')
+        return lines
+
+
+class RequestMetrics:
+    """Per-route request histograms."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        labels = ('route', 'method', 'status')
+        self.duration = Histogram(
+            'hoopsnewsid_request_duration_seconds', 'Request wall time.', labels, LATENCY_BUCKETS)
+        self.sql_duration = Histogram(
+            'hoopsnewsid_request_sql_duration_seconds', 'SQL time per request.', labels, LATENCY_BUCKETS)
+        self.render_duration = Histogram(
+            'hoopsnewsid_request_render_duration_seconds', 'Serialization time per request.', labels, LATENCY_BUCKETS)
+        self.queries = Histogram(
+            'hoopsnewsid_request_sql_queries', 'SQL statements per request.', labels, QUERY_BUCKETS)
+        self.rows = Histogram(
+            'hoopsnewsid_request_sql_rows', 'Rows fetched per request.', labels, ROW_BUCKETS)
+
+    def observe(self, labels, duration, stats):
+        with self._lock:
+            self.duration.observe(labels, duration)
+            self.sql_duration.observe(labels, stats.sql_time)
+            self.render_duration.observe(labels, stats.render_time)
+            self.queries.observe(labels, stats.queries)
+            self.rows.observe(labels, stats.rows)
+
+    def expose(self):
+        with self._lock:
+            lines = []
+            for histogram in (self.duration, self.sql_duration, self.render_duration, self.queries, self.rows):
+                lines.extend(histogram.expose())
+            return lines
+
+
+def _route_name(request):
+    route = getattr(request, 'matched_route', None)
+    return route.name if route is not None else 'notfound'
+
+
+def server_timing(duration, stats):
+    return ', '.join((
+        f'app;dur={duration * 1000:.1f}',
+        f'db;dur={stats.sql_time * 1000:.1f};desc="{stats.queries} queries, {stats.rows} rows"',
+        f'render;dur={stats.render_time * 1000:.1f}',
+    ))
+
+
+def instrumentation_tween_factory(handler, registry):
+    metrics = registry.request_metrics
+    emit_header = registry.server_timing
+
+    def instrumentation_tween(request):
+        stats = RequestStats()
+        token = _current.set(stats)
+        response = None
+        try:
+            response = handler(request)
+            return response
+        finally:
+            _current.reset(token)
+            duration = time.perf_counter() - stats.start
+            route = _route_name(request)
+            status = response.status_int if response is not None else 500
+            metrics.observe((route, request.method, str(status)), duration, stats)
+            if response is not None and emit_header:
+                response.headers['Server-Timing'] = server_timing(duration, stats)
+            access_log.info(json.dumps({
+                'event': 'request',
+                'route': route,
+                'method': request.method,
+                'path': request.path,
+                'status': status,
+                'duration_ms': round(duration * 1000, 2),
+                'sql_queries': stats.queries,
+                'sql_ms': round(stats.sql_time * 1000, 2),
+                'sql_rows': stats.rows,
+                'render_ms': round(stats.render_time * 1000, 2),
+            }))
+
+    return instrumentation_tween
+
+
+def _component_lines(registry):
+    lines = []
+    for prefix, attribute in COMPONENT_METRICS:
+        component = getattr(registry, attribute, None)
+        if component is None:
+            continue
+        for key, value in sorted(component.metrics().items()):
+            if value is None:
+                continue
+            name = f'hoopsnewsid_{prefix}_{key}'
+            lines.append(f'# TYPE {name} gauge')
+            lines.append(f'{name} {float(value)}')
+    return lines
+
+
+def metrics_view(request):
+    """Prometheus text exposition of this process's metrics."""
+    lines = request.registry.request_metrics.expose() + _component_lines(request.registry)
+    return Response(
+        body=('\n'.join(lines) + '\n').encode('utf-8'),
+        content_type='text/plain',
+        charset='utf-8',
+    )
+
+
+def includeme(config):
+    """Register the tween and the ``/metrics`` view."""
+    settings = config.get_settings()
+    config.registry.request_metrics = RequestMetrics()
+    config.registry.server_timing = asbool(settings.get('instrumentation.server_timing', False))
+
+    config.add_tween('hoopsnewsid.instrumentation.instrumentation_tween_factory', under=INGRESS)
+
+    if asbool(settings.get('instrumentation.metrics', True)):
+        config.add_route('metrics', '/metrics')
+        config.add_view(metrics_view, route_name='metrics', request_method='GET', permission='admin')
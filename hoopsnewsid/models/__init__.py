@@ -7,6 +7,9 @@ from .tag import Tag
 from .article import Article
 from .thread import Thread
 from .comment import Comment
+from .stats import SiteStat
+from .related import RelatedArticle
+from .loading import article_load_options, thread_load_options
 
 __all__ = [
     'Base',
@@ -16,6 +19,10 @@ __all__ = [
     'Article',
     'Thread',
     'Comment',
+    'SiteStat',
+    'RelatedArticle',
     'article_tag',
-    'thread_tag'
+    'thread_tag',
+    'article_load_options',
+    'thread_load_options',
 ]
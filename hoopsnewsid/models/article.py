@@ -1,7 +1,7 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index, JSON, text
+from sqlalchemy.orm import relationship, deferred
 import datetime
-from .meta import Base
+from .meta import Base, SearchVector
 from .association import article_tag
 
 class Article(Base):
@@ -11,8 +11,9 @@ class Article(Base):
     title = Column(String(255), nullable=False)
     slug = Column(String(255), unique=True, nullable=False)
     excerpt = Column(String(500))
-    content = Column(Text, nullable=False)
+    content = deferred(Column(Text, nullable=False))  # Hanya dimuat profil 'detail'
     image_url = Column(String(255))
+    image_variants = Column(JSON)  # URL srcset WebP/JPEG, lihat services/images.py
     views = Column(Integer, default=0)
     status = Column(String(20), default='published')  # published, draft
     author_id = Column(Integer, ForeignKey('users.id'), nullable=False)
@@ -20,6 +21,24 @@ class Article(Base):
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
     published_at = Column(DateTime)
+    search_vector = deferred(Column(SearchVector))  # Dikelola trigger database
+    
+    # Index untuk filter/urutan di api/articles.py, api/users.py dan api/admin.py.
+    # Index parsial hanya berisi artikel published, sesuai keyset_order
+    # (DESC NULLS LAST, id DESC); hanya di PostgreSQL. Dibuat lewat migrasi
+    # add_query_indexes.
+    __table_args__ = (
+        Index('ix_articles_published_published_at', published_at.desc().nullslast(), id.desc(),
+              postgresql_where=text("status = 'published'")).ddl_if(dialect='postgresql'),
+        Index('ix_articles_published_views', views.desc().nullslast(), id.desc(),
+              postgresql_where=text("status = 'published'")).ddl_if(dialect='postgresql'),
+        Index('ix_articles_category_published_at', category_id, published_at.desc().nullslast(), id.desc(),
+              postgresql_where=text("status = 'published'")).ddl_if(dialect='postgresql'),
+        Index('ix_articles_author_published_at', author_id, published_at.desc()),
+        Index('ix_articles_status_published_at', status, published_at.desc()),
+        Index('ix_articles_category_id', category_id),
+        Index('ix_articles_created_at', created_at),
+    )
     
     author = relationship('User', back_populates='articles')
     category = relationship('Category', back_populates='articles')
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, Table
+from sqlalchemy import Column, Integer, ForeignKey, Index, Table
 from .meta import Base
 
 # Tabel asosiasi many-to-many antara Thread dan Tag
@@ -8,6 +8,8 @@ thread_tag = Table(
     Column('thread_id', Integer, ForeignKey('threads.id'), primary_key=True),
     Column('tag_id', Integer, ForeignKey('tags.id'), primary_key=True)
 )
+# Primary key diawali thread_id; index ini untuk lookup terbalik per tag
+Index('ix_thread_tag_tag_id', thread_tag.c.tag_id, thread_tag.c.thread_id)
 
 # Tabel asosiasi many-to-many antara Article dan Tag
 article_tag = Table(
@@ -16,3 +18,5 @@ article_tag = Table(
     Column('article_id', Integer, ForeignKey('articles.id'), primary_key=True),
     Column('tag_id', Integer, ForeignKey('tags.id'), primary_key=True)
 )
+# Primary key diawali article_id; index ini untuk lookup terbalik per tag
+Index('ix_article_tag_tag_id', article_tag.c.tag_id, article_tag.c.article_id)
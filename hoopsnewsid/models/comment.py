@@ -1,7 +1,7 @@
-from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey, Boolean
-from sqlalchemy.orm import relationship, backref
+from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey, Boolean, Index
+from sqlalchemy.orm import relationship, deferred, backref
 import datetime
-from .meta import Base
+from .meta import Base, SearchVector
 
 # models/comment.py
 class Comment(Base):
@@ -16,6 +16,16 @@ class Comment(Base):
     is_approved = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
+    search_vector = deferred(Column(SearchVector))  # Dikelola trigger database
+    
+    # Index untuk pohon komentar (services/comment_tree.py) dan filter admin
+    __table_args__ = (
+        Index('ix_comments_article_tree', article_id, parent_id, is_approved, created_at),
+        Index('ix_comments_thread_tree', thread_id, parent_id, created_at),
+        Index('ix_comments_parent_id', parent_id),
+        Index('ix_comments_user_id', user_id),
+        Index('ix_comments_created_at', created_at),
+    )
     
     user = relationship('User', back_populates='comments')
     article = relationship('Article', back_populates='comments')  # Tambahkan kembali
@@ -0,0 +1,59 @@
+from sqlalchemy import func, select
+from sqlalchemy.orm import joinedload, load_only, selectinload, undefer, with_expression
+
+from .article import Article
+from .comment import Comment
+from .thread import Thread
+
+# Kolom yang dibaca daftar artikel (ArticleListSchema, admin, ETag).
+# content tidak pernah ikut: kolom itu deferred dan hanya dimuat 'detail'
+ARTICLE_LIST_COLUMNS = (
+    Article.id, Article.title, Article.slug, Article.excerpt, Article.image_url, Article.image_variants,
+    Article.views, Article.status, Article.author_id, Article.category_id,
+    Article.created_at, Article.updated_at, Article.published_at,
+)
+
+# Profil loader option untuk serialisasi artikel.
+# 'list'   -> ArticleListSchema (kolom daftar, author, category)
+# 'detail' -> ArticleSchema (content, author, category, tags)
+ARTICLE_LOAD_PROFILES = {
+    'list': (
+        load_only(*ARTICLE_LIST_COLUMNS),
+        joinedload(Article.author),
+        joinedload(Article.category),
+    ),
+    'detail': (
+        undefer(Article.content),
+        joinedload(Article.author),
+        joinedload(Article.category),
+        selectinload(Article.tags),
+    ),
+}
+
+# Jumlah komentar per thread sebagai correlated subquery, hanya dihitung
+# untuk baris yang benar-benar dimuat
+thread_comment_count = select(func.count(Comment.id))\
+    .where(Comment.thread_id == Thread.id)\
+    .correlate(Thread)\
+    .scalar_subquery()
+
+# 'list' -> ThreadSchema (content, user, tags, comment_count); ThreadSchema
+# mengembalikan content, jadi kolom deferred itu dimuat di sini
+THREAD_LOAD_PROFILES = {
+    'list': (
+        undefer(Thread.content),
+        joinedload(Thread.user),
+        selectinload(Thread.tags),
+        with_expression(Thread.comment_count, thread_comment_count),
+    ),
+}
+
+
+def article_load_options(profile):
+    """Return the loader options for a named article profile."""
+    return ARTICLE_LOAD_PROFILES[profile]
+
+
+def thread_load_options(profile):
+    """Return the loader options for a named thread profile."""
+    return THREAD_LOAD_PROFILES[profile]
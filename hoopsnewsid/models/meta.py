@@ -1,5 +1,7 @@
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.schema import MetaData
+from sqlalchemy.types import Text
+from sqlalchemy.dialects.postgresql import TSVECTOR
 
 # Recommended naming convention used by Alembic
 NAMING_CONVENTION = {
@@ -12,3 +14,6 @@ NAMING_CONVENTION = {
 
 metadata = MetaData(naming_convention=NAMING_CONVENTION)
 Base = declarative_base(metadata=metadata)
+
+# Kolom tsvector untuk full-text search (diisi trigger di PostgreSQL)
+SearchVector = Text().with_variant(TSVECTOR(), 'postgresql')
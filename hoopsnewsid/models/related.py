@@ -0,0 +1,22 @@
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Index, Integer, SmallInteger
+import datetime
+from .meta import Base
+
+class RelatedArticle(Base):
+    """One entry of an article's precomputed related-articles list."""
+    __tablename__ = 'related_articles'
+
+    article_id = Column(Integer, ForeignKey('articles.id', ondelete='CASCADE'), primary_key=True)
+    rank = Column(SmallInteger, primary_key=True)
+    # Sengaja tanpa foreign key: baris yang menunjuk artikel terhapus masih
+    # dibutuhkan update_related untuk menemukan daftar yang harus diisi ulang
+    related_id = Column(Integer, nullable=False)
+    score = Column(Float, nullable=False)
+    computed_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+    __table_args__ = (
+        Index('ix_related_articles_related_id', related_id),
+    )
+
+    def __repr__(self):
+        return f"<RelatedArticle(article_id={self.article_id}, rank={self.rank}, related_id={self.related_id})>"
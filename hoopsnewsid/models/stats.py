@@ -0,0 +1,152 @@
+import atexit
+import logging
+import threading
+from collections import Counter
+
+from sqlalchemy import BigInteger, Column, DateTime, String, bindparam, event, func, inspect, update
+from sqlalchemy.orm import Session
+import datetime
+from .meta import Base
+from .user import User
+from .article import Article
+from .comment import Comment
+from .thread import Thread
+
+log = logging.getLogger(__name__)
+
+class SiteStat(Base):
+    """Running totals for the admin dashboard, one row per counter."""
+    __tablename__ = 'site_stats'
+
+    name = Column(String(50), primary_key=True)
+    value = Column(BigInteger, nullable=False, default=0, server_default='0')
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
+
+    def __repr__(self):
+        return f"<SiteStat(name='{self.name}', value={self.value})>"
+
+# Model yang jumlah barisnya dicatat, beserta nama counter-nya
+COUNTED_MODELS = {
+    User: 'users',
+    Article: 'articles',
+    Comment: 'comments',
+    Thread: 'threads',
+}
+
+STAT_NAMES = (*COUNTED_MODELS.values(), 'views')
+
+
+def add_to_stats(connection, deltas):
+    """Add ``{name: delta}`` to the counters in one executemany UPDATE."""
+    rows = [{'stat_name': name, 'delta': delta} for name, delta in sorted(deltas.items()) if delta]
+    if not rows:
+        return
+    table = SiteStat.__table__
+    connection.execute(
+        update(table)
+        .where(table.c.name == bindparam('stat_name'))
+        .values(value=table.c.value + bindparam('delta'), updated_at=func.now()),
+        rows,
+    )
+
+
+class PendingStats:
+    """Committed counter deltas waiting to be written to ``site_stats``, per engine.
+
+    Writers only add to this in memory; the view counter's flush thread
+    (``viewcount.py``) drains the deltas of its engine and applies them in
+    one UPDATE, so inserts and deletes never queue on the shared
+    ``site_stats`` rows. Processes without a view counter (scripts) are
+    covered by ``flush_all`` at exit. Deltas still buffered when a
+    process crashes are lost; ``refresh_hoopsnewsid_stats`` corrects that.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._deltas = {}
+        self.flush_errors = 0
+
+    def add(self, engine, deltas):
+        with self._lock:
+            self._deltas.setdefault(engine, Counter()).update(deltas)
+
+    def drain(self, engine):
+        """Remove and return every pending delta of ``engine``."""
+        with self._lock:
+            return self._deltas.pop(engine, Counter())
+
+    def restore(self, engine, deltas):
+        """Put deltas back after a failed flush."""
+        self.add(engine, deltas)
+
+    def flush(self, engine):
+        """Write the pending deltas of ``engine`` in their own transaction."""
+        deltas = self.drain(engine)
+        if not any(deltas.values()):
+            return
+        try:
+            with engine.begin() as connection:
+                add_to_stats(connection, deltas)
+        except Exception:
+            with self._lock:
+                self.flush_errors += 1
+            self.restore(engine, deltas)
+            log.exception('Error writing site_stats deltas %s', dict(deltas))
+
+    def flush_all(self):
+        """Flush every engine; registered with ``atexit``."""
+        with self._lock:
+            engines = list(self._deltas)
+        for engine in engines:
+            self.flush(engine)
+
+    def metrics(self):
+        with self._lock:
+            return {
+                'pending_counters': sum(1 for deltas in self._deltas.values() for delta in deltas.values() if delta),
+                'pending_rows': sum(abs(delta) for deltas in self._deltas.values() for delta in deltas.values()),
+                'flush_errors': self.flush_errors,
+            }
+
+
+pending_stats = PendingStats()
+
+# Skrip ORM tanpa view counter (initialize_db dll.) tetap menulis selisihnya
+atexit.register(pending_stats.flush_all)
+
+# Key di Session.info untuk selisih transaksi yang belum di-commit dan engine-nya
+SESSION_DELTAS_KEY = 'site_stats_deltas'
+SESSION_ENGINE_KEY = 'site_stats_engine'
+
+
+@event.listens_for(Session, 'after_flush')
+def _count_flushed_rows(session, flush_context):
+    # Insert/delete lewat ORM dikumpulkan per transaksi, bukan langsung di-UPDATE
+    deltas = session.info.setdefault(SESSION_DELTAS_KEY, Counter())
+    # Selama flush get_bind() selalu mengarah ke primary
+    session.info[SESSION_ENGINE_KEY] = session.get_bind()
+    for obj in session.new:
+        name = COUNTED_MODELS.get(type(obj))
+        if name:
+            deltas[name] += 1
+    for obj in session.deleted:
+        name = COUNTED_MODELS.get(type(obj))
+        if name:
+            deltas[name] -= 1
+            if name == 'articles':
+                # Hanya jika views sudah dimuat; selisih lain dibetulkan refresh
+                deltas['views'] -= inspect(obj).dict.get('views') or 0
+
+
+@event.listens_for(Session, 'after_commit')
+def _queue_committed_deltas(session):
+    deltas = session.info.pop(SESSION_DELTAS_KEY, None)
+    engine = session.info.pop(SESSION_ENGINE_KEY, None)
+    if deltas and engine is not None:
+        pending_stats.add(engine, deltas)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _drop_rolled_back_deltas(session):
+    session.info.pop(SESSION_DELTAS_KEY, None)
+    session.info.pop(SESSION_ENGINE_KEY, None)
@@ -1,8 +1,8 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
+from sqlalchemy.orm import relationship, deferred, query_expression
 import datetime
 
-from .meta import Base
+from .meta import Base, SearchVector
 from .association import thread_tag
 
 class Thread(Base):
@@ -10,16 +10,25 @@ class Thread(Base):
     
     id = Column(Integer, primary_key=True)
     title = Column(String(255), nullable=False)
-    content = Column(Text, nullable=False)
+    content = deferred(Column(Text, nullable=False))  # Dimuat lewat thread_load_options
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
+    search_vector = deferred(Column(SearchVector))  # Dikelola trigger database
     
     # Foreign Keys
     user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
     
+    __table_args__ = (
+        Index('ix_threads_created_at', created_at.desc(), id.desc()),
+        Index('ix_threads_user_id', user_id),
+    )
+    
     # Relationships
     user = relationship('User', back_populates='threads')
     comments = relationship('Comment', back_populates='thread', cascade='all, delete-orphan')
     
     # Relasi many-to-many dengan Tag
     tags = relationship('Tag', secondary=thread_tag, back_populates='threads')
+    
+    # Diisi lewat with_expression (lihat models/loading.py), tanpa memuat comments
+    comment_count = query_expression()
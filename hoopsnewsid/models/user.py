@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Index
 from sqlalchemy.orm import relationship
 import datetime
 from .meta import Base
@@ -15,9 +15,15 @@ class User(Base):
     avatar_url = Column(String(255))
     is_admin = Column(Boolean, default=False)
     is_active = Column(Boolean, default=True)
+    # Dinaikkan untuk mencabut semua token yang sudah diterbitkan (klaim 'ver')
+    token_version = Column(Integer, nullable=False, default=0, server_default='0')
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
     
+    __table_args__ = (
+        Index('ix_users_created_at', created_at),
+    )
+    
     articles = relationship('Article', back_populates='author')
     comments = relationship('Comment', back_populates='user')
     threads = relationship('Thread', back_populates='user', cascade='all, delete-orphan')
@@ -0,0 +1,148 @@
+"""Fast JSON renderer for the ``json`` renderer name.
+
+Values are encoded straight to UTF-8 bytes with orjson when it is
+installed, otherwise with the stdlib ``json`` module. Both backends
+write compact JSON and encode ``datetime``/``date`` as ISO 8601, the
+same as ``.isoformat()``, so views can return them as they are.
+
+A list with more than ``json.stream_threshold`` items (at the top level
+or as a value of the top-level dict) is written to ``app_iter`` in
+chunks instead of one large body.
+
+Settings::
+
+    json.backend = auto             # auto | orjson | stdlib | dotted.path.to.dumps
+    json.stream_threshold = 1000    # 0 = never stream
+"""
+import datetime
+import decimal
+import json
+import uuid
+
+from .instrumentation import timed_renderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson opsional
+    orjson = None
+
+# Jumlah item per chunk saat streaming
+STREAM_CHUNK_SIZE = 256
+
+
+def _default(value):
+    # Tipe yang tidak ditangani langsung oleh backend
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if hasattr(value, '__json__'):
+        return value.__json__(None)
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+
+def stdlib_dumps(value):
+    return json.dumps(value, default=_default, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+if orjson is not None:
+    # OPT_NON_STR_KEYS: dict dengan key int (mis. hitungan per id) tetap bisa
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+    def orjson_dumps(value):
+        return orjson.dumps(value, default=_default, option=_ORJSON_OPTIONS)
+else:  # pragma: no cover
+    orjson_dumps = None
+
+
+BACKENDS = {
+    'orjson': orjson_dumps,
+    'stdlib': stdlib_dumps,
+}
+
+
+def get_dumps(name='auto', maybe_dotted=None):
+    """The ``dumps(value) -> bytes`` function for a ``json.backend`` setting."""
+    if name == 'auto':
+        return orjson_dumps or stdlib_dumps
+    if name in BACKENDS:
+        if BACKENDS[name] is None:
+            raise ValueError(f'json.backend = {name} but {name} is not installed')
+        return BACKENDS[name]
+    if maybe_dotted is None:
+        raise ValueError(f'Unknown json.backend: {name}')
+    return maybe_dotted(name)
+
+
+def _is_long_list(value, threshold):
+    return isinstance(value, list) and len(value) > threshold
+
+
+def iter_encode(value, dumps, threshold, chunk_size=STREAM_CHUNK_SIZE):
+    """Yield ``value`` encoded in chunks; long lists are encoded ``chunk_size`` items at a time."""
+    if _is_long_list(value, threshold):
+        yield b'['
+        for start in range(0, len(value), chunk_size):
+            # dumps(list) -> b'[a,b]'; buang kurung siku luar
+            encoded = dumps(value[start:start + chunk_size])[1:-1]
+            yield b',' + encoded if start else encoded
+        yield b']'
+    elif isinstance(value, dict):
+        yield b'{'
+        for i, (key, item) in enumerate(value.items()):
+            yield (b',' if i else b'') + dumps(str(key)) + b':'
+            yield from iter_encode(item, dumps, threshold, chunk_size)
+        yield b'}'
+    else:
+        yield dumps(value)
+
+
+def should_stream(value, threshold):
+    if not threshold:
+        return False
+    if isinstance(value, dict):
+        return any(_is_long_list(item, threshold) for item in value.values())
+    return _is_long_list(value, threshold)
+
+
+class JSONRenderer:
+    """Renderer factory writing JSON bytes with a pluggable ``dumps``."""
+
+    def __init__(self, dumps=None, stream_threshold=0):
+        self.dumps = dumps or get_dumps()
+        self.stream_threshold = stream_threshold
+
+    def __call__(self, info):
+        dumps = self.dumps
+        threshold = self.stream_threshold
+
+        def _render(value, system):
+            request = system.get('request')
+            if request is not None:
+                response = request.response
+                if response.content_type == response.default_content_type:
+                    # Tanpa charset: JSON selalu UTF-8 (RFC 8259)
+                    response.content_type = 'application/json'
+            if should_stream(value, threshold):
+                # Pyramid memasang iterator sebagai app_iter
+                return iter_encode(value, dumps, threshold)
+            return dumps(value)
+
+        return _render
+
+
+def includeme(config):
+    """Register the fast renderer under the ``json`` name.
+
+    The encoder is also kept as ``registry.json_dumps`` for code that
+    writes JSON outside a renderer (e.g. NDJSON exports).
+    """
+    settings = config.get_settings()
+    dumps = get_dumps(settings.get('json.backend', 'auto'), config.maybe_dotted)
+    config.registry.json_dumps = dumps
+    renderer = JSONRenderer(dumps, int(settings.get('json.stream_threshold', 1000)))
+    config.add_renderer('json', timed_renderer(renderer))
@@ -4,10 +4,12 @@ from .user import UserSchema, UserProfileSchema
 from .comment import CommentSchema
 from .category import CategorySchema
 from .thread import ThreadSchema, ThreadDetailSchema 
+from .registry import SchemaRegistry, compile_dumper
 
 __all__ = [
     'LoginSchema', 'RegisterSchema',
     'ArticleSchema', 'ArticleListSchema', 'TagSchema',
     'UserSchema', 'UserProfileSchema',
     'CommentSchema','CategorySchema', 'ThreadSchema', 'ThreadDetailSchema',
+    'SchemaRegistry', 'compile_dumper',
 ]
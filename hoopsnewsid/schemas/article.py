@@ -7,6 +7,7 @@ class ArticleSchema(Schema):
     excerpt = fields.Str(validate=validate.Length(max=500))
     content = fields.Str(required=True)
     image_url = fields.Str()
+    image_variants = fields.Dict(dump_only=True)
     views = fields.Int(dump_only=True)
     status = fields.Str(validate=validate.OneOf(['published', 'draft']))
     author_id = fields.Int(dump_only=True)
@@ -26,6 +27,7 @@ class ArticleListSchema(Schema):
     slug = fields.Str()
     excerpt = fields.Str()
     image_url = fields.Str()
+    image_variants = fields.Dict()
     views = fields.Int()
     status = fields.Str()
     author_id = fields.Int()
@@ -12,4 +12,5 @@ class CommentSchema(Schema):
     
     # Nested fields
     user = fields.Nested('UserSchema', only=('id', 'username', 'full_name', 'avatar_url'), dump_only=True)
-    replies = fields.List(fields.Nested('self', exclude=('replies',)), dump_only=True)
+    # Rekursif; kedalaman dibatasi oleh data yang dimuat services.comment_tree
+    replies = fields.List(fields.Nested('self'), dump_only=True)
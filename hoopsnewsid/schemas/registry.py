@@ -0,0 +1,230 @@
+"""Shared schema instances and compiled dumpers.
+
+Instantiating a marshmallow schema copies and binds its declared fields,
+and each ``Nested`` field builds its nested schema again on first use,
+so views no longer create schemas per request. ``SchemaRegistry``
+keeps one instance per ``(schema class, options)``; ``dump`` and
+``load`` keep their state per call, so the instances are safe to share
+between request threads (as long as nobody sets ``schema.context``).
+
+``SchemaRegistry.dumper`` compiles a schema's dump fields into plain
+attribute getters and per-type converters once, for list endpoints
+where marshmallow's per-field ``serialize`` calls dominate. The result
+equals ``schema.dump`` except that ``DateTime`` values are left as
+``datetime`` objects; the ``json`` renderer writes them in the same ISO
+8601 form.
+"""
+import threading
+from operator import attrgetter
+
+from marshmallow import Schema, fields
+from marshmallow.decorators import POST_DUMP, PRE_DUMP
+
+from .article import ArticleListSchema, ArticleSchema
+from .auth import LoginSchema, RegisterSchema
+from .comment import CommentSchema
+from .thread import ThreadDetailSchema, ThreadSchema
+from .user import UserProfileSchema, UserSchema
+
+# Dibangun saat startup: (schema, options) yang dipakai view
+PRELOAD = [
+    (ArticleSchema, {}),
+    (ThreadSchema, {}),
+    (ThreadDetailSchema, {'exclude': ('comments',)}),
+    (CommentSchema, {}),
+    (UserSchema, {}),
+    (UserProfileSchema, {}),
+    (LoginSchema, {}),
+    (RegisterSchema, {}),
+]
+
+# Schema daftar yang di-dump lewat jalur cepat
+PRELOAD_DUMPERS = [
+    (ArticleListSchema, {'many': True}),
+    (ThreadSchema, {'many': True}),
+    (CommentSchema, {'many': True}),
+    (ArticleListSchema, {}),
+    (ThreadSchema, {}),
+    (CommentSchema, {'exclude': ('replies',)}),
+    (CommentSchema, {'many': True, 'exclude': ('replies.replies',)}),
+]
+
+
+class UnsupportedSchema(ValueError):
+    """The schema uses features the compiled dumper cannot reproduce."""
+
+
+def _fast(field, exact_type, name):
+    # Nilai dengan tipe yang sudah benar lolos apa adanya, sisanya lewat field
+    serialize = field._serialize
+
+    def convert(value):
+        if value is None or type(value) is exact_type:
+            return value
+        return serialize(value, name, None)
+    return convert
+
+
+def _bool(field, name):
+    serialize = field._serialize
+
+    def convert(value):
+        if value is None or value is True or value is False:
+            return value
+        return serialize(value, name, None)
+    return convert
+
+
+def _implements(field, field_class):
+    return type(field)._serialize is field_class._serialize
+
+
+def _converter(field, name, memo):
+    """``convert(value)`` for one field, or ``None`` when values pass through unchanged."""
+    if isinstance(field, fields.Nested):
+        dump = compile_dumper(field.schema, memo)
+        if field.many or field.schema.many:
+            return lambda value: None if value is None else [dump(item) for item in value]
+        return lambda value: None if value is None else dump(value)
+    if isinstance(field, fields.List) and _implements(field, fields.List):
+        inner = _converter(field.inner, name, memo)
+        if inner is None:
+            return lambda value: None if value is None else list(value)
+        return lambda value: None if value is None else [inner(item) for item in value]
+    if isinstance(field, fields.DateTime) and _implements(field, fields.DateTime) \
+            and type(field) is fields.DateTime and field.format in (None, 'iso'):
+        return None
+    if isinstance(field, fields.Integer) and _implements(field, fields.Number) and not field.as_string:
+        return _fast(field, int, name)
+    if isinstance(field, fields.String) and _implements(field, fields.String):
+        return _fast(field, str, name)
+    if isinstance(field, fields.Boolean) and _implements(field, fields.Boolean):
+        return _bool(field, name)
+    raise UnsupportedSchema(type(field).__name__)
+
+
+def _getter(name, field, memo):
+    get = attrgetter(field.attribute or name)
+    try:
+        convert = _converter(field, name, memo)
+    except UnsupportedSchema:
+        # Field lain (Method, Function, Decimal, ...) tetap lewat marshmallow
+        return lambda obj: field.serialize(name, obj)
+    if convert is None:
+        return get
+    return lambda obj: convert(get(obj))
+
+
+def compile_dumper(schema, memo=None):
+    """Compile ``schema`` into ``dump(obj) -> dict`` for a single object.
+
+    Raises ``UnsupportedSchema`` for schemas with ``pre_dump``/``post_dump``
+    hooks or a custom ``get_attribute``.
+    """
+    if schema._has_processors(PRE_DUMP) or schema._has_processors(POST_DUMP):
+        raise UnsupportedSchema(f'{type(schema).__name__} has dump hooks')
+    if type(schema).get_attribute is not Schema.get_attribute:
+        raise UnsupportedSchema(f'{type(schema).__name__} overrides get_attribute')
+
+    memo = {} if memo is None else memo
+    key = (type(schema), tuple(schema.dump_fields))
+    if key in memo:
+        # Nested('self'): pakai dumper yang sedang dibangun
+        return memo[key]
+
+    getters = []
+
+    def dump(obj):
+        return {key: get(obj) for key, get in getters}
+
+    memo[key] = dump
+    for name, field in schema.dump_fields.items():
+        data_key = field.data_key if field.data_key is not None else name
+        getters.append((data_key, _getter(name, field, memo)))
+    return dump
+
+
+class CompiledDumper:
+    """Stand-in for a schema's ``dump`` built by ``compile_dumper``."""
+
+    def __init__(self, schema):
+        self.schema = schema
+        self.many = schema.many
+        self._dump = compile_dumper(schema)
+
+    def dump(self, obj, *, many=None):
+        many = self.many if many is None else many
+        if many:
+            dump = self._dump
+            return [dump(item) for item in obj]
+        return self._dump(obj)
+
+
+def _cache_key(schema_class, options):
+    return (schema_class, tuple(sorted(
+        (name, tuple(value) if isinstance(value, (list, set, frozenset)) else value)
+        for name, value in options.items()
+    )))
+
+
+class SchemaRegistry:
+    """Thread-safe cache of schema instances and compiled dumpers."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._schemas = {}
+        self._dumpers = {}
+
+    def get(self, schema_class, **options):
+        """The shared ``schema_class(**options)`` instance."""
+        key = _cache_key(schema_class, options)
+        schema = self._schemas.get(key)
+        if schema is None:
+            with self._lock:
+                schema = self._schemas.get(key)
+                if schema is None:
+                    schema = schema_class(**options)
+                    _resolve_nested(schema, set())
+                    self._schemas[key] = schema
+        return schema
+
+    def dumper(self, schema_class, **options):
+        """A ``CompiledDumper`` for ``schema_class(**options)``.
+
+        Falls back to the shared schema instance when the schema cannot
+        be compiled.
+        """
+        key = _cache_key(schema_class, options)
+        dumper = self._dumpers.get(key)
+        if dumper is None:
+            schema = self.get(schema_class, **options)
+            try:
+                dumper = CompiledDumper(schema)
+            except UnsupportedSchema:
+                dumper = schema
+            with self._lock:
+                dumper = self._dumpers.setdefault(key, dumper)
+        return dumper
+
+
+def _resolve_nested(schema, seen):
+    # Nested.schema dibuat saat pertama diakses; bangun sekarang, bukan di request
+    key = (type(schema), tuple(schema.dump_fields), tuple(schema.load_fields))
+    if key in seen:
+        return
+    seen.add(key)
+    for field in schema.fields.values():
+        if isinstance(field, fields.List):
+            field = field.inner
+        if isinstance(field, fields.Nested):
+            _resolve_nested(field.schema, seen)
+
+
+def includeme(config):
+    """Build the schemas and dumpers the views use as ``registry.schemas``."""
+    schemas = SchemaRegistry()
+    for schema_class, options in PRELOAD:
+        schemas.get(schema_class, **options)
+    for schema_class, options in PRELOAD_DUMPERS:
+        schemas.dumper(schema_class, **options)
+    config.registry.schemas = schemas
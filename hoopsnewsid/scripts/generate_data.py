@@ -0,0 +1,358 @@
+"""Generate production-scale staging data.
+
+Usage::
+
+    generate_hoopsnewsid_data <config_uri> [users=N] [articles=N] [tags=N] [threads=N]
+        [comments=N] [seed=N] [password=P] [related=true] [var=value]
+
+Builds users, tags, articles, threads and nested comments from the
+sample data of ``initialize_db.py`` and ``initialize_threads.py``. Rows
+are written with ``COPY`` on PostgreSQL and batched ``insert()``
+executemany elsewhere, using explicit ids. Every value comes from a
+random generator seeded with ``seed``, so the same options always
+produce the same data. All generated users share one bcrypt hash of
+``password``; user 1 is the admin ``admin@example.com``.
+
+The tables must be empty. On PostgreSQL the search-vector triggers are
+switched off during ``COPY`` and the vectors are computed once per
+distinct text instead of once per row.
+"""
+import csv
+import datetime
+import io
+import os
+import random
+import sys
+import time
+
+from pyramid.paster import (
+    get_appsettings,
+    setup_logging,
+)
+
+from pyramid.scripts.common import parse_vars
+from pyramid.settings import asbool
+from sqlalchemy import func, insert, select, text
+
+from ..models import (
+    Article,
+    Base,
+    Category,
+    Comment,
+    Tag,
+    Thread,
+    User,
+    article_tag,
+    thread_tag,
+)
+
+from ..db import setup_engine
+from ..services.related import refresh_related
+from ..services.stats import refresh_stats
+from ..utils.password import hash_password
+from .initialize_db import CATEGORIES, SAMPLE_ARTICLES, SAMPLE_COMMENTS, TAGS
+from .initialize_threads import SAMPLE_THREAD_COMMENTS, SAMPLE_THREADS
+
+# Volume default; bisa diubah lewat argumen users=..., articles=..., dst.
+VOLUMES = {
+    'users': 10_000,
+    'articles': 100_000,
+    'tags': 500,
+    'threads': 50_000,
+    'comments': 1_000_000,
+}
+
+# Baris per COPY / executemany
+BATCH_SIZE = 10_000
+
+# Timestamp tetap agar hasil sama persis antar run; data mundur dua tahun
+NOW = datetime.datetime(2024, 1, 1)
+SPAN_SECONDS = 730 * 86400
+
+# Satu dari sekian user menulis artikel
+WRITER_RATIO = 20
+DRAFT_RATIO = 0.05
+UNAPPROVED_RATIO = 0.03
+REPLY_RATIO = 0.3
+ARTICLE_COMMENT_RATIO = 0.7
+# Artikel/thread/tag awal jauh lebih sering dipilih: 1% teratas mendapat
+# sekitar seperlima pilihan
+SKEW = 3
+
+COMMENT_TEXTS = [row[-1] for row in SAMPLE_COMMENTS + SAMPLE_THREAD_COMMENTS]
+
+USER_COLUMNS = ('id', 'username', 'email', 'password_hash', 'full_name', 'is_admin', 'is_active',
+                'token_version', 'created_at', 'updated_at')
+ARTICLE_COLUMNS = ('id', 'title', 'slug', 'excerpt', 'content', 'image_url', 'views', 'status',
+                   'author_id', 'category_id', 'created_at', 'updated_at', 'published_at')
+THREAD_COLUMNS = ('id', 'title', 'content', 'user_id', 'created_at', 'updated_at')
+COMMENT_COLUMNS = ('id', 'content', 'user_id', 'article_id', 'thread_id', 'parent_id', 'is_approved',
+                   'created_at', 'updated_at')
+
+# Sama dengan SEARCH_COLUMNS di migrasi add_full_text_search
+SEARCH_COLUMNS = {
+    'articles': [('title', 'A'), ('excerpt', 'B'), ('content', 'C')],
+    'threads': [('title', 'A'), ('content', 'B')],
+    'comments': [('content', 'A')],
+}
+
+
+def usage(argv):
+    cmd = os.path.basename(argv[0])
+    print('usage: %s <config_uri> [users=N] [articles=N] [tags=N] [threads=N] [comments=N]\n'
+          '       [seed=N] [password=P] [related=true] [var=value]\n'
+          '(example: "%s development.ini comments=1000000")' % (cmd, cmd))
+    sys.exit(1)
+
+
+class SearchVectors:
+    """tsvector text per distinct searchable values of a table, computed by PostgreSQL.
+
+    Generated rows reuse a few sample texts, so this runs one query per
+    distinct text instead of one trigger call per row.
+    """
+
+    def __init__(self, connection, table, columns):
+        self.connection = connection
+        searched = SEARCH_COLUMNS[table]
+        self.indexes = [columns.index(column) for column, _ in searched]
+        expression = ' || '.join(
+            f"setweight(hoopsnewsid_tsvector(coalesce(:{column}, '')), '{weight}')"
+            for column, weight in searched
+        )
+        self.statement = text(f'SELECT ({expression})::text')
+        self.names = [column for column, _ in searched]
+        self._cache = {}
+
+    def __call__(self, row):
+        key = tuple(row[i] for i in self.indexes)
+        vector = self._cache.get(key)
+        if vector is None:
+            vector = self._cache[key] = self.connection.execute(self.statement, dict(zip(self.names, key))).scalar()
+        return vector
+
+
+def _copy(connection, table, columns, rows):
+    buffer = io.StringIO()
+    # CSV: None ditulis sebagai field kosong, yang dibaca COPY sebagai NULL
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    cursor = connection.connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
+
+
+def _search_trigger(connection, table):
+    name = f'{table}_search_vector_trigger'
+    exists = connection.execute(
+        text('SELECT 1 FROM pg_trigger WHERE tgname = :name AND NOT tgisinternal'), {'name': name}
+    ).scalar()
+    return name if exists else None
+
+
+def write_rows(connection, table, columns, batches):
+    """Write ``batches`` of row tuples into ``table``; returns the row count."""
+    count = 0
+    if connection.dialect.name != 'postgresql':
+        # executemany dari satu insert(); jauh lebih cepat daripada
+        # insert().values() multi-baris yang harus dikompilasi per batch
+        statement = insert(table)
+        for rows in batches:
+            connection.execute(statement, [dict(zip(columns, row)) for row in rows])
+            count += len(rows)
+        return count
+
+    trigger = _search_trigger(connection, table.name) if table.name in SEARCH_COLUMNS else None
+    if trigger is None:
+        for rows in batches:
+            _copy(connection, table.name, columns, rows)
+            count += len(rows)
+        return count
+
+    vectors = SearchVectors(connection, table.name, columns)
+    connection.execute(text(f'ALTER TABLE {table.name} DISABLE TRIGGER {trigger}'))
+    for rows in batches:
+        _copy(connection, table.name, columns + ('search_vector',), [row + (vectors(row),) for row in rows])
+        count += len(rows)
+    connection.execute(text(f'ALTER TABLE {table.name} ENABLE TRIGGER {trigger}'))
+    return count
+
+
+def _batched(rows):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _skewed(rng, population):
+    return population[int(len(population) * rng.random() ** SKEW)]
+
+
+def _timestamp(rng):
+    return NOW - datetime.timedelta(seconds=rng.random() * SPAN_SECONDS)
+
+
+def generate_users(rng, count, password_hash):
+    yield (1, 'admin', 'admin@example.com', password_hash, 'Administrator', True, True, 0, NOW, NOW)
+    for user_id in range(2, count + 1):
+        created_at = _timestamp(rng)
+        yield (user_id, f'user{user_id}', f'user{user_id}@example.com', password_hash, f'User {user_id}',
+               False, True, 0, created_at, created_at)
+
+
+def generate_articles(rng, count, user_count, category_ids, tag_ids, published, tag_rows):
+    """Article rows; fills ``published`` ({id: published_at}) and ``tag_rows`` on the way."""
+    writers = max(user_count // WRITER_RATIO, 1)
+    for article_id in range(1, count + 1):
+        sample = SAMPLE_ARTICLES[article_id % len(SAMPLE_ARTICLES)]
+        created_at = _timestamp(rng)
+        draft = rng.random() < DRAFT_RATIO
+        if not draft:
+            published[article_id] = created_at
+        for tag_id in {_skewed(rng, tag_ids) for _ in range(rng.randint(0, 4) if tag_ids else 0)}:
+            tag_rows.append((article_id, tag_id))
+        yield (article_id, sample['title'], f"{sample['slug']}-{article_id}", sample['excerpt'],
+               sample['content'], sample['image_url'], int(rng.paretovariate(1.2) * 10),
+               'draft' if draft else 'published', rng.randint(1, writers), rng.choice(category_ids),
+               created_at, created_at, None if draft else created_at)
+
+
+def generate_threads(rng, count, user_count, tag_ids, created, tag_rows):
+    """Thread rows; fills ``created`` ({id: created_at}) and ``tag_rows`` on the way."""
+    for thread_id in range(1, count + 1):
+        _, title, content = SAMPLE_THREADS[thread_id % len(SAMPLE_THREADS)]
+        created_at = _timestamp(rng)
+        created[thread_id] = created_at
+        for tag_id in {_skewed(rng, tag_ids) for _ in range(rng.randint(0, 2) if tag_ids else 0)}:
+            tag_rows.append((thread_id, tag_id))
+        yield (thread_id, title, content, rng.randint(1, user_count), created_at, created_at)
+
+
+def generate_comments(rng, count, user_count, articles, threads):
+    """Comment rows on published articles and threads; replies answer the target's latest comment."""
+    targets = [('article', list(articles), articles), ('thread', list(threads), threads)]
+    # (jenis target, id target) -> (id, created_at) komentar terakhir
+    latest = {}
+    for comment_id in range(1, count + 1):
+        on_article = articles and (not threads or rng.random() < ARTICLE_COMMENT_RATIO)
+        kind, ids, times = targets[0] if on_article else targets[1]
+        target_id = _skewed(rng, ids)
+        parent = latest.get((kind, target_id))
+        if parent is not None and rng.random() < REPLY_RATIO:
+            parent_id, after = parent
+        else:
+            parent_id, after = None, times[target_id]
+        created_at = min(after + datetime.timedelta(seconds=rng.expovariate(1 / 36000)), NOW)
+        latest[(kind, target_id)] = (comment_id, created_at)
+        yield (comment_id, rng.choice(COMMENT_TEXTS), rng.randint(1, user_count),
+               target_id if kind == 'article' else None, target_id if kind == 'thread' else None,
+               parent_id, rng.random() >= UNAPPROVED_RATIO, created_at, created_at)
+
+
+def _reset_sequences(connection):
+    # Id ditulis eksplisit; sequence PostgreSQL harus dimajukan manual
+    for model in (User, Category, Tag, Article, Thread, Comment):
+        table = model.__tablename__
+        connection.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+            f"(SELECT COALESCE(MAX(id), 1) FROM {table}))"
+        ))
+
+
+def generate(engine, volumes=None, seed=42, password='user123', related=False, log=print):
+    """Fill an empty database with generated data; returns ``{table: rows}``."""
+    volumes = dict(VOLUMES, **(volumes or {}))
+    volumes['users'] = max(volumes['users'], 1)
+    rng = random.Random(seed)
+
+    with engine.connect() as connection:
+        if connection.execute(select(func.count()).select_from(User.__table__)).scalar():
+            raise ValueError('The users table is not empty; generate into an empty database')
+
+    counts = {}
+    with engine.begin() as connection:
+        def step(table, columns, rows):
+            started = time.perf_counter()
+            counts[table.name] = write_rows(connection, table, columns, _batched(rows))
+            log(f'{table.name:<12} {counts[table.name]:>9} rows {time.perf_counter() - started:>7.1f}s')
+
+        # Satu hash bcrypt untuk semua user; hashing per user butuh jam
+        step(User.__table__, USER_COLUMNS, generate_users(rng, volumes['users'], hash_password(password)))
+
+        categories = [(i, data['name'], data['slug'], data['description']) for i, data in enumerate(CATEGORIES, 1)]
+        step(Category.__table__, ('id', 'name', 'slug', 'description'), categories)
+        names = TAGS[:volumes['tags']] + [f'Tag {i}' for i in range(len(TAGS) + 1, volumes['tags'] + 1)]
+        step(Tag.__table__, ('id', 'name'), enumerate(names, 1))
+        tag_ids = list(range(1, len(names) + 1))
+        category_ids = [row[0] for row in categories]
+
+        published, tag_rows = {}, []
+        step(Article.__table__, ARTICLE_COLUMNS, generate_articles(
+            rng, volumes['articles'], volumes['users'], category_ids, tag_ids, published, tag_rows))
+        step(article_tag, ('article_id', 'tag_id'), tag_rows)
+
+        created, tag_rows = {}, []
+        step(Thread.__table__, THREAD_COLUMNS, generate_threads(
+            rng, volumes['threads'], volumes['users'], tag_ids, created, tag_rows))
+        step(thread_tag, ('thread_id', 'tag_id'), tag_rows)
+
+        if published or created:
+            step(Comment.__table__, COMMENT_COLUMNS, generate_comments(
+                rng, volumes['comments'], volumes['users'], published, created))
+
+        if connection.dialect.name == 'postgresql':
+            _reset_sequences(connection)
+        refresh_stats(connection)
+        if related:
+            started = time.perf_counter()
+            refresh_related(connection)
+            log(f'{"related":<12} {"":>9}      {time.perf_counter() - started:>7.1f}s')
+
+    if engine.dialect.name == 'postgresql':
+        # Statistik planner untuk tabel yang baru diisi
+        with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+            for name in counts:
+                connection.execute(text(f'ANALYZE {name}'))
+    return counts
+
+
+def main(argv=sys.argv):
+    if argv is None:
+        argv = sys.argv
+
+    if len(argv) < 2:
+        usage(argv)
+    config_uri = argv[1]
+
+    options = parse_vars(argv[2:])
+    volumes = {name: int(options.pop(name)) for name in VOLUMES if name in options}
+    seed = int(options.pop('seed', 42))
+    password = options.pop('password', 'user123')
+    related = asbool(options.pop('related', False))
+
+    setup_logging(config_uri)
+    settings = dict(get_appsettings(config_uri, name='main', options=options))
+    # Setiap batch COPY/insert "lambat"; jangan banjiri log query lambat
+    settings.pop('instrumentation.slow_query_ms', None)
+
+    engine = setup_engine(settings)
+    Base.metadata.create_all(engine)
+
+    started = time.perf_counter()
+    try:
+        counts = generate(engine, volumes, seed, password, related)
+    except ValueError as e:
+        print(e)
+        sys.exit(1)
+    print(f"Generated {sum(counts.values())} rows in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -21,6 +21,26 @@ from ..models import (
 
 from ..db import DBSession, setup_engine
 
+# Thread contoh (penulis, judul, isi); juga dipakai sebagai template oleh benchmarks/seed.py
+SAMPLE_THREADS = [
+    ('admin', "Selamat Datang di Forum Komunitas HoopsNewsID",
+     "<p>Halo semua,</p><p>Selamat datang di forum komunitas HoopsNewsID! Forum ini dibuat sebagai tempat diskusi untuk semua penggemar basket di Indonesia.</p><p>Silakan memperkenalkan diri dan mulai diskusi tentang topik basket favorit Anda.</p><p>Salam Olahraga!</p>"),
+    ('user', "Diskusi: Siapa MVP NBA Musim Ini?",
+     "<p>Dengan musim NBA yang sedang berlangsung, siapa menurut kalian yang pantas menjadi MVP tahun ini?</p><p>Saya pribadi melihat beberapa kandidat kuat seperti Nikola Jokic, Joel Embiid, dan Giannis Antetokounmpo.</p><p>Bagaimana pendapat kalian?</p>"),
+    ('admin', "Perkembangan IBL Musim 2023",
+     "<p>Bagaimana pendapat kalian tentang perkembangan IBL musim ini?</p><p>Tim mana yang menurut kalian paling berpeluang menjadi juara? Dan pemain muda mana yang paling menarik untuk diikuti?</p>"),
+]
+
+# (index thread, index komentar induk atau None, penulis, isi)
+SAMPLE_THREAD_COMMENTS = [
+    (0, None, 'user', "Terima kasih atas sambutannya! Saya penggemar berat basket sejak kecil dan senang bisa bergabung dengan komunitas ini."),
+    (1, None, 'admin', "Menurut saya Jokic masih yang terdepan untuk MVP. Triple-double machine dan efisiensinya luar biasa."),
+    (1, None, 'user', "Saya lebih condong ke Embiid. Dominasinya di kedua sisi lapangan sangat mengesankan."),
+    (2, None, 'user', "Pelita Jaya masih jadi favorit juara menurut saya. Tapi Satria Muda juga punya peluang besar."),
+    # Balasan ke komentar Jokic
+    (1, 1, 'admin', "Setuju, tapi jangan lupakan Luka Doncic juga. Statistiknya luar biasa musim ini!"),
+]
+
 
 def usage(argv):
     cmd = os.path.basename(argv[0])
@@ -65,86 +85,43 @@ def main(argv=sys.argv):
             print("User admin atau user tidak ditemukan. Pastikan initialize_db.py sudah dijalankan.")
             return
         
+        authors = {'admin': admin, 'user': user}
+
         # Buat thread contoh
         threads = [
             Thread(
-                title="Selamat Datang di Forum Komunitas HoopsNewsID",
-                content="<p>Halo semua,</p><p>Selamat datang di forum komunitas HoopsNewsID! Forum ini dibuat sebagai tempat diskusi untuk semua penggemar basket di Indonesia.</p><p>Silakan memperkenalkan diri dan mulai diskusi tentang topik basket favorit Anda.</p><p>Salam Olahraga!</p>",
-                user_id=admin.id,
-                created_at=datetime.utcnow(),
-                updated_at=datetime.utcnow()
-            ),
-            Thread(
-                title="Diskusi: Siapa MVP NBA Musim Ini?",
-                content="<p>Dengan musim NBA yang sedang berlangsung, siapa menurut kalian yang pantas menjadi MVP tahun ini?</p><p>Saya pribadi melihat beberapa kandidat kuat seperti Nikola Jokic, Joel Embiid, dan Giannis Antetokounmpo.</p><p>Bagaimana pendapat kalian?</p>",
-                user_id=user.id,
+                title=title,
+                content=content,
+                user_id=authors[author].id,
                 created_at=datetime.utcnow(),
                 updated_at=datetime.utcnow()
-            ),
-            Thread(
-                title="Perkembangan IBL Musim 2023",
-                content="<p>Bagaimana pendapat kalian tentang perkembangan IBL musim ini?</p><p>Tim mana yang menurut kalian paling berpeluang menjadi juara? Dan pemain muda mana yang paling menarik untuk diikuti?</p>",
-                user_id=admin.id,
-                created_at=datetime.utcnow(),
-                updated_at=datetime.utcnow()
-            ),
+            )
+            for author, title, content in SAMPLE_THREADS
         ]
-        
-        for thread in threads:
-            DBSession.add(thread)
+        DBSession.add_all(threads)
         
         # Flush untuk mendapatkan ID thread
         DBSession.flush()
         
         print(f"Created {len(threads)} threads")
         
-        # Tambahkan komentar ke thread
-        comments = [
-            Comment(
-                content="Terima kasih atas sambutannya! Saya penggemar berat basket sejak kecil dan senang bisa bergabung dengan komunitas ini.",
-                user_id=user.id,
-                thread_id=threads[0].id,
+        # Tambahkan komentar dan balasan ke thread
+        comments = []
+        for thread_index, parent_index, author, content in SAMPLE_THREAD_COMMENTS:
+            comment = Comment(
+                content=content,
+                user_id=authors[author].id,
+                thread_id=threads[thread_index].id,
+                parent_id=comments[parent_index].id if parent_index is not None else None,
                 is_approved=True,
                 created_at=datetime.utcnow()
-            ),
-            Comment(
-                content="Menurut saya Jokic masih yang terdepan untuk MVP. Triple-double machine dan efisiensinya luar biasa.",
-                user_id=admin.id,
-                thread_id=threads[1].id,
-                is_approved=True,
-                created_at=datetime.utcnow()
-            ),
-            Comment(
-                content="Saya lebih condong ke Embiid. Dominasinya di kedua sisi lapangan sangat mengesankan.",
-                user_id=user.id,
-                thread_id=threads[1].id,
-                is_approved=True,
-                created_at=datetime.utcnow()
-            ),
-            Comment(
-                content="Pelita Jaya masih jadi favorit juara menurut saya. Tapi Satria Muda juga punya peluang besar.",
-                user_id=user.id,
-                thread_id=threads[2].id,
-                is_approved=True,
-                created_at=datetime.utcnow()
-            ),
-        ]
-        
-        for comment in comments:
+            )
             DBSession.add(comment)
+            # Flush untuk mendapatkan ID komentar sebagai parent balasan
+            DBSession.flush()
+            comments.append(comment)
         
-        # Tambahkan balasan komentar
-        reply = Comment(
-            content="Setuju, tapi jangan lupakan Luka Doncic juga. Statistiknya luar biasa musim ini!",
-            user_id=admin.id,
-            thread_id=threads[1].id,
-            parent_id=comments[1].id,  # Balas ke komentar Jokic
-            is_approved=True,
-            created_at=datetime.utcnow()
-        )
-        DBSession.add(reply)
-        
-        print(f"Created {len(comments) + 1} comments for threads")
+        print(f"Created {len(comments)} comments for threads")
         print('Thread data initialized successfully!')
 
 
@@ -0,0 +1,126 @@
+"""Generate responsive variants for existing article images.
+
+Usage::
+
+    process_hoopsnewsid_images <config_uri> [remote=true] [limit=N] [var=value]
+
+Articles without ``image_variants`` whose ``image_url`` points at a file
+under ``hoopsnewsid:static`` (e.g. ``/static/images/articles/article1.png``)
+get their variants written by ``services/images.py``, and ``image_url``
+is switched to the largest JPEG variant. With ``remote=true`` http(s)
+URLs are downloaded first. Articles sharing an image are processed
+once. ``updated_at`` is bumped so ETags change; responses already in the
+response cache keep the old URLs until their TTL expires.
+"""
+import datetime
+import os
+import sys
+import urllib.request
+from urllib.parse import urlparse
+
+from pyramid.paster import (
+    get_appsettings,
+    setup_logging,
+)
+
+from pyramid.scripts.common import parse_vars
+from pyramid.settings import asbool
+from sqlalchemy import select, update
+
+from ..db import setup_engine
+from ..models import Article
+from ..services.images import DEFAULT_MAX_UPLOAD_SIZE, InvalidImage, resolve_directory, store_from_settings
+
+STATIC_PREFIX = '/static/'
+
+REMOTE_TIMEOUT = 30
+
+
+def usage(argv):
+    cmd = os.path.basename(argv[0])
+    print('usage: %s <config_uri> [remote=true] [limit=N] [var=value]\n'
+          '(example: "%s development.ini")' % (cmd, cmd))
+    sys.exit(1)
+
+
+def read_source(image_url, static_root, remote, max_size):
+    """Bytes of the image behind ``image_url``, or ``None`` when it cannot be read here."""
+    parsed = urlparse(image_url)
+    if parsed.path.startswith(STATIC_PREFIX):
+        path = os.path.normpath(os.path.join(static_root, parsed.path[len(STATIC_PREFIX):]))
+        if path.startswith(static_root + os.sep) and os.path.isfile(path):
+            with open(path, 'rb') as f:
+                return f.read()
+    if remote and parsed.scheme in ('http', 'https'):
+        with urllib.request.urlopen(image_url, timeout=REMOTE_TIMEOUT) as response:
+            return response.read(max_size + 1)
+    return None
+
+
+def process_images(engine, store, static_root, remote=False, limit=None, max_size=DEFAULT_MAX_UPLOAD_SIZE, log=print):
+    """Process article images and return ``(processed, skipped)``."""
+    query = select(Article.id, Article.image_url)\
+        .where(Article.image_url.isnot(None), Article.image_url != '', Article.image_variants.is_(None))\
+        .order_by(Article.id)
+    if limit:
+        query = query.limit(limit)
+
+    with engine.connect() as connection:
+        rows = connection.execute(query).all()
+
+    # Artikel dengan gambar yang sama cukup diproses sekali
+    variants_by_url = {}
+    processed = skipped = 0
+    for article_id, image_url in rows:
+        if image_url not in variants_by_url:
+            try:
+                data = read_source(image_url, static_root, remote, max_size)
+                if data is not None and len(data) > max_size:
+                    log(f'article {article_id}: {image_url} is larger than {max_size} bytes')
+                    data = None
+                variants_by_url[image_url] = store.process(data) if data is not None else None
+            except (OSError, InvalidImage) as e:
+                log(f'article {article_id}: {image_url}: {e}')
+                variants_by_url[image_url] = None
+        variants = variants_by_url[image_url]
+        if variants is None:
+            skipped += 1
+            continue
+        # Satu transaksi per artikel: proses yang terhenti tetap menyimpan hasilnya
+        with engine.begin() as connection:
+            connection.execute(
+                update(Article).where(Article.id == article_id)
+                .values(image_url=variants['src'], image_variants=variants, updated_at=datetime.datetime.utcnow())
+            )
+        processed += 1
+    return processed, skipped
+
+
+def main(argv=sys.argv):
+    if argv is None:
+        argv = sys.argv
+
+    if len(argv) < 2:
+        usage(argv)
+    config_uri = argv[1]
+
+    options = parse_vars(argv[2:])
+    remote = asbool(options.pop('remote', False))
+    limit = int(options.pop('limit', 0)) or None
+
+    setup_logging(config_uri)
+    settings = get_appsettings(config_uri, name='main', options=options)
+
+    engine = setup_engine(settings)
+    store = store_from_settings(settings)
+    max_size = int(settings.get('images.max_upload_size', DEFAULT_MAX_UPLOAD_SIZE))
+
+    processed, skipped = process_images(
+        engine, store, resolve_directory('hoopsnewsid:static'),
+        remote=remote, limit=limit, max_size=max_size,
+    )
+    print(f"images processed: {processed}, skipped: {skipped}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+import os
+import sys
+
+from pyramid.paster import (
+    get_appsettings,
+    setup_logging,
+)
+
+from pyramid.scripts.common import parse_vars
+
+from ..db import setup_engine
+from ..services.related import refresh_related
+
+
+def usage(argv):
+    cmd = os.path.basename(argv[0])
+    print('usage: %s <config_uri> [var=value]\n'
+          '(example: "%s development.ini")' % (cmd, cmd))
+    sys.exit(1)
+
+
+def main(argv=sys.argv):
+    """Recompute every related-articles list; run daily from cron."""
+    if argv is None:
+        argv = sys.argv
+
+    if len(argv) < 2:
+        usage(argv)
+    config_uri = argv[1]
+
+    options = parse_vars(argv[2:])
+    setup_logging(config_uri)
+    settings = get_appsettings(config_uri, name='main', options=options)
+
+    engine = setup_engine(settings)
+
+    # Satu transaksi: endpoint tidak pernah melihat tabel setengah terisi
+    with engine.begin() as connection:
+        count = refresh_related(connection)
+
+    print(f"related lists: {count}")
@@ -0,0 +1,44 @@
+import os
+import sys
+import transaction
+
+from pyramid.paster import (
+    get_appsettings,
+    setup_logging,
+)
+
+from pyramid.scripts.common import parse_vars
+from zope.sqlalchemy import mark_changed
+
+from ..db import DBSession, setup_engine
+from ..services.stats import refresh_stats
+
+
+def usage(argv):
+    cmd = os.path.basename(argv[0])
+    print('usage: %s <config_uri> [var=value]\n'
+          '(example: "%s development.ini")' % (cmd, cmd))
+    sys.exit(1)
+
+
+def main(argv=sys.argv):
+    """Recompute the site_stats rollup; safe to run from cron."""
+    if argv is None:
+        argv = sys.argv
+
+    if len(argv) < 2:
+        usage(argv)
+    config_uri = argv[1]
+
+    options = parse_vars(argv[2:])
+    setup_logging(config_uri)
+    settings = get_appsettings(config_uri, name='main', options=options)
+
+    setup_engine(settings)
+
+    with transaction.manager:
+        values = refresh_stats(DBSession.connection())
+        mark_changed(DBSession())
+
+    for name, value in sorted(values.items()):
+        print(f"{name}: {value}")
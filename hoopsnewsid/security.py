@@ -1,7 +1,13 @@
+import threading
+import time
+from collections import namedtuple
+
+import transaction
 from pyramid.httpexceptions import HTTPUnauthorized
 from pyramid.authentication import CallbackAuthenticationPolicy
 from pyramid.authorization import ACLAuthorizationPolicy
 from pyramid.security import Authenticated, Everyone, Allow, ALL_PERMISSIONS
+from pyramid.settings import asbool
 
 from .utils.jwt import decode_token
 from .models import User
@@ -11,12 +17,9 @@ class JWTAuthenticationPolicy(CallbackAuthenticationPolicy):
         self.callback = callback
 
     def unauthenticated_userid(self, request):
-        token = request.headers.get('Authorization', '')
-        if token.startswith('Bearer '):
-            token = token[7:]
-            payload = decode_token(token, request)
-            if payload:
-                return payload.get('sub')
+        payload = request.jwt_claims
+        if payload:
+            return payload.get('sub')
         return None
 
     def remember(self, request, userid, **kw):
@@ -25,26 +28,152 @@ class JWTAuthenticationPolicy(CallbackAuthenticationPolicy):
     def forget(self, request):
         return []
 
+# Request yang tidak mengubah data; hanya ini yang boleh memakai principals
+# langsung dari klaim token dalam mode stateless
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+class Identity(namedtuple('Identity', 'id is_admin is_active version')):
+    """Snapshot of the user fields authorization depends on.
+
+    Immutable, so one instance can be shared between requests through
+    ``IdentityCache``.
+    """
+
+    @classmethod
+    def from_user(cls, user):
+        return cls(user.id, bool(user.is_admin), user.is_active is not False, user.token_version or 0)
+
+    @classmethod
+    def from_claims(cls, payload):
+        """Identity built only from the signed token, without the database."""
+        return cls(payload['sub'], bool(payload.get('admin')), True, payload.get('ver', 0))
+
+    def principals(self):
+        principals = [f'user:{self.id}']
+        if self.is_admin:
+            principals.append('role:admin')
+        principals.append(Authenticated)
+        principals.append(Everyone)
+        return principals
+
+
+class IdentityCache:
+    """Process-wide identity cache keyed on the token's ``(sub, iat)``.
+
+    Entries are grouped per user id so ``invalidate`` can drop every token
+    of a user at once. Other processes only see changes once the TTL runs
+    out, so keep it short.
+    """
+
+    def __init__(self, ttl=30, max_users=10000):
+        self.ttl = ttl
+        self.max_users = max_users
+        self._lock = threading.Lock()
+        self._users = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, userid, iat):
+        if self.ttl <= 0:
+            return None
+        with self._lock:
+            entry = self._users.get(userid, {}).get(iat)
+        if entry is None or entry[0] < time.monotonic():
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[1]
+
+    def set(self, userid, iat, identity):
+        if self.ttl <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            tokens = self._users.setdefault(userid, {})
+            # Buang token lama milik user ini yang sudah kedaluwarsa
+            for key in [key for key, (expires, _) in tokens.items() if expires < now]:
+                del tokens[key]
+            tokens[iat] = (now + self.ttl, identity)
+            if len(self._users) > self.max_users:
+                self._users = {userid: tokens}
+
+    def invalidate(self, userid):
+        with self._lock:
+            self._users.pop(userid, None)
+
+    def clear(self):
+        with self._lock:
+            self._users.clear()
+
+    def metrics(self):
+        return {'users': len(self._users), 'hits': self.hits, 'misses': self.misses}
+
+
+def invalidate_identity(request, userid):
+    """Drop cached identities of ``userid`` once the transaction commits."""
+    cache = request.registry.identity_cache
+
+    def after_commit(success):
+        if success:
+            cache.invalidate(userid)
+
+    transaction.get().addAfterCommitHook(after_commit)
+
+
+# Payload JWT dari header Authorization, di-decode sekali per request
+def get_jwt_claims(request):
+    token = request.headers.get('Authorization', '')
+    if token.startswith('Bearer '):
+        return decode_token(token[7:], request)
+    return None
+
+# Identity untuk request.auth_identity; user hanya di-query jika belum ada di cache
+def get_identity(request):
+    payload = request.jwt_claims
+    userid = payload.get('sub') if payload else None
+    if userid is None:
+        return None
+
+    # Mode stateless: request baca cukup percaya klaim yang sudah ditandatangani;
+    # versi token baru dicek saat request.user dimuat atau pada request tulis
+    if request.registry.stateless_principals and request.method in SAFE_METHODS:
+        return Identity.from_claims(payload)
+
+    cache = request.registry.identity_cache
+    identity = cache.get(userid, payload.get('iat'))
+    if identity is None:
+        user = request.db.query(User).filter(User.id == userid).first()
+        if not user:
+            return None
+        identity = Identity.from_user(user)
+        cache.set(userid, payload.get('iat'), identity)
+        # Dipakai ulang oleh request.user agar tidak query dua kali
+        request._identity_user = user
+
+    # Akun yang dinonaktifkan atau token yang sudah dicabut dianggap tidak login
+    if not identity.is_active or identity.version != payload.get('ver', 0):
+        return None
+    return identity
+
 # Callback yang mengembalikan list principals (string)
 def get_principals(userid, request):
-    user = None
-    if userid is not None:
-        user = request.db.query(User).filter(User.id == userid).first()
-    if not user:
+    identity = request.auth_identity
+    if identity is None or identity.id != userid:
         return []
-    principals = [f'user:{user.id}']
-    if user.is_admin:
-        principals.append('role:admin')
-    principals.append(Authenticated)
-    principals.append(Everyone)
-    return principals
+    return identity.principals()
 
 # Fungsi untuk request.user (mengembalikan objek User)
 def get_user(request):
-    userid = request.unauthenticated_userid
-    if userid is not None:
-        return request.db.query(User).filter(User.id == userid).first()
-    return None
+    identity = request.auth_identity
+    if identity is None:
+        return None
+    user = getattr(request, '_identity_user', None)
+    if user is None:
+        user = request.db.get(User, identity.id)
+    # Pengecekan lazy untuk identity dari klaim token (mode stateless)
+    if user is None or user.is_active is False or (user.token_version or 0) != identity.version:
+        return None
+    return user
 
 def require_auth(view):
     def wrapped_view(context, request):
@@ -71,4 +200,13 @@ def includeme(config):
     config.set_default_permission('view')
     config.set_root_factory(RootFactory)
 
+    settings = config.get_settings()
+    config.registry.stateless_principals = asbool(settings.get('auth.stateless_principals', False))
+    config.registry.identity_cache = IdentityCache(
+        ttl=int(settings.get('auth.identity_cache_ttl', 30)),
+        max_users=int(settings.get('auth.identity_cache_max_users', 10000)),
+    )
+
+    config.add_request_method(get_jwt_claims, 'jwt_claims', reify=True)
+    config.add_request_method(get_identity, 'auth_identity', reify=True)
     config.add_request_method(get_user, 'user', reify=True)
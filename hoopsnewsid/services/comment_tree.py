@@ -0,0 +1,95 @@
+"""Load an article's or thread's comment tree in one round trip.
+
+A recursive CTE walks from the (optionally paginated) top-level comments
+down to ``max_depth`` levels of replies. The nesting is assembled in
+memory and written into ``Comment.replies`` with ``set_committed_value``,
+so serializing the tree never lazy-loads.
+"""
+from sqlalchemy import func, literal, select
+from sqlalchemy.orm import joinedload
+from sqlalchemy.orm.attributes import set_committed_value
+
+from ..models import Comment
+
+# Kedalaman balasan maksimum yang boleh diminta klien
+MAX_REPLY_DEPTH = 5
+
+
+def _owner_filter(article_id, thread_id):
+    if article_id is not None:
+        return Comment.article_id == article_id
+    return Comment.thread_id == thread_id
+
+
+def load_comment_tree(db, article_id=None, thread_id=None, page=None, per_page=None,
+                      max_depth=1, approved_only=False):
+    """Return ``(total, roots)`` for an article's or a thread's comments.
+
+    ``roots`` are the top-level comments, newest first, with ``replies``
+    filled in up to ``max_depth`` levels (oldest first). ``total`` counts
+    top-level comments and is only queried when ``page`` is given;
+    otherwise it is ``len(roots)``.
+    """
+    max_depth = max(0, min(max_depth, MAX_REPLY_DEPTH))
+    conditions = [_owner_filter(article_id, thread_id)]
+    if approved_only:
+        conditions.append(Comment.is_approved == True)
+
+    roots = select(Comment.id)\
+        .where(Comment.parent_id == None, *conditions)\
+        .order_by(Comment.created_at.desc(), Comment.id.desc())
+    total = None
+    if page is not None:
+        total = db.execute(select(func.count()).select_from(roots.order_by(None).subquery())).scalar()
+        roots = roots.limit(per_page).offset((page - 1) * per_page)
+
+    # Anchor: komentar level atas; bagian rekursif: balasan sampai max_depth
+    tree = select(Comment.id, literal(0).label('depth'))\
+        .where(Comment.id.in_(roots.subquery().select()))\
+        .cte('comment_tree', recursive=True)
+    tree = tree.union_all(
+        select(Comment.id, tree.c.depth + 1)
+        .join(tree, Comment.parent_id == tree.c.id)
+        .where(tree.c.depth < max_depth, *conditions)
+    )
+
+    rows = db.query(Comment, tree.c.depth)\
+        .options(joinedload(Comment.user))\
+        .join(tree, Comment.id == tree.c.id)\
+        .order_by(tree.c.depth, Comment.created_at, Comment.id)\
+        .all()
+
+    children = {}
+    top_level = []
+    for comment, depth in rows:
+        children[comment.id] = []
+        if depth == 0:
+            top_level.append(comment)
+        else:
+            children[comment.parent_id].append(comment)
+    for comment, depth in rows:
+        set_committed_value(comment, 'replies', children[comment.id])
+
+    top_level.sort(key=lambda c: (c.created_at, c.id), reverse=True)
+    return (len(top_level) if total is None else total), top_level
+
+
+def load_flat_comments(db, article_id=None, thread_id=None):
+    """Every comment of an article or thread in one query, oldest first.
+
+    Each comment's ``replies`` holds its direct replies, which also appear
+    in the flat list; this is the shape thread detail returned before
+    ``depth`` existed. Dump it without ``replies.replies``.
+    """
+    comments = db.query(Comment)\
+        .options(joinedload(Comment.user))\
+        .filter(_owner_filter(article_id, thread_id))\
+        .order_by(Comment.created_at, Comment.id)\
+        .all()
+    children = {comment.id: [] for comment in comments}
+    for comment in comments:
+        if comment.parent_id in children:
+            children[comment.parent_id].append(comment)
+    for comment in comments:
+        set_committed_value(comment, 'replies', children[comment.id])
+    return comments
@@ -0,0 +1,248 @@
+"""Responsive variants for article images.
+
+An image is decoded once and written as WebP and JPEG at every width in
+``images.widths`` up to its own width. Files are named after the
+SHA-256 of the source bytes (``<hash>-<width>.<ext>``), so a URL never
+changes content and is served with ``Cache-Control: immutable``;
+processing the same image again writes nothing.
+
+The result is stored on the article as ``image_variants``::
+
+    {"width": 1600, "height": 900, "src": "<largest jpeg url>",
+     "srcset": {"webp": "<url> 320w, <url> 640w, ...", "jpeg": "..."}}
+
+and ``image_url`` is set to ``src`` for clients without srcset.
+
+Settings::
+
+    images.directory = hoopsnewsid:static/images/variants   # asset spec or path
+    images.base_url = /static/images/variants               # or a CDN origin
+    images.widths = 320 640 960 1280
+    images.webp_quality = 80
+    images.jpeg_quality = 82
+    images.max_upload_size = 10485760
+    images.max_workers = 1                                   # concurrent uploads processed
+    images.max_queue = 1                                     # uploads waiting; beyond: 503
+    static.cache_max_age = 3600                              # other static files
+
+The package directory is often read-only once installed; point
+``images.directory`` at a data directory in production.
+"""
+import atexit
+import hashlib
+import io
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from pyramid.path import AssetResolver
+from pyramid.security import NO_PERMISSION_REQUIRED
+from pyramid.static import static_view
+
+try:
+    from PIL import Image, ImageOps, UnidentifiedImageError
+except ImportError:  # pragma: no cover - Pillow opsional
+    Image = None
+
+from ..utils.password import DEFAULT_SERVER_THREADS, pool_limits
+
+DEFAULT_WIDTHS = (320, 640, 960, 1280)
+
+DEFAULT_MAX_UPLOAD_SIZE = 10 * 1024 * 1024
+
+# Format keluaran: nama di srcset, ekstensi file, format Pillow
+FORMATS = (
+    ('webp', 'webp', 'WEBP'),
+    ('jpeg', 'jpg', 'JPEG'),
+)
+
+# Nama file berisi hash, jadi isinya tidak pernah berubah
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+def _current_umask():
+    # umask hanya bisa dibaca dengan menyetelnya; dipanggil sekali saat startup
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+class InvalidImage(ValueError):
+    """The uploaded bytes are not an image Pillow can decode."""
+
+
+class ImageProcessorBusy(Exception):
+    """Raised when the processing queue is full; views answer with 503."""
+
+
+def _flatten(image):
+    # JPEG tidak punya alpha: tempel di atas latar putih
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+class ImageStore:
+    """Write content-hashed variants of images to ``directory``."""
+
+    def __init__(self, directory, base_url, widths=DEFAULT_WIDTHS, webp_quality=80, jpeg_quality=82):
+        self.directory = directory
+        self.base_url = base_url.rstrip('/')
+        self.widths = tuple(sorted(widths))
+        self.quality = {'webp': webp_quality, 'jpeg': jpeg_quality}
+        # mkstemp membuat file 0600; server web/origin CDN bisa berjalan sebagai user lain
+        self.file_mode = 0o644 & ~_current_umask()
+
+    def url(self, filename):
+        return f'{self.base_url}/{filename}'
+
+    def process(self, data):
+        """Write the variants of the image in ``data`` and return its ``image_variants``."""
+        if Image is None:
+            raise RuntimeError('image processing requires the "Pillow" package')
+        try:
+            image = Image.open(io.BytesIO(data))
+            image = ImageOps.exif_transpose(image)
+        except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as e:
+            raise InvalidImage(str(e))
+
+        digest = hashlib.sha256(data).hexdigest()[:20]
+        width, height = image.size
+        targets = sorted({min(target, width) for target in self.widths})
+        os.makedirs(self.directory, exist_ok=True)
+
+        srcset = {}
+        sources = {'webp': image if image.mode in ('RGB', 'RGBA') else image.convert('RGBA'), 'jpeg': _flatten(image)}
+        for name, extension, pillow_format in FORMATS:
+            entries = []
+            for target in targets:
+                filename = f'{digest}-{target}.{extension}'
+                path = os.path.join(self.directory, filename)
+                if not os.path.exists(path):
+                    resized = sources[name]
+                    if target < width:
+                        resized = resized.resize((target, max(round(height * target / width), 1)), Image.LANCZOS)
+                    self._save(resized, path, pillow_format, self.quality[name])
+                entries.append(f'{self.url(filename)} {target}w')
+            srcset[name] = ', '.join(entries)
+
+        return {
+            'width': width,
+            'height': height,
+            'src': self.url(f'{digest}-{targets[-1]}.jpg'),
+            'srcset': srcset,
+        }
+
+    def _save(self, image, path, pillow_format, quality):
+        # Tulis ke file sementara lalu rename: URL tidak pernah menunjuk file setengah jadi
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                options = {'quality': quality}
+                if pillow_format == 'JPEG':
+                    options.update(optimize=True, progressive=True)
+                else:
+                    options.update(method=4)
+                image.save(f, pillow_format, **options)
+            os.chmod(temp_path, self.file_mode)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+
+class ImageProcessor:
+    """Run ``ImageStore.process`` for uploads on a small dedicated thread pool.
+
+    Decoding, up to eight resizes and the encodes take long enough that
+    uploads must not run them unbounded on request threads. At most
+    ``max_workers`` images are processed at once and ``max_queue`` more
+    may wait; anything beyond raises ``ImageProcessorBusy`` at once. As
+    with the password hasher, the sum stays below ``server.threads``.
+    """
+
+    def __init__(self, store, max_workers=1, max_queue=1):
+        self.store = store
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='image-processor')
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self._lock = threading.Lock()
+        self.processed = 0
+        self.rejected = 0
+
+    def process(self, data):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise ImageProcessorBusy('Too many image uploads in progress')
+        try:
+            variants = self._executor.submit(self.store.process, data).result()
+        finally:
+            self._slots.release()
+        with self._lock:
+            self.processed += 1
+        return variants
+
+    def metrics(self):
+        with self._lock:
+            return {'processed': self.processed, 'rejected': self.rejected}
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+
+def immutable_static_view(root):
+    """Static view for content-hashed files, cached by clients for a year."""
+    serve = static_view(root, cache_max_age=31536000, use_subpath=True)
+
+    def view(context, request):
+        response = serve(context, request)
+        response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+        return response
+    return view
+
+
+def resolve_directory(spec):
+    """Filesystem path for an asset spec (``package:path``) or a plain path."""
+    return AssetResolver().resolve(spec).abspath()
+
+
+def store_from_settings(settings):
+    return ImageStore(
+        resolve_directory(settings.get('images.directory', 'hoopsnewsid:static/images/variants')),
+        settings.get('images.base_url', '/static/images/variants'),
+        widths=[int(width) for width in settings.get('images.widths', '').split()] or DEFAULT_WIDTHS,
+        webp_quality=int(settings.get('images.webp_quality', 80)),
+        jpeg_quality=int(settings.get('images.jpeg_quality', 82)),
+    )
+
+
+def includeme(config):
+    """Create ``registry.image_store`` and ``registry.image_processor``.
+
+    Also serves the variants when ``images.base_url`` is local.
+    """
+    settings = config.get_settings()
+    store = store_from_settings(settings)
+    config.registry.image_store = store
+    config.registry.image_max_upload_size = int(settings.get('images.max_upload_size', DEFAULT_MAX_UPLOAD_SIZE))
+    max_workers, max_queue = pool_limits(
+        int(settings.get('images.max_workers', 1)),
+        int(settings.get('images.max_queue', 1)),
+        int(settings.get('server.threads', DEFAULT_SERVER_THREADS)),
+    )
+    processor = ImageProcessor(store, max_workers=max_workers, max_queue=max_queue)
+    atexit.register(processor.shutdown)
+    config.registry.image_processor = processor
+
+    if store.base_url.startswith('/'):
+        # Harus sebelum add_static_view('static') agar route ini yang cocok
+        config.add_route('image_variants', f'{store.base_url}/*subpath')
+        config.add_view(
+            immutable_static_view(store.directory),
+            route_name='image_variants',
+            permission=NO_PERMISSION_REQUIRED,
+        )
@@ -0,0 +1,390 @@
+"""Precomputed related-articles lists.
+
+Every published article keeps its ``TOP_K`` most related published
+articles in ``related_articles``. The score of a candidate mixes the tag
+overlap with the source article (Jaccard), a category match and the
+candidate's recency (exponential decay). ``GET /api/articles/related``
+reads a list with a single query on the table's primary key.
+
+``refresh_related`` recomputes whole lists, for the batch script and for
+lists that lost an entry. ``update_related`` handles one changed article
+incrementally; writes only queue the article id, and a background
+``RelatedUpdater`` thread runs the updates. Stored recency scores go
+stale, so run the batch script (``refresh_hoopsnewsid_related``) daily.
+
+Only the ``TAG_CANDIDATE_LIMIT`` newest articles of each tag are
+considered as tag-sharing candidates, so both the batch and one update
+stay linear in the number of articles however popular a tag gets.
+
+Settings::
+
+    related.max_pending = 1000    # queued article ids; beyond this the batch repairs
+"""
+import atexit
+import datetime
+import heapq
+import logging
+import threading
+from collections import defaultdict, namedtuple
+
+import transaction
+from sqlalchemy import delete, func, insert, inspect, select
+
+from ..models import Article, RelatedArticle, article_tag
+from ..utils.pagination import keyset_order
+
+log = logging.getLogger(__name__)
+
+# Panjang daftar yang disimpan; batas atas parameter `limit` endpoint
+TOP_K = 12
+
+TAG_WEIGHT = 0.6
+CATEGORY_WEIGHT = 0.25
+RECENCY_WEIGHT = 0.15
+# Skor recency turun setengah setiap RECENCY_HALF_LIFE hari
+RECENCY_HALF_LIFE = 30
+
+# Artikel sekategori terbaru yang daftarnya ikut diperbarui saat satu artikel
+# berubah; sisanya menunggu batch
+REVERSE_CATEGORY_LIMIT = 200
+
+# Artikel terbaru per tag yang menjadi kandidat (dan tetangga pada update);
+# tanpa batas, tag populer membuat perhitungan kuadratik
+TAG_CANDIDATE_LIMIT = 100
+
+PUBLISHED = Article.status == 'published'
+
+ArticleInfo = namedtuple('ArticleInfo', 'category_id published_at tags')
+
+
+def _load(connection, *conditions):
+    """``{id: ArticleInfo}`` for the published articles matching ``conditions``."""
+    rows = connection.execute(
+        select(Article.id, Article.category_id, Article.published_at).where(PUBLISHED, *conditions)
+    ).all()
+    tags = defaultdict(set)
+    tag_rows = select(article_tag.c.article_id, article_tag.c.tag_id)\
+        .join(Article, Article.id == article_tag.c.article_id)\
+        .where(PUBLISHED, *conditions)
+    for article_id, tag_id in connection.execute(tag_rows):
+        tags[article_id].add(tag_id)
+    return {
+        article_id: ArticleInfo(category_id, published_at, frozenset(tags[article_id]))
+        for article_id, category_id, published_at in rows
+    }
+
+
+def _newest(connection, *conditions):
+    """Ids of the ``TOP_K + 1`` newest published articles matching ``conditions``."""
+    return connection.execute(
+        select(Article.id).where(PUBLISHED, *conditions)
+        .order_by(*keyset_order(Article.published_at, Article.id))
+        .limit(TOP_K + 1)
+    ).scalars().all()
+
+
+def _sharing_tags(tag_ids):
+    """Condition selecting the ``TAG_CANDIDATE_LIMIT`` newest published articles of each tag."""
+    ranked = select(
+        article_tag.c.article_id,
+        func.row_number().over(
+            partition_by=article_tag.c.tag_id,
+            order_by=keyset_order(Article.published_at, Article.id),
+        ).label('tag_rank'),
+    ).join(Article, Article.id == article_tag.c.article_id)\
+        .where(PUBLISHED, article_tag.c.tag_id.in_(tag_ids))\
+        .subquery()
+    return Article.id.in_(select(ranked.c.article_id).where(ranked.c.tag_rank <= TAG_CANDIDATE_LIMIT))
+
+
+def _newest_first(articles, article_ids):
+    """``article_ids`` ordered like ``keyset_order`` on ``published_at``."""
+    return sorted(
+        article_ids, key=lambda i: (articles[i].published_at or datetime.datetime.min, i), reverse=True
+    )
+
+
+def recency(candidate, now):
+    """Recency part of the score, between 0 and 1."""
+    if candidate.published_at is None:
+        return 0.0
+    age_days = max((now - candidate.published_at).total_seconds(), 0) / 86400
+    return 0.5 ** (age_days / RECENCY_HALF_LIFE)
+
+
+def score(source, candidate, now, candidate_recency=None):
+    """How related ``candidate`` is to ``source``, between 0 and 1.
+
+    ``candidate_recency`` is ``recency(candidate, now)``, when the caller
+    has already computed it.
+    """
+    union = source.tags | candidate.tags
+    jaccard = len(source.tags & candidate.tags) / len(union) if union else 0.0
+    same_category = source.category_id is not None and source.category_id == candidate.category_id
+    if candidate_recency is None:
+        candidate_recency = recency(candidate, now)
+    return TAG_WEIGHT * jaccard + CATEGORY_WEIGHT * same_category + RECENCY_WEIGHT * candidate_recency
+
+
+def _ranked(entries):
+    """Best ``TOP_K`` of ``[(related_id, score)]``, highest score (then newest id) first."""
+    return heapq.nlargest(TOP_K, entries, key=lambda entry: (entry[1], entry[0]))
+
+
+def _write(connection, lists, now):
+    """Replace the stored lists of ``{article_id: [(related_id, score)]}``."""
+    table = RelatedArticle.__table__
+    if not lists:
+        return
+    connection.execute(delete(table).where(table.c.article_id.in_(list(lists))))
+    rows = [
+        {'article_id': article_id, 'rank': rank, 'related_id': related_id, 'score': value, 'computed_at': now}
+        for article_id, entries in lists.items()
+        for rank, (related_id, value) in enumerate(entries)
+    ]
+    if rows:
+        connection.execute(insert(table), rows)
+
+
+def refresh_related(connection, article_ids=None):
+    """Recompute the lists of ``article_ids`` (default: every article).
+
+    Returns the number of lists written. Articles that are not published
+    (anymore) get an empty list.
+
+    A candidate that shares no tag with the source scores on category and
+    recency only, so beyond the articles sharing a tag, only the
+    ``TOP_K + 1`` newest articles overall and per category can make the
+    list. Articles sharing a tag are limited to the
+    ``TAG_CANDIDATE_LIMIT`` newest of each tag; older ones only make a
+    list of a source they share a rarer tag with.
+    """
+    now = datetime.datetime.utcnow()
+    if article_ids is None:
+        articles = _load(connection)
+        sources = list(articles)
+        newest = _newest_first(articles, articles)
+        newest_overall = newest[:TOP_K + 1]
+        newest_by_category = defaultdict(list)
+        for article_id in newest:
+            category_newest = newest_by_category[articles[article_id].category_id]
+            if len(category_newest) <= TOP_K:
+                category_newest.append(article_id)
+        connection.execute(delete(RelatedArticle.__table__))
+    else:
+        sources = list(set(article_ids))
+        if not sources:
+            return 0
+        articles = _load(connection, Article.id.in_(sources))
+        tag_ids = set().union(*(info.tags for info in articles.values()))
+        if tag_ids:
+            articles.update(_load(connection, _sharing_tags(tag_ids)))
+        newest_overall = _newest(connection)
+        newest_by_category = {
+            category_id: _newest(connection, Article.category_id == category_id)
+            for category_id in {articles[i].category_id for i in sources if i in articles} - {None}
+        }
+        extra = set(newest_overall).union(*newest_by_category.values()) - set(articles)
+        if extra:
+            articles.update(_load(connection, Article.id.in_(extra)))
+
+    by_tag = defaultdict(list)
+    for article_id, info in articles.items():
+        for tag_id in info.tags:
+            by_tag[tag_id].append(article_id)
+    for tag_id, article_ids in by_tag.items():
+        by_tag[tag_id] = _newest_first(articles, article_ids)[:TAG_CANDIDATE_LIMIT]
+
+    # Recency tiap kandidat cukup dihitung sekali
+    recencies = {article_id: recency(info, now) for article_id, info in articles.items()}
+    lists = {}
+    for source_id in sources:
+        source = articles.get(source_id)
+        if source is None:
+            lists[source_id] = []
+            continue
+        candidates = set(newest_overall).union(newest_by_category.get(source.category_id, ()))
+        for tag_id in source.tags:
+            candidates.update(by_tag[tag_id])
+        candidates.discard(source_id)
+        lists[source_id] = _ranked(
+            (candidate_id, score(source, articles[candidate_id], now, recencies[candidate_id]))
+            for candidate_id in candidates
+        )
+        if len(lists) >= 1000:
+            _write(connection, lists, now)
+            lists = {}
+    _write(connection, lists, now)
+    return len(sources)
+
+
+def update_related(connection, article_id):
+    """Bring the lists up to date after ``article_id`` was written or deleted.
+
+    The article's own list is recomputed. It is then merged into the lists
+    of articles among the ``TAG_CANDIDATE_LIMIT`` newest of each of its
+    tags or the ``REVERSE_CATEGORY_LIMIT`` newest of its category. Lists
+    it was on are recomputed if it left or lost score.
+    """
+    now = datetime.datetime.utcnow()
+    refresh_related(connection, [article_id])
+
+    table = RelatedArticle.__table__
+    referrers = set(connection.execute(
+        select(table.c.article_id).where(table.c.related_id == article_id)
+    ).scalars())
+    info = _load(connection, Article.id == article_id).get(article_id)
+    if info is None:
+        # Tidak published lagi atau dihapus: isi ulang daftar yang memuatnya
+        refresh_related(connection, referrers)
+        return
+
+    neighbours = set(referrers)
+    if info.tags:
+        neighbours.update(connection.execute(
+            select(Article.id).where(PUBLISHED, _sharing_tags(info.tags))
+        ).scalars())
+    if info.category_id is not None:
+        neighbours.update(connection.execute(
+            select(Article.id).where(PUBLISHED, Article.category_id == info.category_id)
+            .order_by(*keyset_order(Article.published_at, Article.id))
+            .limit(REVERSE_CATEGORY_LIMIT)
+        ).scalars())
+    neighbours.discard(article_id)
+    if not neighbours:
+        return
+
+    stored = defaultdict(list)
+    for source_id, related_id, value in connection.execute(
+        select(table.c.article_id, table.c.related_id, table.c.score)
+        .where(table.c.article_id.in_(neighbours))
+        .order_by(table.c.article_id, table.c.rank)
+    ):
+        stored[source_id].append((related_id, value))
+
+    refill = set()
+    lists = {}
+    for source_id, source in _load(connection, Article.id.in_(neighbours)).items():
+        entries = stored[source_id]
+        if not entries:
+            # Daftar belum pernah dihitung; diisi oleh batch
+            continue
+        old_score = dict(entries).get(article_id)
+        new_score = score(source, info, now)
+        if old_score is not None and new_score < old_score:
+            # Artikel lain di luar daftar mungkin sekarang lebih tinggi
+            refill.add(source_id)
+            continue
+        merged = _ranked([entry for entry in entries if entry[0] != article_id] + [(article_id, new_score)])
+        if merged != entries:
+            lists[source_id] = merged
+    refill.update(referrers - neighbours)
+    _write(connection, lists, now)
+    refresh_related(connection, refill)
+
+
+class RelatedUpdater:
+    """Run ``update_related`` for queued article ids on a background thread.
+
+    An id queued several times before the thread gets to it is updated
+    once. At most ``max_pending`` ids are queued; beyond that new ids are
+    dropped and counted, and the next batch run repairs their lists.
+    """
+
+    def __init__(self, engine, max_pending=1000):
+        self.engine = engine
+        self.max_pending = max_pending
+
+        self.updated = 0
+        self.dropped = 0
+        self.errors = 0
+
+        self._lock = threading.Lock()
+        self._pending = set()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def enqueue(self, article_id):
+        """Queue ``article_id`` and return immediately."""
+        with self._lock:
+            if article_id not in self._pending and len(self._pending) >= self.max_pending:
+                self.dropped += 1
+                return
+            self._pending.add(article_id)
+        self._wakeup.set()
+
+    def drain(self):
+        """Run the updates for every queued id and return how many ran."""
+        with self._lock:
+            article_ids, self._pending = sorted(self._pending), set()
+        for article_id in article_ids:
+            # Satu transaksi per artikel: kegagalan satu tidak membatalkan yang lain
+            try:
+                with self.engine.begin() as connection:
+                    update_related(connection, article_id)
+            except Exception:
+                self.errors += 1
+                log.exception('Error updating related articles for article %s', article_id)
+            else:
+                self.updated += 1
+        return len(article_ids)
+
+    def metrics(self):
+        """Return counters describing the state of the queue."""
+        with self._lock:
+            pending = len(self._pending)
+        return {'pending': pending, 'updated': self.updated, 'dropped': self.dropped, 'errors': self.errors}
+
+    def start(self):
+        """Start the background update thread."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name='related-updater', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the thread and run whatever is still queued."""
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=30)
+            self._thread = None
+        self.drain()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wakeup.wait()
+            self._wakeup.clear()
+            if self._stopping.is_set():
+                break
+            self.drain()
+
+
+def schedule_related_update(request, article):
+    """Queue ``article`` for a related-lists update once the transaction commits.
+
+    The update itself runs on ``registry.related_updater``'s thread, so
+    the request does not wait for it; a failure is only logged and the
+    next batch run repairs the lists.
+    """
+    updater = request.registry.related_updater
+    state = inspect(article)
+
+    def after_commit(success):
+        if success and state.identity is not None:
+            updater.enqueue(state.identity[0])
+
+    transaction.get().addAfterCommitHook(after_commit)
+
+
+def includeme(config):
+    """Create the related-lists updater and start its thread."""
+    settings = config.get_settings()
+    updater = RelatedUpdater(
+        config.registry['db.engine'],
+        max_pending=int(settings.get('related.max_pending', 1000)),
+    )
+    updater.start()
+    atexit.register(updater.stop)
+    config.registry.related_updater = updater
@@ -0,0 +1,90 @@
+"""Full-text search over articles, threads and comments, and substring search over users.
+
+On PostgreSQL this uses the ``search_vector`` tsvector columns maintained by
+triggers (see the ``add_full_text_search`` migration) and their GIN indexes.
+Other databases fall back to ``ilike`` so development setups keep working.
+
+Users are always matched with ``ilike`` on username, email and full name:
+admins search for email domains and parts of usernames, which token
+prefixes do not find, and the table is small.
+"""
+import re
+
+from sqlalchemy import func, literal, or_
+
+from ..models import Article, Comment, Thread, User
+
+# Model yang selalu dicari dengan ilike, juga di PostgreSQL
+ILIKE_MODELS = (User,)
+
+# Kolom fallback (ilike) dan kolom yang di-highlight per model
+SEARCH_FIELDS = {
+    Article: (Article.title, Article.excerpt, Article.content),
+    Thread: (Thread.title, Thread.content),
+    Comment: (Comment.content,),
+    User: (User.username, User.email, User.full_name),
+}
+
+HEADLINE_OPTIONS = 'StartSel=<mark>, StopSel=</mark>, MaxWords=35, MinWords=15, MaxFragments=2'
+
+_TERM_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def is_postgresql(db):
+    return db.get_bind().dialect.name == 'postgresql'
+
+
+def _prefix_terms(q):
+    """Turn free text into a prefix tsquery string, e.g. ``lak:* & war:*``."""
+    return ' & '.join(f'{term}:*' for term in _TERM_RE.findall(q))
+
+
+def build_tsquery(model, q, prefix=False):
+    """Return the tsquery expression for a search string.
+
+    ``prefix`` matches partial words, which suits search-as-you-type.
+    """
+    if prefix:
+        return func.hoopsnewsid_prefix_tsquery(_prefix_terms(q))
+    return func.hoopsnewsid_tsquery(q)
+
+
+def search_filter(db, model, q, prefix=True):
+    """Filter clause matching ``q`` against a model's searchable text."""
+    if model not in ILIKE_MODELS and is_postgresql(db):
+        if not _TERM_RE.search(q):
+            return literal(False)
+        return model.search_vector.op('@@')(build_tsquery(model, q, prefix=prefix))
+    return or_(*(column.ilike(f'%{q}%') for column in SEARCH_FIELDS[model]))
+
+
+def search(db, model, q, page=1, per_page=10, filters=(), options=()):
+    """Ranked, paginated search.
+
+    Returns ``(total, rows)`` where each row is ``(instance, rank, highlight)``.
+    Highlights are only computed for the rows on the requested page;
+    ``options`` are loader options applied to the returned instances.
+    """
+    query = db.query(model).filter(search_filter(db, model, q, prefix=False), *filters)
+    total = query.count()
+
+    if model in ILIKE_MODELS or not is_postgresql(db):
+        rows = query.options(*options).order_by(model.id.desc())\
+            .limit(per_page).offset((page - 1) * per_page).all()
+        return total, [(row, 0.0, None) for row in rows]
+
+    tsquery = build_tsquery(model, q)
+    rank = func.ts_rank_cd(model.search_vector, tsquery).label('rank')
+    ranked = query.with_entities(model.id, rank)\
+        .order_by(rank.desc(), model.id.desc())\
+        .limit(per_page).offset((page - 1) * per_page)\
+        .subquery()
+
+    highlight = func.ts_headline(
+        'english', SEARCH_FIELDS[model][-1], tsquery, HEADLINE_OPTIONS
+    )
+    page_query = db.query(model, ranked.c.rank, highlight)\
+        .options(*options)\
+        .join(ranked, model.id == ranked.c.id)\
+        .order_by(ranked.c.rank.desc(), model.id.desc())
+    return total, page_query.all()
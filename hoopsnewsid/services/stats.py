@@ -0,0 +1,91 @@
+"""Admin dashboard totals and recent-activity feed.
+
+Totals come from the ``site_stats`` rollup table. Committed ORM inserts and
+deletes are batched in memory and applied by the view counter's flush
+thread together with the views (see ``models/stats.py``), so the totals
+trail writes by up to ``viewcount.flush_interval``. ``refresh_stats``
+recomputes them from the source tables, for the initial fill and for a
+scheduled run that corrects drift from bulk SQL.
+"""
+import datetime
+
+from sqlalchemy import String, func, insert, literal, select, union_all, update
+
+from ..models import Article, Comment, SiteStat, User
+from ..models.stats import COUNTED_MODELS, STAT_NAMES
+
+
+def count_stats(connection):
+    """Count every counter from the source tables and return ``{name: value}``."""
+    values = {
+        name: connection.execute(select(func.count()).select_from(model.__table__)).scalar()
+        for model, name in COUNTED_MODELS.items()
+    }
+    values['views'] = connection.execute(select(func.coalesce(func.sum(Article.views), 0))).scalar()
+    return values
+
+
+def refresh_stats(connection):
+    """Recompute every counter exactly and return ``{name: value}``."""
+    values = count_stats(connection)
+
+    # UPDATE baris yang sudah ada (bukan delete + insert) agar increment
+    # dari transaksi lain yang menunggu lock tetap diterapkan
+    table = SiteStat.__table__
+    now = datetime.datetime.utcnow()
+    existing = set(connection.execute(select(table.c.name)).scalars())
+    for name, value in values.items():
+        if name in existing:
+            connection.execute(update(table).where(table.c.name == name).values(value=value, updated_at=now))
+        else:
+            connection.execute(insert(table).values(name=name, value=value, updated_at=now))
+    return values
+
+
+def get_totals(db):
+    """Dashboard totals from the rollup table: a single primary-key scan."""
+    totals = dict(db.query(SiteStat.name, SiteStat.value))
+    if any(name not in totals for name in STAT_NAMES):
+        # Tabel rollup belum terisi (mis. database dibuat lewat create_all):
+        # hitung langsung tanpa menulis; isi lewat refresh_hoopsnewsid_stats
+        totals = count_stats(db.connection())
+    return totals
+
+
+def recent_activity(db, limit=10):
+    """Newest registrations, articles and comments merged in one UNION ALL query.
+
+    Returns rows with ``type``, ``title``, ``time`` and the acting user's
+    ``user_id``, ``username``, ``full_name`` and ``avatar_url``.
+    """
+    def newest(query, time_column):
+        # Tiap cabang memakai index created_at dan hanya mengambil `limit` baris
+        return select(query.order_by(time_column.desc()).limit(limit).subquery())
+
+    users = newest(select(
+        literal('user_registered').label('type'),
+        User.id.label('user_id'),
+        literal(None, String).label('title'),
+        User.created_at.label('time'),
+    ), User.created_at)
+    articles = newest(select(
+        literal('article_created').label('type'),
+        Article.author_id.label('user_id'),
+        Article.title.label('title'),
+        Article.created_at.label('time'),
+    ), Article.created_at)
+    comments = newest(select(
+        literal('comment_added').label('type'),
+        Comment.user_id.label('user_id'),
+        Article.title.label('title'),
+        Comment.created_at.label('time'),
+    ).outerjoin(Article, Comment.article_id == Article.id), Comment.created_at)
+
+    activity = union_all(users, articles, comments).subquery('activity')
+    query = select(
+        activity.c.type, activity.c.title, activity.c.time, activity.c.user_id,
+        User.username, User.full_name, User.avatar_url,
+    ).outerjoin(User, User.id == activity.c.user_id)\
+        .order_by(activity.c.time.desc())\
+        .limit(limit)
+    return db.execute(query).all()
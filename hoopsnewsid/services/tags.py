@@ -0,0 +1,132 @@
+"""Resolve tag names to ``Tag`` rows for article and thread writes.
+
+Missing tags are created with a single ``INSERT ... ON CONFLICT DO NOTHING
+RETURNING`` and the rest are fetched with one ``IN`` select, so a write
+costs at most two statements no matter how many tags it carries. Two
+writers creating the same tag no longer race on ``uq_tags_name``: the
+loser's insert is skipped and its select picks up the winner's row.
+
+A process-wide name -> id cache lets writes with known tags skip the
+insert and select by primary key.
+"""
+import threading
+
+from sqlalchemy import or_, select
+from sqlalchemy.exc import IntegrityError
+from zope.sqlalchemy import mark_changed
+
+from ..models import Tag
+
+
+class TagCache:
+    """Thread-safe name -> id map, cleared whenever it grows past ``max_size``."""
+
+    def __init__(self, max_size=10000):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._ids = {}
+
+    def get_many(self, names):
+        with self._lock:
+            return {name: self._ids[name] for name in names if name in self._ids}
+
+    def set_many(self, ids):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            if len(self._ids) + len(ids) > self.max_size:
+                self._ids = {}
+            self._ids.update(ids)
+
+    def discard(self, names):
+        with self._lock:
+            for name in names:
+                self._ids.pop(name, None)
+
+    def clear(self):
+        with self._lock:
+            self._ids.clear()
+
+
+def clean_tag_names(names):
+    """Strip, drop empty values and de-duplicate, keeping the original order."""
+    cleaned = []
+    for name in names or ():
+        if not isinstance(name, str):
+            continue
+        name = name.strip()
+        if name and name not in cleaned:
+            cleaned.append(name)
+    return cleaned
+
+
+def _insert_ignore(db):
+    dialect = db.get_bind().dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        return None
+    return insert(Tag).on_conflict_do_nothing(index_elements=[Tag.name])
+
+
+def _create_tags(db, names):
+    """Insert the tags that do not exist yet and return the new ``Tag`` rows."""
+    statement = _insert_ignore(db)
+    if statement is not None:
+        created = db.scalars(
+            statement.values([{'name': name} for name in names]).returning(Tag)
+        ).all()
+    else:
+        # Dialect tanpa ON CONFLICT: satu savepoint per tag
+        created = []
+        for name in names:
+            try:
+                with db.begin_nested():
+                    tag = Tag(name=name)
+                    db.add(tag)
+                created.append(tag)
+            except IntegrityError:
+                pass
+    mark_changed(db)
+    return created
+
+
+def resolve_tags(db, names, cache=None):
+    """Return ``Tag`` rows for ``names`` in order, creating the missing ones."""
+    names = clean_tag_names(names)
+    if not names:
+        return []
+
+    tags = {}
+    known = cache.get_many(names) if cache is not None else {}
+    missing = [name for name in names if name not in known]
+
+    created = _create_tags(db, missing) if missing else []
+    tags.update((tag.name, tag) for tag in created)
+    existing = [name for name in missing if name not in tags]
+
+    conditions = []
+    if known:
+        conditions.append(Tag.id.in_(known.values()))
+    if existing:
+        conditions.append(Tag.name.in_(existing))
+    if conditions:
+        tags.update((tag.name, tag) for tag in db.scalars(select(Tag).where(or_(*conditions))))
+
+    stale = [name for name in known if name not in tags]
+    if stale:
+        # Tag di cache sudah dihapus atau insert-nya ikut di-rollback
+        cache.discard(stale)
+        tags.update((tag.name, tag) for tag in resolve_tags(db, stale, cache))
+
+    if cache is not None:
+        cache.set_many({tag.name: tag.id for tag in tags.values()})
+    return [tags[name] for name in names]
+
+
+def includeme(config):
+    """Create the tag id cache from the ``tags.*`` settings."""
+    settings = config.get_settings()
+    config.registry.tag_cache = TagCache(max_size=int(settings.get('tags.cache_size', 10000)))
@@ -0,0 +1,53 @@
+"""Helpers for tests and benchmarks that guard against N+1 query regressions."""
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+# Jumlah query maksimum per endpoint (GET; admin termasuk query autentikasi)
+QUERY_BUDGETS = {
+    'api_articles': 2,
+    'api_article': 2,
+    'api_articles_related': 2,
+    'api_user_articles': 3,
+    'api_admin_articles': 3,
+    'api_admin_stats': 4,
+}
+
+
+class QueryCounter:
+    """Count the SQL statements executed on an engine."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        event.listen(self.engine, 'before_cursor_execute', self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, 'before_cursor_execute', self._on_execute)
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+
+@contextmanager
+def assert_max_queries(engine, limit):
+    """Fail if the block executes more than ``limit`` SQL statements.
+
+    ``limit`` may also be a route name from QUERY_BUDGETS.
+    """
+    if isinstance(limit, str):
+        limit = QUERY_BUDGETS[limit]
+    with QueryCounter(engine) as counter:
+        yield counter
+    if counter.count > limit:
+        raise AssertionError(
+            f'Expected at most {limit} queries, got {counter.count}:\n'
+            + '\n'.join(counter.statements)
+        )
@@ -0,0 +1,51 @@
+import datetime
+import hashlib
+
+from pyramid.httpexceptions import HTTPNotModified
+
+
+def make_etag(*parts):
+    """Build an ETag value from a few cheap-to-fetch values."""
+    return hashlib.sha1(repr(parts).encode('utf8')).hexdigest()
+
+
+def _http_date(value):
+    """Naive UTC datetime -> aware datetime truncated to whole seconds."""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=datetime.timezone.utc)
+    return value.replace(microsecond=0)
+
+
+def is_not_modified(request, etag, last_modified=None):
+    """Evaluate If-None-Match / If-Modified-Since against the validators."""
+    if request.if_none_match:
+        return etag in request.if_none_match
+    if_modified_since = request.if_modified_since
+    if if_modified_since is not None and last_modified is not None:
+        return _http_date(last_modified) <= if_modified_since
+    return False
+
+
+def not_modified(request, etag, last_modified=None):
+    """Set ETag/Last-Modified on the response.
+
+    Returns an HTTPNotModified response when the client's copy is still
+    current, otherwise None so the view can go on to serialize.
+    """
+    last_modified = _http_date(last_modified)
+    request.response.etag = etag
+    if last_modified is not None:
+        request.response.last_modified = last_modified
+    if is_not_modified(request, etag, last_modified):
+        return not_modified_response(etag, last_modified)
+    return None
+
+
+def not_modified_response(etag, last_modified=None):
+    response = HTTPNotModified()
+    response.etag = etag
+    if last_modified is not None:
+        response.last_modified = last_modified
+    return response
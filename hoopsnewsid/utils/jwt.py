@@ -2,8 +2,11 @@ import jwt
 import datetime
 from pyramid.settings import asbool
 
-def create_token(user_id, request, admin=False):
-    """Create a JWT token for a user."""
+def create_token(user_id, request, admin=False, version=0):
+    """Create a JWT token for a user.
+
+    ``version`` is the user's ``token_version``; bumping it revokes the token.
+    """
     settings = request.registry.settings
     secret = settings['jwt.secret']
     expiration = int(settings.get('jwt.expiration', 3600))
@@ -12,7 +15,8 @@ def create_token(user_id, request, admin=False):
         'sub': user_id,
         'iat': datetime.datetime.utcnow(),
         'exp': datetime.datetime.utcnow() + datetime.timedelta(seconds=expiration),
-        'admin': admin
+        'admin': admin,
+        'ver': version
     }
     
     return jwt.encode(payload, secret, algorithm='HS256')
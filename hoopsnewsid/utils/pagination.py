@@ -0,0 +1,70 @@
+import base64
+import datetime
+import json
+
+from sqlalchemy import and_, or_
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+def encode_cursor(sort, value, last_id):
+    """Encode the last row of a page as an opaque cursor string."""
+    if isinstance(value, datetime.datetime):
+        value = {'dt': value.isoformat()}
+    payload = json.dumps([sort, value, last_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, sort):
+    """Decode a cursor produced by encode_cursor for the given sort key.
+
+    Returns a ``(value, last_id)`` tuple.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        cursor_sort, value, last_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        if isinstance(value, dict):
+            value = datetime.datetime.fromisoformat(value['dt'])
+        last_id = int(last_id)
+    except Exception:
+        raise InvalidCursor('Invalid cursor')
+    if cursor_sort != sort:
+        raise InvalidCursor('Cursor does not match sort order')
+    return value, last_id
+
+
+def keyset_order(column, id_column):
+    """Descending keyset order; NULL sort values go last."""
+    return (column.desc().nullslast(), id_column.desc())
+
+
+def keyset_filter(column, id_column, value, last_id):
+    """Filter selecting the rows after ``(value, last_id)`` in keyset_order."""
+    if value is None:
+        return and_(column.is_(None), id_column < last_id)
+    return or_(
+        column < value,
+        and_(column == value, id_column < last_id),
+        column.is_(None),
+    )
+
+
+def estimate_count(query):
+    """Estimated row count of a query from the PostgreSQL planner.
+
+    Falls back to an exact count on other databases.
+    """
+    session = query.session
+    bind = session.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return query.count()
+
+    compiled = query.statement.compile(bind)
+    plan = session.connection().exec_driver_sql(
+        f'EXPLAIN (FORMAT JSON) {compiled.string}', compiled.params
+    ).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
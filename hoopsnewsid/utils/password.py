@@ -1,10 +1,143 @@
+import atexit
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import bcrypt
 
-def hash_password(password):
+DEFAULT_ROUNDS = 12
+
+# Thread bawaan waitress bila [server:main] tidak menyetel `threads`
+DEFAULT_SERVER_THREADS = 4
+
+def hash_password(password, rounds=DEFAULT_ROUNDS):
     """Hash a password for storing."""
-    pwhash = bcrypt.hashpw(password.encode('utf8'), bcrypt.gensalt())
+    pwhash = bcrypt.hashpw(password.encode('utf8'), bcrypt.gensalt(rounds))
     return pwhash.decode('utf8')
 
 def verify_password(stored_password, provided_password):
     """Verify a stored password against one provided by user"""
     return bcrypt.checkpw(provided_password.encode('utf8'), stored_password.encode('utf8'))
+
+def hash_rounds(stored_password):
+    """Cost factor of a bcrypt hash such as ``$2b$12$...``, or None."""
+    try:
+        return int(stored_password.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing queue is full; views answer with 503."""
+
+
+class PasswordHasher:
+    """Run bcrypt on a small dedicated thread pool.
+
+    bcrypt releases the GIL, so a thread pool keeps hashing off the
+    waitress workers' CPU budget without a process pool. At most
+    ``max_workers`` hashes run at once and ``max_queue`` more may wait;
+    anything beyond that raises ``PasswordHasherBusy`` immediately instead
+    of tying up another request thread.
+
+    Every running or waiting hash holds the request thread that asked for
+    it, so ``max_workers + max_queue`` must stay below the server's
+    request threads or a burst of logins can occupy all of them.
+    ``includeme`` caps the sum at ``server.threads - 1`` (see
+    ``pool_limits``), always leaving a thread for other requests.
+    """
+
+    def __init__(self, rounds=DEFAULT_ROUNDS, max_workers=2, max_queue=16):
+        self.rounds = rounds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='password-hasher')
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self._lock = threading.Lock()
+        self.operations = 0
+        self.rejected = 0
+        self.hash_seconds = 0.0
+        self.hash_seconds_max = 0.0
+        self.queue_wait_seconds = 0.0
+        self.queue_wait_seconds_max = 0.0
+
+    def hash(self, password):
+        return self._run(hash_password, password, self.rounds)
+
+    def verify(self, stored_password, provided_password):
+        return self._run(verify_password, stored_password, provided_password)
+
+    def needs_rehash(self, stored_password):
+        """True when a hash was made with a different cost than configured."""
+        return hash_rounds(stored_password) != self.rounds
+
+    def _run(self, func, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise PasswordHasherBusy('Too many password operations in progress')
+
+        queued = time.perf_counter()
+
+        def task():
+            started = time.perf_counter()
+            try:
+                return func(*args)
+            finally:
+                self._record(started - queued, time.perf_counter() - started)
+
+        try:
+            return self._executor.submit(task).result()
+        finally:
+            self._slots.release()
+
+    def _record(self, queue_wait, duration):
+        with self._lock:
+            self.operations += 1
+            self.queue_wait_seconds += queue_wait
+            self.queue_wait_seconds_max = max(self.queue_wait_seconds_max, queue_wait)
+            self.hash_seconds += duration
+            self.hash_seconds_max = max(self.hash_seconds_max, duration)
+
+    def metrics(self):
+        """Return counters for hash latency, queue wait and rejections."""
+        with self._lock:
+            operations = self.operations or 1
+            return {
+                'operations': self.operations,
+                'rejected': self.rejected,
+                'hash_seconds_avg': self.hash_seconds / operations,
+                'hash_seconds_max': self.hash_seconds_max,
+                'queue_wait_seconds_avg': self.queue_wait_seconds / operations,
+                'queue_wait_seconds_max': self.queue_wait_seconds_max,
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+
+def pool_limits(max_workers, max_queue, server_threads):
+    """``(max_workers, max_queue)`` capped so their sum is below ``server_threads``."""
+    slots = max(min(max_workers + max_queue, server_threads - 1), 1)
+    max_workers = max(min(max_workers, slots), 1)
+    return max_workers, slots - max_workers
+
+
+def includeme(config):
+    """Create the password hasher from the ``password.*`` settings.
+
+    ``server.threads`` must match the request threads of the server
+    (``threads`` in ``[server:main]``; ``hoopsnewsid.asgi`` sets it to
+    ``asgi.threads``).
+    """
+    settings = config.get_settings()
+    max_workers, max_queue = pool_limits(
+        int(settings.get('password.max_workers', 2)),
+        int(settings.get('password.max_queue', 2)),
+        int(settings.get('server.threads', DEFAULT_SERVER_THREADS)),
+    )
+    hasher = PasswordHasher(
+        rounds=int(settings.get('password.bcrypt_rounds', DEFAULT_ROUNDS)),
+        max_workers=max_workers,
+        max_queue=max_queue,
+    )
+    atexit.register(hasher.shutdown)
+    config.registry.password_hasher = hasher
@@ -0,0 +1,219 @@
+import atexit
+import functools
+import logging
+import threading
+import time
+from collections import Counter
+
+from sqlalchemy import Integer, bindparam, column, func, update, values
+
+from .models import Article
+from .models.stats import add_to_stats, pending_stats
+
+log = logging.getLogger(__name__)
+
+
+class MemoryStore:
+    """In-process store for pending view increments, keyed by article id."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {}
+        self._hits = 0
+
+    def add(self, key, amount=1):
+        """Add increments for a key and return the total pending hits."""
+        with self._lock:
+            self._counts[key] = self._counts.get(key, 0) + amount
+            self._hits += amount
+            return self._hits
+
+    def drain(self):
+        """Remove and return every pending increment."""
+        with self._lock:
+            counts, self._counts = self._counts, {}
+            self._hits = 0
+            return counts
+
+    def restore(self, counts):
+        """Put increments back after a failed flush."""
+        for key, amount in counts.items():
+            self.add(key, amount)
+
+    def pending(self):
+        """Return ``(pending_keys, pending_hits)``."""
+        with self._lock:
+            return len(self._counts), self._hits
+
+
+class ViewCounter:
+    """Aggregate article views in memory and flush them as one bulk UPDATE.
+
+    Hits are flushed every ``flush_interval`` seconds or as soon as
+    ``flush_threshold`` hits are pending, whichever comes first. At most
+    ``max_pending`` hits are buffered; beyond that (e.g. while the database
+    is unreachable) new hits are dropped and counted, so a crash never
+    loses more than ``max_pending`` views.
+    """
+
+    def __init__(self, engine, store=None, flush_interval=5.0,
+                 flush_threshold=500, max_pending=10000):
+        self.engine = engine
+        self.store = store if store is not None else MemoryStore()
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self.max_pending = max_pending
+
+        self.flushed_hits = 0
+        self.dropped_hits = 0
+        self.flush_count = 0
+        self.flush_errors = 0
+        self.last_flush_duration = 0.0
+
+        self._flush_lock = threading.Lock()
+        # Terpisah dari _flush_lock agar hit() tidak menunggu flush yang berjalan
+        self._dropped_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def hit(self, article_id, amount=1):
+        """Record views for an article."""
+        if self.store.pending()[1] >= self.max_pending:
+            with self._dropped_lock:
+                self.dropped_hits += amount
+            return
+        pending = self.store.add(article_id, amount)
+        if pending >= self.flush_threshold:
+            self._wakeup.set()
+
+    def flush(self):
+        """Write every pending increment to the database.
+
+        Also applies the committed ``site_stats`` deltas collected by
+        ``models/stats.py``. Returns the number of hits flushed.
+        """
+        with self._flush_lock:
+            counts = self.store.drain()
+            # Selisih site_stats yang sudah di-commit ikut ditulis di sini
+            stats = pending_stats.drain(self.engine)
+            if not counts and not stats:
+                return 0
+            started = time.perf_counter()
+            try:
+                with self.engine.begin() as conn:
+                    if counts:
+                        self._execute_update(conn, counts)
+                    deltas = Counter(stats)
+                    deltas['views'] += sum(counts.values())
+                    add_to_stats(conn, deltas)
+            except Exception:
+                self.flush_errors += 1
+                self.store.restore(counts)
+                pending_stats.restore(self.engine, stats)
+                log.exception('Error flushing %d article view counts', len(counts))
+                return 0
+            hits = sum(counts.values())
+            self.flushed_hits += hits
+            self.flush_count += 1
+            self.last_flush_duration = time.perf_counter() - started
+            return hits
+
+    def _execute_update(self, conn, counts):
+        # updated_at di-set ke nilainya sendiri agar onupdate tidak terpicu
+        rows = sorted(counts.items())
+        if conn.dialect.name == 'postgresql':
+            # UPDATE articles SET views = ... FROM (VALUES ...) AS v(id, delta)
+            deltas = values(
+                column('id', Integer), column('delta', Integer), name='v'
+            ).data(rows)
+            conn.execute(
+                update(Article.__table__)
+                .values(
+                    views=func.coalesce(Article.views, 0) + deltas.c.delta,
+                    updated_at=Article.updated_at,
+                )
+                .where(Article.id == deltas.c.id)
+            )
+        else:
+            conn.execute(
+                update(Article.__table__)
+                .where(Article.id == bindparam('article_id'))
+                .values(
+                    views=func.coalesce(Article.views, 0) + bindparam('delta'),
+                    updated_at=Article.updated_at,
+                ),
+                [{'article_id': key, 'delta': delta} for key, delta in rows],
+            )
+
+    def metrics(self):
+        """Return counters describing the state of the aggregator."""
+        pending_keys, pending_hits = self.store.pending()
+        return {
+            'pending_articles': pending_keys,
+            'pending_hits': pending_hits,
+            'flushed_hits': self.flushed_hits,
+            'dropped_hits': self.dropped_hits,
+            'flush_count': self.flush_count,
+            'flush_errors': self.flush_errors,
+            'last_flush_duration': self.last_flush_duration,
+        }
+
+    def start(self):
+        """Start the background flush thread."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._run, name='viewcount-flusher', daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop the flush thread and write out whatever is still pending."""
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval + 5)
+            self._thread = None
+        self.flush()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            if self._stopping.is_set():
+                break
+            self.flush()
+
+
+def counts_article_view(view):
+    """Record a view of ``matchdict['id']`` whenever the article is served.
+
+    Sits outside ``cache_response`` so cached responses are counted too,
+    as are 304 revalidations of a copy the client already has.
+    """
+    @functools.wraps(view)
+    def wrapper(request):
+        response = view(request)
+        if getattr(response, 'status_int', 200) in (200, 304):
+            request.registry.view_counter.hit(int(request.matchdict['id']))
+        return response
+    return wrapper
+
+
+def includeme(config):
+    """Create the view counter and flush it on a background thread."""
+    settings = config.get_settings()
+    store_factory = config.maybe_dotted(settings.get('viewcount.store', MemoryStore))
+    counter = ViewCounter(
+        config.registry['db.engine'],
+        store=store_factory(),
+        flush_interval=float(settings.get('viewcount.flush_interval', 5)),
+        flush_threshold=int(settings.get('viewcount.flush_threshold', 500)),
+        max_pending=int(settings.get('viewcount.max_pending', 10000)),
+    )
+    counter.start()
+    atexit.register(counter.stop)
+    config.registry.view_counter = counter
+    # Selisih site_stats yang menunggu flush, untuk /metrics
+    config.registry.pending_stats = pending_stats
@@ -14,6 +14,21 @@ requires = [
     'marshmallow',
 ]
 
+# Opsional: renderer JSON lebih cepat (lihat hoopsnewsid/renderers.py)
+speedups_require = [
+    'orjson',
+]
+
+# Opsional: server ASGI untuk hoopsnewsid.asgi
+asgi_require = [
+    'uvicorn',
+]
+
+# Opsional: varian gambar WebP/JPEG (hoopsnewsid/services/images.py)
+images_require = [
+    'Pillow',
+]
+
 tests_require = [
     'WebTest',
     'pytest',
@@ -38,6 +53,9 @@ setup(
     zip_safe=False,
     extras_require={
         'testing': tests_require,
+        'speedups': speedups_require,
+        'asgi': asgi_require,
+        'images': images_require,
     },
     install_requires=requires,
     entry_points={
@@ -46,6 +64,10 @@ setup(
         ],
         'console_scripts': [
             'initialize_hoopsnewsid_db = hoopsnewsid.scripts.initialize_db:main',
+            'refresh_hoopsnewsid_stats = hoopsnewsid.scripts.refresh_stats:main',
+            'refresh_hoopsnewsid_related = hoopsnewsid.scripts.refresh_related:main',
+            'generate_hoopsnewsid_data = hoopsnewsid.scripts.generate_data:main',
+            'process_hoopsnewsid_images = hoopsnewsid.scripts.process_images:main',
         ],
     },
 )
@@ -0,0 +1,161 @@
+"""``RedisBackend`` and ``ResponseCache`` against an in-memory fake Redis client."""
+import fnmatch
+import time
+
+import pytest
+
+from hoopsnewsid.cache import RedisBackend, ResponseCache
+
+
+class FakeRedis:
+    """The subset of redis-py the backend uses, with a settable clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self._data = {}
+        self._expires = {}
+
+    def _encode(self, value):
+        return value if isinstance(value, bytes) else str(value).encode('utf8')
+
+    def _alive(self, key):
+        expires = self._expires.get(key)
+        if expires is not None and expires <= self.now:
+            self._data.pop(key, None)
+            self._expires.pop(key, None)
+        return key in self._data
+
+    def get(self, key):
+        return self._data[key] if self._alive(key) else None
+
+    def set(self, key, value, ex=None):
+        self._data[key] = self._encode(value)
+        self._expires.pop(key, None)
+        if ex is not None:
+            self._expires[key] = self.now + ex
+
+    def sadd(self, key, *members):
+        members = {self._encode(member) for member in members}
+        if self._alive(key):
+            self._data[key] |= members
+        else:
+            self._data[key] = members
+
+    def smembers(self, key):
+        return set(self._data[key]) if self._alive(key) else set()
+
+    def expire(self, key, seconds):
+        if self._alive(key):
+            self._expires[key] = self.now + seconds
+
+    def ttl(self, key):
+        if not self._alive(key):
+            return -2
+        expires = self._expires.get(key)
+        return -1 if expires is None else int(expires - self.now)
+
+    def delete(self, *keys):
+        for key in keys:
+            key = key.decode('utf8') if isinstance(key, bytes) else key
+            self._data.pop(key, None)
+            self._expires.pop(key, None)
+
+    def scan_iter(self, match='*'):
+        return [key for key in list(self._data) if self._alive(key) and fnmatch.fnmatchcase(key, match)]
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kw):
+            self.calls.append((name, args, kw))
+            return self
+        return queue
+
+    def execute(self):
+        return [getattr(self.client, name)(*args, **kw) for name, args, kw in self.calls]
+
+
+@pytest.fixture
+def client():
+    return FakeRedis()
+
+
+@pytest.fixture
+def cache(client):
+    return ResponseCache(RedisBackend(client, tag_ttl=600), default_ttl=60)
+
+
+def test_set_and_get_round_trip(cache):
+    cache.set('articles:1', 'application/json', '{"a": 1}', headers={'ETag': '"x"'})
+
+    assert cache.get('articles:1') == {'content_type': 'application/json', 'body': '{"a": 1}', 'headers': {'ETag': '"x"'}}
+    assert cache.get('articles:2') is None
+    assert cache.metrics() == {'hits': 1, 'misses': 1}
+
+
+def test_entries_expire_after_their_ttl(cache, client):
+    cache.set('short', 'application/json', '1', ttl=5)
+    cache.set('default', 'application/json', '2')
+
+    assert client.ttl('hoopsnewsid:cache:short') == 5
+    client.now += 5
+    assert cache.get('short') is None
+    assert cache.get('default') is not None
+    client.now += 55
+    assert cache.get('default') is None
+
+
+def test_tags_are_sets_of_keys_outliving_the_entries(cache, client):
+    cache.set('a', 'application/json', '1', tags=['article:1', 'articles'])
+    cache.set('b', 'application/json', '2', tags=['articles'])
+
+    assert client.smembers('hoopsnewsid:cache:tag:articles') == {b'hoopsnewsid:cache:a', b'hoopsnewsid:cache:b'}
+    assert client.smembers('hoopsnewsid:cache:tag:article:1') == {b'hoopsnewsid:cache:a'}
+    assert client.ttl('hoopsnewsid:cache:tag:articles') == 600
+
+
+def test_invalidate_tags_drops_tagged_entries_only(cache):
+    cache.set('a', 'application/json', '1', tags=['article:1', 'articles'])
+    cache.set('b', 'application/json', '2', tags=['article:2', 'articles'])
+    cache.set('c', 'application/json', '3', tags=['categories'])
+
+    cache.invalidate_tags(['article:1'])
+    assert cache.get('a') is None
+    assert cache.get('b') is not None
+
+    cache.invalidate_tags(['articles'])
+    assert cache.get('b') is None
+    assert cache.get('c') is not None
+
+
+def test_last_invalidation_is_shared_through_redis(client, monkeypatch):
+    writer = RedisBackend(client)
+    reader = ResponseCache(RedisBackend(client))
+    assert writer.last_invalidation() is None
+    assert not reader.invalidated_within(10)
+
+    monkeypatch.setattr(time, 'time', lambda: 5000.0)
+    writer.invalidate_tags(['articles'])
+    assert writer.last_invalidation() == 5000.0
+
+    monkeypatch.setattr(time, 'time', lambda: 5009.0)
+    assert reader.invalidated_within(10)
+    monkeypatch.setattr(time, 'time', lambda: 5010.0)
+    assert not reader.invalidated_within(10)
+
+
+def test_clear_removes_only_prefixed_keys(cache, client):
+    client.set('other:key', 'keep')
+    cache.set('a', 'application/json', '1', tags=['articles'])
+
+    cache.backend.clear()
+    assert cache.get('a') is None
+    assert client.scan_iter('hoopsnewsid:cache:*') == []
+    assert client.get('other:key') == b'keep'
@@ -0,0 +1,81 @@
+"""Every route in ``QUERY_BUDGETS`` stays within its query budget.
+
+The application runs on a SQLite database seeded by
+``generate_hoopsnewsid_data``; each budgeted route is requested through
+WebTest inside ``assert_max_queries``. The response cache is off so
+every request reaches the database.
+"""
+import os
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import select
+from webtest import TestApp
+
+from hoopsnewsid import main
+from hoopsnewsid.db import DBSession
+from hoopsnewsid.models import Article, Base, User
+from hoopsnewsid.scripts.generate_data import generate
+from hoopsnewsid.testing import QUERY_BUDGETS, assert_max_queries
+from hoopsnewsid.utils.jwt import create_token
+
+VOLUMES = {'users': 20, 'articles': 60, 'tags': 20, 'threads': 10, 'comments': 200}
+
+# Path tiap route yang punya budget; placeholder diisi dari data seed
+ROUTES = {
+    'api_articles': ('/api/articles?per_page=10', False),
+    'api_article': ('/api/articles/{article_id}', False),
+    'api_articles_related': ('/api/articles/related?articleId={article_id}&limit=6', False),
+    'api_user_articles': ('/api/users/{username}/articles', False),
+    'api_admin_articles': ('/api/admin/articles', True),
+    'api_admin_stats': ('/api/admin/stats', True),
+}
+
+
+@pytest.fixture(scope='module')
+def env(tmp_path_factory):
+    path = os.path.join(tmp_path_factory.mktemp('db'), 'budgets.db')
+    settings = {
+        'sqlalchemy.url': f'sqlite:///{path}',
+        'jwt.secret': 'test',
+        'cache.enabled': 'false',
+    }
+    DBSession.remove()
+    app = main({}, **settings)
+    engine = DBSession.get_bind()
+    Base.metadata.create_all(engine)
+    generate(engine, VOLUMES, seed=1, related=True, log=lambda line: None)
+
+    db = DBSession()
+    article = db.scalars(
+        select(Article).where(Article.status == 'published').order_by(Article.id)
+    ).first()
+    params = {'article_id': article.id, 'username': article.author.username}
+    admin = db.scalars(select(User).where(User.is_admin == True).order_by(User.id)).first()  # noqa: E712
+    token = create_token(
+        admin.id, SimpleNamespace(registry=SimpleNamespace(settings=settings)),
+        admin=True, version=admin.token_version or 0,
+    )
+    DBSession.remove()
+
+    yield SimpleNamespace(
+        app=TestApp(app), engine=engine, params=params,
+        headers={'Authorization': f'Bearer {token}'},
+    )
+    DBSession.remove()
+
+
+def test_every_budget_has_a_route():
+    assert set(ROUTES) == set(QUERY_BUDGETS)
+
+
+@pytest.mark.parametrize('route_name', sorted(QUERY_BUDGETS))
+def test_route_within_query_budget(env, route_name):
+    template, needs_admin = ROUTES[route_name]
+    path = template.format(**env.params)
+    headers = env.headers if needs_admin else {}
+
+    # Request pertama mengisi cache proses (identity, tag, schema)
+    env.app.get(path, headers=headers)
+    with assert_max_queries(env.engine, route_name):
+        env.app.get(path, headers=headers)
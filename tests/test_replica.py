@@ -0,0 +1,117 @@
+"""Read/write routing between a primary and a replica, on two SQLite files.
+
+The replica starts as a copy of the primary with a renamed category, so
+responses and per-engine statement counts show which database served a
+request.
+"""
+import os
+import shutil
+from types import SimpleNamespace
+
+import pytest
+import transaction
+from sqlalchemy import create_engine, select, text
+from webtest import TestApp
+
+from hoopsnewsid import main
+from hoopsnewsid.db import STICKY_COOKIE, DBSession
+from hoopsnewsid.models import Base, Category, Thread, User
+from hoopsnewsid.scripts.generate_data import generate
+from hoopsnewsid.testing import QueryCounter
+from hoopsnewsid.utils.jwt import create_token
+
+VOLUMES = {'users': 5, 'articles': 10, 'tags': 5, 'threads': 3, 'comments': 10}
+
+
+@pytest.fixture
+def env(tmp_path):
+    primary_path = os.path.join(tmp_path, 'primary.db')
+    replica_path = os.path.join(tmp_path, 'replica.db')
+    seed_engine = create_engine(f'sqlite:///{primary_path}')
+    Base.metadata.create_all(seed_engine)
+    generate(seed_engine, VOLUMES, seed=1, log=lambda line: None)
+    seed_engine.dispose()
+    shutil.copy(primary_path, replica_path)
+    replica_engine = create_engine(f'sqlite:///{replica_path}')
+    with replica_engine.begin() as connection:
+        connection.execute(text("UPDATE categories SET name = name || ' (replica)'"))
+    replica_engine.dispose()
+
+    settings = {
+        'sqlalchemy.url': f'sqlite:///{primary_path}',
+        'sqlalchemy_replica.url': f'sqlite:///{replica_path}',
+        'jwt.secret': 'test',
+        'cache.enabled': 'false',
+        'db.replica_sticky_seconds': '10',
+    }
+    DBSession.remove()
+    app = main({}, **settings)
+    session = DBSession()
+    primary, replica = session.get_bind(), session.replica
+    admin = session.scalars(select(User).where(User.is_admin == True)).first()  # noqa: E712
+    token = create_token(
+        admin.id, SimpleNamespace(registry=SimpleNamespace(settings=settings)),
+        admin=True, version=admin.token_version or 0,
+    )
+    DBSession.remove()
+
+    yield SimpleNamespace(
+        app=TestApp(app), primary=primary, replica=replica,
+        headers={'Authorization': f'Bearer {token}'},
+    )
+    DBSession.remove()
+
+
+def counted_get(env, path):
+    with QueryCounter(env.primary) as on_primary, QueryCounter(env.replica) as on_replica:
+        response = env.app.get(path)
+    return response, on_primary.count, on_replica.count
+
+
+def test_get_reads_from_replica(env):
+    response, on_primary, on_replica = counted_get(env, '/api/categories')
+
+    assert on_primary == 0 and on_replica > 0
+    assert all(category['name'].endswith('(replica)') for category in response.json)
+
+
+def test_flush_goes_to_primary_while_reading_from_replica(env):
+    try:
+        with transaction.manager:
+            session = DBSession()
+            session.use_replica = True
+            session.add(Category(name='Flushed', slug='flushed'))
+            session.flush()
+    finally:
+        DBSession.remove()
+
+    with env.primary.connect() as connection:
+        assert connection.execute(select(Category.name).where(Category.slug == 'flushed')).scalar() == 'Flushed'
+    with env.replica.connect() as connection:
+        assert connection.execute(select(Category.name).where(Category.slug == 'flushed')).scalar() is None
+
+
+def test_write_goes_to_primary_and_sticks_the_next_get(env):
+    env.app.post_json(
+        '/api/community/threads',
+        {'title': 'Routing test thread', 'content': 'Written through the primary'},
+        headers=env.headers,
+    )
+    assert STICKY_COOKIE in env.app.cookies
+
+    written = select(Thread.id).where(Thread.title == 'Routing test thread')
+    with env.primary.connect() as connection:
+        thread_id = connection.execute(written).scalar()
+    with env.replica.connect() as connection:
+        assert connection.execute(written).scalar() is None
+    assert thread_id is not None
+
+    # Read-your-writes: GET berikutnya dari client ini membaca primary
+    response, on_primary, on_replica = counted_get(env, f'/api/community/threads/{thread_id}')
+    assert on_primary > 0 and on_replica == 0
+    assert response.json['title'] == 'Routing test thread'
+
+    # Client lain (tanpa cookie) tetap membaca replica
+    env.app.reset()
+    _, on_primary, on_replica = counted_get(env, '/api/categories')
+    assert on_primary == 0 and on_replica > 0
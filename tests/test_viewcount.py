@@ -0,0 +1,95 @@
+"""``ViewCounter`` with the in-memory store against a seeded SQLite database."""
+import os
+
+import pytest
+from sqlalchemy import create_engine, select
+
+from hoopsnewsid.models import Article, Base, SiteStat
+from hoopsnewsid.models.stats import pending_stats
+from hoopsnewsid.scripts.generate_data import generate
+from hoopsnewsid.viewcount import MemoryStore, ViewCounter
+
+VOLUMES = {'users': 3, 'articles': 5, 'tags': 3, 'threads': 0, 'comments': 0}
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{os.path.join(tmp_path, 'viewcount.db')}")
+    Base.metadata.create_all(engine)
+    generate(engine, VOLUMES, seed=1, log=lambda line: None)
+    yield engine
+    pending_stats.drain(engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def counter(engine):
+    return ViewCounter(engine, store=MemoryStore(), flush_threshold=100, max_pending=10)
+
+
+def views(engine):
+    with engine.connect() as connection:
+        articles = dict(connection.execute(select(Article.id, Article.views)).all())
+        total = connection.execute(select(SiteStat.value).where(SiteStat.name == 'views')).scalar()
+    return articles, total
+
+
+def test_flush_applies_increments_and_site_stats(engine, counter):
+    before, total_before = views(engine)
+    counter.hit(1)
+    counter.hit(1)
+    counter.hit(2, amount=3)
+    pending_stats.add(engine, {'users': 1})
+
+    assert counter.flush() == 5
+    after, total_after = views(engine)
+    assert after[1] == (before[1] or 0) + 2
+    assert after[2] == (before[2] or 0) + 3
+    assert after[3] == before[3]
+    assert total_after == total_before + 5
+    with engine.connect() as connection:
+        assert connection.execute(select(SiteStat.value).where(SiteStat.name == 'users')).scalar() == VOLUMES['users'] + 1
+
+    assert counter.store.pending() == (0, 0)
+    assert counter.flush() == 0
+    metrics = counter.metrics()
+    assert metrics['flushed_hits'] == 5 and metrics['flush_count'] == 1
+
+
+def test_failed_flush_restores_pending_counts(engine, counter, monkeypatch):
+    before, total_before = views(engine)
+    counter.hit(1, amount=2)
+    pending_stats.add(engine, {'users': 1})
+
+    def broken(conn, counts):
+        raise RuntimeError('database went away')
+
+    monkeypatch.setattr(counter, '_execute_update', broken)
+    assert counter.flush() == 0
+    assert counter.store.pending() == (1, 2)
+    assert pending_stats.metrics()['pending_counters'] >= 1
+    assert counter.metrics()['flush_errors'] == 1
+    assert views(engine) == (before, total_before)
+
+    monkeypatch.undo()
+    assert counter.flush() == 2
+    after, total_after = views(engine)
+    assert after[1] == (before[1] or 0) + 2
+    assert total_after == total_before + 2
+    assert pending_stats.drain(engine) == {}
+
+
+def test_hits_beyond_max_pending_are_dropped(engine, counter):
+    for _ in range(8):
+        counter.hit(1)
+    counter.hit(2, amount=2)
+    counter.hit(2)
+    counter.hit(3, amount=4)
+
+    metrics = counter.metrics()
+    assert metrics['pending_hits'] == 10
+    assert metrics['dropped_hits'] == 5
+
+    assert counter.flush() == 10
+    counter.hit(3)
+    assert counter.metrics()['pending_hits'] == 1